@@ -0,0 +1,54 @@
+# app/API/jobs.py
+
+from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+import logging
+import os, sys
+
+# Adjust project root directory if needed
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
+sys.path.append(project_root)
+
+from backend.Tools.core.jobs import job_queue
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/", response_model=List[dict])
+async def list_jobs(session_id: Optional[str] = None, limit: int = 50) -> List[dict]:
+    """
+    List the most recent background jobs, optionally only those of a session.
+    """
+    return job_queue.list_jobs(session_id, limit)
+
+@router.get("/{job_id}", response_model=dict)
+async def get_job(job_id: str) -> dict:
+    """
+    Return the status, progress and result of a background job.
+    """
+    job = job_queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.get("/{job_id}/progress", response_model=dict)
+async def get_job_progress(job_id: str) -> dict:
+    """
+    Return only the status and progress of a background job.
+    """
+    job = job_queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return {"job_id": job_id, "status": job["status"], "progress": job["progress"]}
+
+@router.post("/{job_id}/cancel", response_model=dict)
+async def cancel_job(job_id: str) -> dict:
+    """
+    Cancel a queued or running background job.
+    """
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    logger.info(f"Cancel requested for job {job_id}, status: {job['status']}")
+    return job
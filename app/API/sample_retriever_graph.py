@@ -1,11 +1,12 @@
 # app/API/sample_retriever_graph.py
 
 from fastapi import APIRouter, HTTPException, Request, Form, File, UploadFile
+from fastapi.responses import StreamingResponse
 from typing import List
 import logging
 from langchain_core.messages import BaseMessage
 from dotenv import load_dotenv
-import os, sys, uuid, base64
+import os, sys, uuid, tempfile, time, json, asyncio
 from copy import deepcopy
 from datetime import datetime, timezone
 
@@ -19,8 +20,11 @@ filename = os.path.basename(__file__)
 logger = initialize_logging(log_file = filename)
 
 # from src.chatbot.studio.sample_retriever import initialize_graph
-from src.chatbot.studio.models import DeltaMessage, InputCSV
-from src.chatbot.studio.prompts import INITIAL_STATE, CONFIG
+from src.chatbot.studio.models import DeltaMessage, InputCSV, ConversationState
+from src.chatbot.studio.prompts import INITIAL_STATE, get_config
+from src.chatbot.studio.checkpointer import touch_thread
+from src.chatbot.studio.streaming import bind_event_queue, emit_event
+from API.session_store import create_session_store, SESSION_TTL
 load_dotenv()
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
 os.environ["GEMINI_API_KEY"] = os.getenv("GEMINI_API_KEY")
@@ -43,11 +47,35 @@ def message_to_dict(message: BaseMessage) -> dict:
     """
     return {"content": message.content, "name": message.name}
 
-# In-memory store for conversation states: session_id -> ConversationState
-conversation_store = {}
+# Store for conversation states with idle-TTL and LRU eviction: session_id -> ConversationState
+conversation_store = create_session_store("conversation")
 
-# In-memory store for uploaded CSV files: session_id -> InputCSV
-csv_store = {}
+# Store for uploaded CSV files with idle-TTL and LRU eviction: session_id -> InputCSV
+csv_store = create_session_store("csv")
+
+# Directory where uploaded CSV files are spooled before being processed in chunks
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "nextseek_uploads"))
+UPLOAD_READ_CHUNK_BYTES = 1024 * 1024
+
+def discard_csv(session_id: str) -> None:
+    """
+    Remove the CSV uploaded for a session from csv_store and delete its spooled file.
+    """
+    input_csv = csv_store.pop(session_id, None)
+    if input_csv is not None and input_csv.path and os.path.exists(input_csv.path):
+        os.remove(input_csv.path)
+        logger.info(f"Deleted spooled CSV {input_csv.path} for session {session_id}")
+
+def sweep_spooled_csvs(max_age: int = SESSION_TTL) -> None:
+    """
+    Delete spooled uploads older than the session TTL, whose csv_store entries have been evicted.
+    Files owned by background jobs (*.job.csv) are deleted by their job.
+    """
+    cutoff = time.time() - max_age
+    for entry in os.scandir(UPLOAD_SPOOL_DIR):
+        if entry.name.endswith(".csv") and not entry.name.endswith(".job.csv") and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+            logger.info(f"Deleted expired spooled CSV {entry.path}")
 
 @router.post("/upload-csv/", response_model=InputCSV)
 async def upload_csv(
@@ -56,22 +84,28 @@ async def upload_csv(
 ) -> InputCSV:
     """
     Receives a CSV file uploaded from the frontend.
-    The file is read as bytes, encoded in base64, and stored as an InputCSV instance.
+    The file is copied to a spool file in fixed-size chunks, so it is never held in memory, and the
+    InputCSV stored for the session references its path.
     """
     try:
-        file_bytes = await file.read()
-        # Encode the file bytes as a base64 string.
-        encoded_content = base64.b64encode(file_bytes).decode('utf-8')
+        # A new upload for the session replaces the previous one
+        discard_csv(session_id)
         timestamp = datetime.now(timezone.utc).isoformat()
         file_id = str(uuid.uuid4())
+        os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+        sweep_spooled_csvs()
+        path = os.path.join(UPLOAD_SPOOL_DIR, f"{file_id}.csv")
+        with open(path, "wb") as spool:
+            while chunk := await file.read(UPLOAD_READ_CHUNK_BYTES):
+                spool.write(chunk)
         input_csv = InputCSV(
             file_id=file_id,
-            content=encoded_content,
+            path=path,
             timestamp=timestamp,
             session_id=session_id
         )
         csv_store[session_id] = input_csv
-        logger.info(f"Uploaded CSV stored for session {session_id} with file_id {file_id}")
+        logger.info(f"Uploaded CSV spooled to {path} for session {session_id} with file_id {file_id}")
         return input_csv
     except Exception as e:
         logger.error(f"Error uploading CSV: {e}")
@@ -79,74 +113,96 @@ async def upload_csv(
 
 
 
-@router.post("/invoke/", response_model=List[dict])
-async def invoke_sample_retriever_graph(delta: DeltaMessage, request: Request) -> List[dict]:
+def prepare_session_state(delta: DeltaMessage) -> tuple[str, ConversationState]:
     """
-    Invoke the pre-compiled multi-agent graph using the provided conversation state.
+    Load the conversation state of the session, append the new user input and attach the uploaded CSV.
+
+    Raises:
+        HTTPException: If the conversation state cannot be initialized or updated.
     """
-    logger.info(f"Received delta message: {delta}")
+    # Determine the session id; if not provided, create a new one.
+    session_id = delta.session_id or str(uuid.uuid4())
+    logger.debug(f"Using session ID: {session_id}")
+    
+    # Retrieve existing conversation state or use a deepcopy of INITIAL_STATE.
+    try:
+        state = conversation_store.get(session_id)
+        if state is not None:
+            logger.debug(f"Retrieved existing conversation state for session: {session_id}")
+        else:
+            state = deepcopy(INITIAL_STATE)
+            state.session_id = session_id
+            conversation_store[session_id] = state
+            logger.debug(f"Created new conversation state for session: {session_id}")
+    except Exception as state_error:
+        logger.error(f"Error handling conversation state: {state_error}")
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Failed to initialize or retrieve conversation state: {str(state_error)}"
+        )
+    
+    # Append the new user input as a HumanMessage to the conversation state.
+    try:
+        # new_message = HumanMessage(content=delta.new_message, name="User")
+        # state.messages.append(new_message)
+        new_state = handle_user_queries(delta.new_message, state)
+        new_state.version += 1
+        new_state.timestamp = delta.timestamp
+        logger.debug(f"Updated conversation state with new message")
+    except Exception as message_error:
+        logger.error(f"Error updating state with new message: {message_error}")
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Failed to update conversation with new message: {str(message_error)}"
+        )
+    
+    # If a CSV has been uploaded for this session, attach its reference.
+    input_csv = csv_store.get(session_id)
+    if input_csv is not None:
+        new_state.file_data = input_csv
+        logger.info(f"Attached CSV file (ID: {input_csv.file_id}) to conversation state for session {session_id}")
+        # Optionally, remove the CSV from csv_store after attaching if you want one-time use.
+        # del csv_store[session_id]
 
+    # Save updated state back to the in-memory store.
+    conversation_store[session_id] = new_state
+    return session_id, new_state
+
+def release_session_state(session_id: str, new_state: ConversationState) -> None:
+    """
+    Clear the CSV file from the conversation state after the response.
+    """
+    discard_csv(session_id)
+    new_state.file_data = None
+    conversation_store[session_id] = new_state
+
+def get_graph(request: Request):
     # Retrieve the shared GRAPH from the app state
     graph = request.app.state.GRAPH
-
-    config = CONFIG
-    
     if graph is None:
         raise HTTPException(
             status_code=503,
             detail="Graph not initialized. Please wait for the service to complete startup."
         )
+    return graph
+
+@router.post("/invoke/", response_model=List[dict])
+async def invoke_sample_retriever_graph(delta: DeltaMessage, request: Request) -> List[dict]:
+    """
+    Invoke the pre-compiled multi-agent graph using the provided conversation state.
+    """
+    logger.info(f"Received delta message: {delta}")
+    graph = get_graph(request)
     
     try:
-        # Determine the session id; if not provided, create a new one.
-        session_id = delta.session_id or str(uuid.uuid4())
-        logger.debug(f"Using session ID: {session_id}")
-        
-        # Retrieve existing conversation state or use a deepcopy of INITIAL_STATE.
-        try:
-            if session_id in conversation_store:
-                state = conversation_store[session_id]
-                logger.debug(f"Retrieved existing conversation state for session: {session_id}")
-            else:
-                state = deepcopy(INITIAL_STATE)
-                state.session_id = session_id
-                conversation_store[session_id] = state
-                logger.debug(f"Created new conversation state for session: {session_id}")
-        except Exception as state_error:
-            logger.error(f"Error handling conversation state: {state_error}")
-            raise HTTPException(
-                status_code=500, 
-                detail=f"Failed to initialize or retrieve conversation state: {str(state_error)}"
-            )
-        
-        # Append the new user input as a HumanMessage to the conversation state.
-        try:
-            # new_message = HumanMessage(content=delta.new_message, name="User")
-            # state.messages.append(new_message)
-            new_state = handle_user_queries(delta.new_message, state)
-            new_state.version += 1
-            new_state.timestamp = delta.timestamp
-            logger.debug(f"Updated conversation state with new message")
-        except Exception as message_error:
-            logger.error(f"Error updating state with new message: {message_error}")
-            raise HTTPException(
-                status_code=500, 
-                detail=f"Failed to update conversation with new message: {str(message_error)}"
-            )
-        
-        # If a CSV has been uploaded for this session, attach its reference.
-        if session_id in csv_store:
-            new_state.file_data = csv_store[session_id]
-            logger.info(f"Attached CSV file (ID: {csv_store[session_id].file_id}) to conversation state for session {session_id}")
-            # Optionally, remove the CSV from csv_store after attaching if you want one-time use.
-            # del csv_store[session_id]
-
-        # Save updated state back to the in-memory store.
-        conversation_store[session_id] = new_state
+        session_id, new_state = prepare_session_state(delta)
+        # Every session is checkpointed in its own thread
+        config = get_config(session_id)
         
         # Invoke the graph
         try:
             logger.info(f"Invoking GRAPH for session: {session_id}")
+            await touch_thread(graph.checkpointer, session_id)
             result = await graph.ainvoke(new_state, config) # returns an instance of ConversationState
             logger.info(f"GRAPH invocation successful, received {len(result)} messages\n{result}")
         except Exception as graph_error:
@@ -162,11 +218,7 @@ async def invoke_sample_retriever_graph(delta: DeltaMessage, request: Request) -
             logger.debug(f"Successfully serialized {len(json_serializable_messages)} messages")
             logger.debug(f"Serialized messages: {json_serializable_messages}")
 
-            # Clear the CSV file from the conversation state after response.
-            if session_id in csv_store:
-                del csv_store[session_id]
-            new_state.file_data = None
-            conversation_store[session_id] = new_state
+            release_session_state(session_id, new_state)
             return json_serializable_messages
         except Exception as serialization_error:
             logger.error(f"Error serializing messages: {serialization_error}")
@@ -181,3 +233,72 @@ async def invoke_sample_retriever_graph(delta: DeltaMessage, request: Request) -
     except Exception as e:
         logger.error(f"Unexpected error in invoke_sample_retriever_graph: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+def format_sse(event: str, data: dict) -> str:
+    """
+    Format an event as a server-sent event.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.post("/invoke-stream/")
+async def stream_sample_retriever_graph(delta: DeltaMessage, request: Request) -> StreamingResponse:
+    """
+    Run the pre-compiled multi-agent graph and stream its progress as server-sent events:
+    - node_start / node_end: a graph node started or finished, with its duration
+    - token: text generated by a streaming BAML call of a node (navigator, data_summarizer, response_formatter)
+    - final: the messages of the conversation once the graph has finished
+    - error: the graph failed
+    """
+    logger.info(f"Received delta message for streaming: {delta}")
+    graph = get_graph(request)
+    session_id, new_state = prepare_session_state(delta)
+    config = get_config(session_id)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run_graph() -> None:
+        # Nodes inherit this task's context and publish their token events to the queue
+        bind_event_queue(queue)
+        started = {}
+        final_state = None
+        try:
+            await touch_thread(graph.checkpointer, session_id)
+            async for mode, chunk in graph.astream(new_state, config, stream_mode=["debug", "values"]):
+                if mode == "values":
+                    final_state = chunk
+                elif chunk["type"] == "task":
+                    started[chunk["payload"]["id"]] = time.time()
+                    emit_event("node_start", node=chunk["payload"]["name"])
+                elif chunk["type"] == "task_result":
+                    seconds = time.time() - started.pop(chunk["payload"]["id"], time.time())
+                    emit_event("node_end", node=chunk["payload"]["name"], seconds=round(seconds, 3))
+            messages = final_state["messages"] if final_state else []
+            emit_event("final", session_id=session_id, messages=[message_to_dict(msg) for msg in messages])
+        except Exception as graph_error:
+            logger.error(f"Error during GRAPH streaming: {graph_error}", exc_info=True)
+            emit_event("error", detail=f"Graph processing failed: {str(graph_error)}")
+        finally:
+            release_session_state(session_id, new_state)
+            queue.put_nowait(None)
+
+    async def event_source():
+        task = asyncio.create_task(run_graph())
+        try:
+            while (event := await queue.get()) is not None:
+                yield format_sse(event["event"], event["data"])
+        finally:
+            # The client disconnected before the end of the run
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/session-store-stats", response_model=dict)
+async def session_store_stats() -> dict:
+    """
+    Report the size, hit/miss and eviction counters of the session stores.
+    """
+    return {"conversation": conversation_store.stats(), "csv": csv_store.stats()}
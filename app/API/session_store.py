@@ -0,0 +1,327 @@
+# app/API/session_store.py
+
+import os
+import sys
+import time
+import pickle
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+from dotenv import load_dotenv
+
+# Adjust project root directory if needed
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.append(project_root)
+
+from backend.Tools.core.local_store import local_db
+
+load_dotenv()
+
+# Backend of the session stores: 'memory', 'sqlite' or 'redis'
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "memory")
+# Sessions idle for longer than this many seconds are evicted
+SESSION_TTL = int(os.getenv("SESSION_TTL", 3600))
+# Maximum number of sessions and total pickled size kept by a store
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", 1000))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", 256 * 1024 * 1024))
+# Local store of the sqlite backend
+SESSION_STORE_NAME = "sessions"
+# Any server speaking the Redis protocol (Redis, Valkey, KeyDB, ...)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+logger = logging.getLogger(__name__)
+
+class SessionStore(ABC):
+    """
+    Key-value store of per-session objects with idle-TTL and LRU eviction.
+
+    Values are pickled, which gives the size accounted against the store limits and lets
+    the external backends share the sessions between several backend workers.
+    """
+
+    def __init__(self, namespace: str, ttl: int = SESSION_TTL):
+        self.namespace = namespace
+        self.ttl = ttl
+        self._metrics = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Return the value of a session and renew its idle TTL, or default if it is missing or expired.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store the value of a session, evicting other sessions if the store is over its limits.
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Remove a session if it exists.
+        """
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        value = self.get(key, default)
+        self.delete(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self.delete(key)
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__, "namespace": self.namespace, **self._metrics}
+
+class MemorySessionStore(SessionStore):
+    """
+    In-process store evicting the least recently used sessions beyond max_entries or max_bytes.
+    """
+
+    def __init__(self, namespace: str, ttl: int = SESSION_TTL, max_entries: int = SESSION_MAX_ENTRIES, max_bytes: int = SESSION_MAX_BYTES):
+        super().__init__(namespace, ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Any, int, float]] = OrderedDict()  # key -> (value, size, last_access)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        now = time.time()
+        # Entries are ordered by last access, so the idle ones are at the front
+        while self._entries:
+            key, (_, _, last_access) = next(iter(self._entries.items()))
+            if now - last_access <= self.ttl and len(self._entries) <= self.max_entries and self._bytes <= self.max_bytes:
+                break
+            self._remove(key)
+            self._metrics["evictions"] += 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            self._evict()
+            entry = self._entries.get(key)
+            if entry is None:
+                self._metrics["misses"] += 1
+                return default
+            value, size, _ = entry
+            self._entries[key] = (value, size, time.time())
+            self._entries.move_to_end(key)
+            self._metrics["hits"] += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        size = len(pickle.dumps(value))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.time())
+            self._bytes += size
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**super().stats(), "entries": len(self._entries), "bytes": self._bytes}
+
+class SqliteSessionStore(SessionStore):
+    """
+    Store backed by a local SQLite file under state_db, shared by the workers of one host.
+    The number and total size of the sessions of each namespace are kept up to date by triggers,
+    so a write only reads the sessions it evicts.
+    """
+
+    def __init__(self, namespace: str, ttl: int = SESSION_TTL, max_entries: int = SESSION_MAX_ENTRIES, max_bytes: int = SESSION_MAX_BYTES):
+        super().__init__(namespace, ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        with local_db(SESSION_STORE_NAME) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_access_idx ON sessions (namespace, last_access)")
+            self._create_totals(conn)
+
+    @staticmethod
+    def _create_totals(conn: sqlite3.Connection) -> None:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'session_totals'").fetchone()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS session_totals (
+                namespace TEXT PRIMARY KEY,
+                entries INTEGER NOT NULL,
+                bytes INTEGER NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS sessions_insert AFTER INSERT ON sessions BEGIN
+                INSERT OR IGNORE INTO session_totals (namespace, entries, bytes) VALUES (NEW.namespace, 0, 0);
+                UPDATE session_totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE namespace = NEW.namespace;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS sessions_update AFTER UPDATE OF size ON sessions BEGIN
+                UPDATE session_totals SET bytes = bytes - OLD.size + NEW.size WHERE namespace = NEW.namespace;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS sessions_delete AFTER DELETE ON sessions BEGIN
+                UPDATE session_totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE namespace = OLD.namespace;
+            END
+        """)
+        if not exists:
+            # Sessions stored before the totals were kept are counted once
+            conn.execute("""
+                INSERT OR IGNORE INTO session_totals (namespace, entries, bytes)
+                SELECT namespace, COUNT(*), SUM(size) FROM sessions GROUP BY namespace
+            """)
+
+    def _totals(self, conn: sqlite3.Connection) -> tuple[int, int]:
+        row = conn.execute("SELECT entries, bytes FROM session_totals WHERE namespace = ?", (self.namespace,)).fetchone()
+        return row if row else (0, 0)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        cursor = conn.execute(
+            "DELETE FROM sessions WHERE namespace = ? AND last_access < ?", (self.namespace, time.time() - self.ttl)
+        )
+        evicted = cursor.rowcount
+        entries, total_bytes = self._totals(conn)
+        to_delete = []
+        if entries > self.max_entries or total_bytes > self.max_bytes:
+            # Drop the least recently used sessions, in access order, until both limits hold
+            for key, size in conn.execute(
+                "SELECT key, size FROM sessions WHERE namespace = ? ORDER BY last_access", (self.namespace,)
+            ):
+                if entries <= self.max_entries and total_bytes <= self.max_bytes:
+                    break
+                to_delete.append((self.namespace, key))
+                entries -= 1
+                total_bytes -= size
+        conn.executemany("DELETE FROM sessions WHERE namespace = ? AND key = ?", to_delete)
+        self._metrics["evictions"] += evicted + len(to_delete)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with local_db(SESSION_STORE_NAME) as conn:
+            row = conn.execute(
+                "SELECT value, last_access FROM sessions WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.ttl:
+                self._metrics["misses"] += 1
+                return default
+            conn.execute(
+                "UPDATE sessions SET last_access = ? WHERE namespace = ? AND key = ?", (time.time(), self.namespace, key)
+            )
+        self._metrics["hits"] += 1
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        data = pickle.dumps(value)
+        with local_db(SESSION_STORE_NAME) as conn:
+            conn.execute(
+                """
+                INSERT INTO sessions (namespace, key, value, size, last_access) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(namespace, key) DO UPDATE SET
+                    value = excluded.value, size = excluded.size, last_access = excluded.last_access
+                """,
+                (self.namespace, key, data, len(data), time.time())
+            )
+            self._evict(conn)
+
+    def delete(self, key: str) -> None:
+        with local_db(SESSION_STORE_NAME) as conn:
+            conn.execute("DELETE FROM sessions WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def stats(self) -> dict:
+        with local_db(SESSION_STORE_NAME) as conn:
+            entries, total_bytes = self._totals(conn)
+        return {**super().stats(), "entries": entries, "bytes": total_bytes}
+
+class RedisSessionStore(SessionStore):
+    """
+    Store on a Redis-protocol server shared by every backend worker.
+    Idle sessions expire through the key TTL, which is renewed on every read. LRU eviction
+    beyond the server memory limit is left to its maxmemory-policy (i.e. allkeys-lru).
+    """
+
+    def __init__(self, namespace: str, ttl: int = SESSION_TTL, url: str = REDIS_URL):
+        super().__init__(namespace, ttl)
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("SESSION_STORE_BACKEND=redis requires the redis package") from e
+        self._client = redis.Redis.from_url(url)
+
+    def _key(self, key: str) -> str:
+        return f"session:{self.namespace}:{key}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        data = self._client.getex(self._key(key), ex=self.ttl)
+        if data is None:
+            self._metrics["misses"] += 1
+            return default
+        self._metrics["hits"] += 1
+        return pickle.loads(data)
+
+    def set(self, key: str, value: Any) -> None:
+        self._client.set(self._key(key), pickle.dumps(value), ex=self.ttl)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._key(key))
+
+    def stats(self) -> dict:
+        entries = sum(1 for _ in self._client.scan_iter(match=self._key("*"), count=1000))
+        return {**super().stats(), "entries": entries}
+
+SESSION_STORE_BACKENDS = {
+    "memory": MemorySessionStore,
+    "sqlite": SqliteSessionStore,
+    "redis": RedisSessionStore,
+}
+
+def create_session_store(namespace: str, backend: Optional[str] = None) -> SessionStore:
+    """
+    Create the session store of a namespace with the configured backend.
+
+    Args:
+        namespace (str): The kind of objects stored (i.e. 'conversation').
+        backend (Optional[str]): 'memory', 'sqlite' or 'redis'. Defaults to SESSION_STORE_BACKEND.
+
+    Returns:
+        SessionStore: The session store.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    backend = backend or SESSION_STORE_BACKEND
+    if backend not in SESSION_STORE_BACKENDS:
+        raise ValueError(f"Unknown session store backend: {backend}")
+    logger.info(f"Using {backend} session store for {namespace}")
+    return SESSION_STORE_BACKENDS[backend](namespace)
@@ -2,20 +2,72 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from API import sample_retriever_graph
+from API import sample_retriever_graph, jobs
 from contextlib import asynccontextmanager
+import asyncio
 from src.chatbot.studio.sample_retriever import initialize_graph
+from src.chatbot.studio.checkpointer import run_checkpoint_pruner
+from src.chatbot.studio.helpers import get_worker_stats
+from src.chatbot.studio.response_cache import get_response_cache_stats
+from src.chatbot.studio.fast_router import get_fast_router_stats
+from src.chatbot.studio.context_builder import get_context_stats
+from backend.Tools.core.database import init_engines, dispose_engines, get_pool_stats, schema_cache, get_schema_cache_stats
+from backend.Tools.core.async_database import init_async_engines, dispose_async_engines, get_async_pool_stats
+from backend.Tools.core.jobs import job_queue
+from backend.Tools.core.local_store import run_periodic
+from backend.Tools.core.sample_closure import refresh_sample_closure, rebuild_sample_closure, SAMPLE_CLOSURE_REFRESH_INTERVAL
+from backend.Tools.core.metadata_index import refresh_metadata_index, rebuild_metadata_index, METADATA_INDEX_REFRESH_INTERVAL
+from backend.Tools.core.uid_index import refresh_uid_index, rebuild_uid_index, UID_INDEX_REFRESH_INTERVAL
+from backend.Tools.core.metadata_snapshot import refresh_metadata_snapshot, rebuild_metadata_snapshot, METADATA_SNAPSHOT_REFRESH_INTERVAL
+from backend.Tools.core.hot_attributes import sync_hot_attribute_columns, get_hot_attribute_stats, HOT_ATTRIBUTE_REFRESH_INTERVAL
 
 # Global variable for the graph, accessible from your router if needed.
 GRAPH = None
 
+# Background refreshes of the local indexes: (refresh, interval in seconds, full rebuild or None)
+REFRESHERS = [
+    # The sample descendant closure table
+    (refresh_sample_closure, SAMPLE_CLOSURE_REFRESH_INTERVAL, rebuild_sample_closure),
+    # The inverted index of the sample metadata
+    (refresh_metadata_index, METADATA_INDEX_REFRESH_INTERVAL, rebuild_metadata_index),
+    # The UIDs by sample type, date and lab
+    (refresh_uid_index, UID_INDEX_REFRESH_INTERVAL, rebuild_uid_index),
+    # The columnar snapshot of the sample metadata for exact aggregates
+    (refresh_metadata_snapshot, METADATA_SNAPSHOT_REFRESH_INTERVAL, rebuild_metadata_snapshot),
+    # The indexed columns of the most searched JSON attributes
+    (sync_hot_attribute_columns, HOT_ATTRIBUTE_REFRESH_INTERVAL, None),
+]
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global GRAPH
+    # Startup: open the pooled database engines once for the whole process
+    init_engines()
+    init_async_engines()
+    # Startup: build the default schema in the background so no request waits on it
+    schema_cache.warm()
     # Startup: initialize your graph
     app.state.GRAPH = await initialize_graph()
+    # Startup: expire idle session threads and old checkpoints in the background
+    background_tasks = [asyncio.create_task(run_checkpoint_pruner(app.state.GRAPH.checkpointer))]
+    # Startup: build the local indexes and keep them current in the background
+    background_tasks += [
+        asyncio.create_task(run_periodic(refresh_fn, interval, rebuild_fn))
+        for refresh_fn, interval, rebuild_fn in REFRESHERS
+    ]
+    # Startup: run long metadata updates on the background worker pool
+    await job_queue.start()
     yield
-    # Shutdown: add cleanup code here if necessary
+    # Shutdown: stop the background workers before closing the engines they use
+    await job_queue.stop()
+    # Shutdown: stop pruning and refreshing, and close the checkpoint database
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await app.state.GRAPH.checkpointer.conn.close()
+    # Shutdown: close every pooled database connection
+    dispose_engines()
+    await dispose_async_engines()
 
 app = FastAPI(title="NExtSEEK Chat API", lifespan=lifespan)
 
@@ -29,7 +81,57 @@ app.add_middleware(
 )
 
 app.include_router(sample_retriever_graph.router, prefix="/sampleretriever")
+app.include_router(jobs.router, prefix="/jobs")
+
+@app.get("/db/pool-stats")
+async def db_pool_stats() -> dict:
+    """
+    Report the connection pool statistics of every database engine.
+    """
+    return {"sync": get_pool_stats(), "async": get_async_pool_stats()}
+
+@app.get("/db/schema-cache-stats")
+async def schema_cache_stats() -> dict:
+    """
+    Report the hit/miss counters and refresh latencies of the schema cache.
+    """
+    return get_schema_cache_stats()
+
+@app.get("/db/hot-attribute-stats")
+async def hot_attribute_stats() -> dict:
+    """
+    Report the indexed hot JSON attributes and how many search filters used them.
+    """
+    return get_hot_attribute_stats()
+
+@app.get("/graph/worker-stats")
+async def worker_stats() -> dict:
+    """
+    Report the compile count, compile time and reuse count of every worker subgraph.
+    """
+    return get_worker_stats()
+
+@app.get("/graph/response-cache-stats")
+async def response_cache_stats() -> dict:
+    """
+    Report the hit/miss counters of the cached answers to repeated questions.
+    """
+    return get_response_cache_stats()
+
+@app.get("/graph/fast-router-stats")
+async def fast_router_stats() -> dict:
+    """
+    Report how many dispatches skipped the LLM routing calls and how many calls that saved.
+    """
+    return get_fast_router_stats()
+
+@app.get("/graph/context-stats")
+async def context_stats() -> dict:
+    """
+    Report per node the prompt tokens sent to the LLM and the tokens saved by the payload compaction.
+    """
+    return get_context_stats()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,197 @@
+# backend/Tools/core/async_database.py
+import os
+import sys
+import logging
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+from dotenv import load_dotenv
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+from backend.Tools.core.database import (
+    get_database_url,
+    format_query_result,
+    QUERY_OUTPUT_FORMATS,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE
+)
+
+load_dotenv()
+
+# Registry of async engines: logical database name (i.e. 'DB_NAME') -> AsyncEngine.
+# Async connections are bound to the event loop that opened them, so these engines
+# must only be used from the application's event loop.
+_async_engine_registry = {}
+
+def get_async_engine(database_name: str = 'DB_NAME') -> AsyncEngine:
+    """
+    Return the pooled async engine for a logical database, creating it on first use.
+
+    Args:
+        database_name (str): The environment variable holding the database name. Default is 'DB_NAME'.
+
+    Returns:
+        AsyncEngine: A SQLAlchemy async engine using the aiomysql driver.
+
+    Raises:
+        Exception: If there is an error creating the engine.
+    """
+    engine = _async_engine_registry.get(database_name)
+    if engine is not None:
+        return engine
+    try:
+        engine = create_async_engine(
+            get_database_url(database_name, driver='aiomysql'),
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True
+        )
+        _async_engine_registry[database_name] = engine
+        logging.info(f"Created async engine for {os.getenv(database_name)} on {os.getenv('DB_HOST')}")
+        return engine
+    except Exception as e:
+        logging.error(f"Error creating async engine: {e}")
+        raise
+
+def init_async_engines(database_names: tuple[str, ...] = ('DB_NAME', 'DB_NAME1')) -> None:
+    """
+    Create the async engines for every configured logical database.
+    Databases whose environment variable is not set are skipped.
+
+    Args:
+        database_names (tuple[str, ...]): The environment variables holding the database names.
+    """
+    for database_name in database_names:
+        if not os.getenv(database_name):
+            logging.warning(f"{database_name} is not set. Skipping async engine creation.")
+            continue
+        get_async_engine(database_name)
+
+async def dispose_async_engines() -> None:
+    """
+    Dispose every async engine in the registry and close their pooled connections.
+    """
+    for database_name, engine in list(_async_engine_registry.items()):
+        await engine.dispose()
+        logging.info(f"Disposed async engine for {database_name}")
+    _async_engine_registry.clear()
+
+def get_async_pool_stats() -> dict[str, dict]:
+    """
+    Report connection pool statistics for every async engine in the registry.
+
+    Returns:
+        dict[str, dict]: A dictionary mapping each logical database to its pool statistics.
+    """
+    stats = {}
+    for database_name, engine in _async_engine_registry.items():
+        pool = engine.pool
+        stats[database_name] = {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "status": pool.status()
+        }
+    return stats
+
+async def async_execute_query(query, database_name: str = 'DB_NAME', output_format: str = 'dict'):
+    """
+    Execute a SQL query on the async engine and return the results.
+
+    Args:
+        query (sqlalchemy.sql.elements.TextClause): The SQL query to execute.
+        database_name (str): The name of the database to connect to. Default is 'DB_NAME'.
+        output_format (str): The format of the output: 'dict', 'tuple' or 'df'. Default is 'dict'.
+    Returns:
+        list[dict] | list[tuple] | pd.DataFrame: The query results.
+
+    Raises:
+        SQLAlchemyError: If there is an error executing the query.
+    """
+    if output_format not in QUERY_OUTPUT_FORMATS:
+        raise ValueError(f"Invalid output format: {output_format}")
+    try:
+        engine = get_async_engine(database_name)
+        async with engine.connect() as connection:
+            result = await connection.execute(query)
+            return format_query_result(result, output_format)
+    except SQLAlchemyError as e:
+        logging.error(f"Database error: {e}")
+        raise
+
+async def async_stream_query(query, database_name: str = 'DB_NAME', output_format: str = 'dict', batch_size: int = 1000):
+    """
+    Execute a SQL query with a server-side cursor on the async engine and lazily yield its rows.
+
+    Args:
+        query (sqlalchemy.sql.elements.TextClause): The SQL query to execute.
+        database_name (str): The name of the database to connect to. Default is 'DB_NAME'.
+        output_format (str): The format of each row: 'dict' or 'tuple'. Default is 'dict'.
+        batch_size (int): Number of rows fetched from the server per round trip. Default is 1000.
+
+    Yields:
+        dict | tuple: One row of the result at a time.
+
+    Raises:
+        SQLAlchemyError: If there is an error executing the query.
+    """
+    if output_format not in ('dict', 'tuple'):
+        raise ValueError(f"Invalid output format for streaming: {output_format}")
+    try:
+        engine = get_async_engine(database_name)
+        async with engine.connect() as connection:
+            # execution_options is a coroutine on an AsyncConnection
+            conn = await connection.execution_options(stream_results=True, max_row_buffer=batch_size)
+            result = await conn.stream(query)
+            rows = result.mappings() if output_format == 'dict' else result
+            async for partition in rows.partitions(batch_size):
+                for row in partition:
+                    yield dict(row) if output_format == 'dict' else tuple(row)
+    except SQLAlchemyError as e:
+        logging.error(f"Database error: {e}")
+        raise
+
+async def async_execute_update_query(query, params=None, database_name: str = 'DB_NAME', batch_mode: bool = False):
+    """
+    Execute a SQL update/insert/delete query on the async engine.
+
+    Args:
+        query (sqlalchemy.sql.elements.TextClause): The SQLAlchemy text query to execute.
+        params (dict, list[dict], or None): Parameters for the query. Can be:
+            - None: No parameters
+            - dict: Single set of parameters for one query execution
+            - list[dict]: Multiple sets of parameters for batch execution
+        database_name (str): The name of the database to connect to. Default is 'DB_NAME'.
+        batch_mode (bool): Whether to execute as a batch operation. Default is False.
+
+    Returns:
+        int: Number of rows affected by the query.
+
+    Raises:
+        SQLAlchemyError: If there is an error executing the query.
+    """
+    try:
+        engine = get_async_engine(database_name)
+        async with engine.begin() as connection:
+            if batch_mode and isinstance(params, list):
+                # Execute batch update as a single executemany in one transaction
+                result = await connection.execute(query, params)
+                affected_rows = result.rowcount
+            elif params is not None:
+                result = await connection.execute(query, params)
+                affected_rows = result.rowcount
+            else:
+                result = await connection.execute(query)
+                affected_rows = result.rowcount
+        logging.info(f"Update query executed successfully. Rows affected: {affected_rows}")
+        return affected_rows
+    except SQLAlchemyError as e:
+        logging.error(f"Database update error: {e}")
+        raise
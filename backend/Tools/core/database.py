@@ -1,6 +1,7 @@
 # backend/Tools/core/database.py
 import os
 from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import inspect
 import pandas as pd
@@ -8,34 +9,136 @@ import logging
 from dotenv import load_dotenv
 import json
 import sys
+import threading
+import time
+from typing import Optional
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 sys.path.append(project_root)
 # from backend.Tools.schemas import ALLOWED_KEYS
 load_dotenv()
 
+# Pool configuration shared by every engine in the registry
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+
+# Process-wide registry of long-lived engines: logical database name (i.e. 'DB_NAME') -> Engine
+_engine_registry = {}
+_engine_registry_lock = threading.Lock()
+
+def get_database_url(database_name: str = 'DB_NAME', driver: str = 'pymysql') -> str:
+    """
+    Build the SQLAlchemy URL for a logical database from the environment variables.
+
+    Args:
+        database_name (str): The environment variable holding the database name. Default is 'DB_NAME'.
+        driver (str): The MySQL DBAPI driver to use. Default is 'pymysql'.
+
+    Returns:
+        str: The database URL.
+    """
+    HOST = os.getenv('DB_HOST')
+    USER = os.getenv('DB_USER')
+    DBNAME = os.getenv(database_name)
+    PASSWORD = os.getenv('DB_PASSWORD')
+    return f"mysql+{driver}://{USER}:{PASSWORD}@{HOST}/{DBNAME}"
+
+def create_pooled_engine(database_name: str = 'DB_NAME'):
+    """
+    Create a pooled engine for a logical database.
+
+    The engine keeps up to DB_POOL_SIZE connections open (plus DB_MAX_OVERFLOW temporary ones),
+    pings connections before handing them out and recycles them after DB_POOL_RECYCLE seconds
+    so that connections dropped by the MySQL server are never reused.
+
+    Args:
+        database_name (str): The environment variable holding the database name. Default is 'DB_NAME'.
+
+    Returns:
+        Engine: A SQLAlchemy engine backed by a QueuePool.
+    """
+    print("Creating database url")
+    DATABASE_URL = get_database_url(database_name)
+    engine = create_engine(
+        DATABASE_URL,
+        poolclass=QueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True
+    )
+    print(f"Connected to {os.getenv(database_name)} on {os.getenv('DB_HOST')}")
+    return engine
+
+def init_engines(database_names: tuple[str, ...] = ('DB_NAME', 'DB_NAME1')) -> None:
+    """
+    Create the pooled engines for every configured logical database.
+    Databases whose environment variable is not set are skipped.
+
+    Args:
+        database_names (tuple[str, ...]): The environment variables holding the database names.
+    """
+    for database_name in database_names:
+        if not os.getenv(database_name):
+            logging.warning(f"{database_name} is not set. Skipping engine creation.")
+            continue
+        get_db_connection(database_name)
+
+def dispose_engines() -> None:
+    """
+    Dispose every engine in the registry and close their pooled connections.
+    """
+    with _engine_registry_lock:
+        for database_name, engine in _engine_registry.items():
+            engine.dispose()
+            logging.info(f"Disposed engine for {database_name}")
+        _engine_registry.clear()
+
+def get_pool_stats() -> dict[str, dict]:
+    """
+    Report connection pool statistics for every engine in the registry.
+
+    Returns:
+        dict[str, dict]: A dictionary mapping each logical database to its pool statistics.
+    """
+    stats = {}
+    with _engine_registry_lock:
+        for database_name, engine in _engine_registry.items():
+            pool = engine.pool
+            stats[database_name] = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "max_overflow": DB_MAX_OVERFLOW,
+                "status": pool.status()
+            }
+    return stats
+
 def get_db_connection(database_name: str = 'DB_NAME'):
     """
-    Establish a connection to the MySQL database using SQLAlchemy.
+    Return the long-lived pooled engine for a logical database, creating it on first use.
+
+    Args:
+        database_name (str): The environment variable holding the database name. Default is 'DB_NAME'.
 
     Returns:
-        session: A SQLAlchemy session object for interacting with the database.
+        Engine: The SQLAlchemy engine for the database.
 
     Raises:
         Exception: If there is an error connecting to the database.
     """
+    engine = _engine_registry.get(database_name)
+    if engine is not None:
+        return engine
     try:
-        # Get the database credentials from the environment variables
-        HOST = os.getenv('DB_HOST')
-        USER = os.getenv('DB_USER')
-        DBNAME = os.getenv(database_name)
-        PASSWORD = os.getenv('DB_PASSWORD')
-        print("Creating database url")
-        # Create the database URL
-        DATABASE_URL = f"mysql+pymysql://{USER}:{PASSWORD}@{HOST}/{DBNAME}"
-        
-        # Create an engine
-        engine = create_engine(DATABASE_URL)
-        print(f"Connected to {DBNAME} on {HOST}")
+        with _engine_registry_lock:
+            engine = _engine_registry.get(database_name)
+            if engine is None:
+                engine = create_pooled_engine(database_name)
+                _engine_registry[database_name] = engine
         return engine
     except Exception as e:
         logging.error(f"Error connecting to the database: {e}")
@@ -43,13 +146,28 @@ def get_db_connection(database_name: str = 'DB_NAME'):
 
 def get_json_keys(table: str, json_column: str, database_name: str = 'DB_NAME'):
     """
-    Query a sample of rows from a JSON column and return the union of keys.
+    Return the union of keys found in a JSON column.
+    Keys are read from the persisted JSON key catalog, which is refreshed incrementally from the
+    `updated_at` high-water mark when stale. Tables without an `updated_at` column fall back to a scan.
+    """
+    # Imported here because the catalog module itself streams its rows through this module
+    from backend.Tools.core.json_key_catalog import refresh_json_key_catalog_if_stale, get_catalog_keys
+    try:
+        refresh_json_key_catalog_if_stale(table, json_column, database_name)
+        return get_catalog_keys(table, json_column, database_name)
+    except Exception as e:
+        logging.warning(f"JSON key catalog unavailable for {table}.{json_column}, scanning the table: {e}")
+    return scan_json_keys(table, json_column, database_name)
+
+def scan_json_keys(table: str, json_column: str, database_name: str = 'DB_NAME'):
+    """
+    Scan every row of a JSON column and return the union of keys.
     """
     query = text(f"SELECT {json_column} FROM {table} WHERE {json_column} IS NOT NULL;")
     try:
-        results = execute_query(query, database_name)
         keys = set()
-        for row in results:
+        # Stream the rows so the whole JSON column is never held in memory at once
+        for row in stream_query(query, database_name):
             value = row.get(json_column)
             if value:
                 try:
@@ -98,64 +216,251 @@ def get_database_schema(database_name: str = 'DB_NAME', table_names: list[str] =
                 col_details["json_keys"] = json_keys
             table_info["columns"].append(col_details)
         schema["tables"].append(table_info)
-    engine.dispose()
     return schema
 
+QUERY_OUTPUT_FORMATS = ('dict', 'tuple', 'df')
+
+def format_query_result(result, output_format: str = 'dict'):
+    """
+    Convert a SQLAlchemy result into the requested output format.
+    A DataFrame is only built when 'df' is requested.
+
+    Args:
+        result (sqlalchemy.engine.Result): The buffered result of an executed query.
+        output_format (str): One of 'dict', 'tuple' or 'df'. Default is 'dict'.
+
+    Returns:
+        list[dict] | list[tuple] | pd.DataFrame: The formatted rows.
+    """
+    if output_format == 'dict':
+        return [dict(row) for row in result.mappings()]
+    elif output_format == 'tuple':
+        return [tuple(row) for row in result]
+    elif output_format == 'df':
+        columns = list(result.keys())
+        return pd.DataFrame(result.fetchall(), columns=columns)
+    else:
+        raise ValueError(f"Invalid output format: {output_format}")
+
 def execute_query(query, database_name: str = 'DB_NAME', output_format: str = 'dict'):
     """
     Execute a SQL query using SQLAlchemy and return the results.
 
+    Rows are read straight from the cursor, so the default 'dict' and 'tuple' formats
+    never build an intermediate DataFrame.
+
     Args:
-        query (str): The SQL query to execute.
-        output_format (str): The format of the output. Default is 'dict'.
+        query (str | sqlalchemy.sql.elements.TextClause): The SQL query to execute.
         database_name (str): The name of the database to connect to. Default is 'DB_NAME'.
+        output_format (str): The format of the output: 'dict', 'tuple' or 'df'. Default is 'dict'.
     Returns:
-        list[dict]: A list of dictionaries representing the query results.
+        list[dict] | list[tuple] | pd.DataFrame: The query results.
 
     Raises:
         SQLAlchemyError: If there is an error executing the query.
     """
-    engine = None
+    if output_format not in QUERY_OUTPUT_FORMATS:
+        raise ValueError(f"Invalid output format: {output_format}")
+    if isinstance(query, str):
+        query = text(query)
     try:
-        # Get a database session
+        # Get the pooled engine for this database
         print("Getting database connection")
         engine = get_db_connection(database_name)
         
         # Execute the query
-        if engine is not None:
-            print("Executing query")
-            result = pd.read_sql(query, engine)
-            if output_format == 'dict':
-                formatted_result = result.to_dict(orient='records')
-            elif output_format == 'df':
-                formatted_result = result
-            else:
-                raise ValueError(f"Invalid output format: {output_format}")
-            print("Query executed successfully")
-        else:
-            print("No engine found")
-            formatted_result = []
-        
+        print("Executing query")
+        with engine.connect() as connection:
+            result = connection.execute(query)
+            formatted_result = format_query_result(result, output_format)
+        print("Query executed successfully")
         return formatted_result
     except SQLAlchemyError as e:
         logging.error(f"Database error: {e}")
         raise
-    finally:
-        if engine:
-            engine.dispose()
 
-from cachetools import TTLCache, cached
+def stream_query(query, database_name: str = 'DB_NAME', output_format: str = 'dict', batch_size: int = 1000):
+    """
+    Execute a SQL query with a server-side cursor and lazily yield its rows.
+
+    Only batch_size rows are held in memory at a time, which keeps large result sets
+    (i.e. full scans of the samples table) from being materialized at once.
+
+    Args:
+        query (str | sqlalchemy.sql.elements.TextClause): The SQL query to execute.
+        database_name (str): The name of the database to connect to. Default is 'DB_NAME'.
+        output_format (str): The format of each row: 'dict' or 'tuple'. Default is 'dict'.
+        batch_size (int): Number of rows fetched from the server per round trip. Default is 1000.
 
-# Create a cache that holds 1 schema and expires after 1800 seconds (30 minutes)
-schema_cache = TTLCache(maxsize=1, ttl=300)
+    Yields:
+        dict | tuple: One row of the result at a time.
+
+    Raises:
+        SQLAlchemyError: If there is an error executing the query.
+    """
+    if output_format not in ('dict', 'tuple'):
+        raise ValueError(f"Invalid output format for streaming: {output_format}")
+    if isinstance(query, str):
+        query = text(query)
+    try:
+        engine = get_db_connection(database_name)
+        with engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, max_row_buffer=batch_size).execute(query)
+            rows = result.mappings() if output_format == 'dict' else result
+            for partition in rows.partitions(batch_size):
+                for row in partition:
+                    yield dict(row) if output_format == 'dict' else tuple(row)
+    except SQLAlchemyError as e:
+        logging.error(f"Database error: {e}")
+        raise
+
+# Seconds after which a cached schema is considered stale and refreshed in the background
+SCHEMA_CACHE_TTL = int(os.getenv('SCHEMA_CACHE_TTL', 300))
+
+class SchemaCache:
+    """
+    Stale-while-revalidate cache of database schemas keyed on (database_name, table_names).
+
+    A fresh entry is returned directly. A stale entry is still returned immediately while a
+    background thread rebuilds it, so only the very first request for a key waits on the database.
+    """
+
+    def __init__(self, loader, ttl: int = SCHEMA_CACHE_TTL):
+        self._loader = loader
+        self._ttl = ttl
+        self._entries = {}  # key -> (schema, loaded_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._metrics = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "last_refresh_latency": None,
+            "total_refresh_latency": 0.0
+        }
+
+    @staticmethod
+    def _make_key(database_name: str, table_names) -> tuple:
+        return (database_name, tuple(sorted(table_names)))
+
+    def _key_lock(self, key: tuple) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _load(self, key: tuple):
+        start_time = time.time()
+        try:
+            schema = self._loader(key[0], list(key[1]))
+        except Exception:
+            with self._lock:
+                self._metrics["refresh_errors"] += 1
+            raise
+        latency = time.time() - start_time
+        with self._lock:
+            self._entries[key] = (schema, time.time())
+            self._metrics["refreshes"] += 1
+            self._metrics["last_refresh_latency"] = latency
+            self._metrics["total_refresh_latency"] += latency
+        logging.info(f"Refreshed schema for {key} in {latency:.2f} seconds")
+        return schema
+
+    def _refresh_in_background(self, key: tuple) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                with self._key_lock(key):
+                    self._load(key)
+            except Exception as e:
+                logging.error(f"Background schema refresh failed for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"schema-refresh-{key[0]}", daemon=True).start()
+
+    def get(self, database_name: str = 'DB_NAME', table_names: list[str] = ['samples']):
+        """
+        Return the schema for a database and table set, serving a stale copy while it is refreshed.
+        """
+        key = self._make_key(database_name, table_names)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                schema, loaded_at = entry
+                if time.time() - loaded_at < self._ttl:
+                    self._metrics["hits"] += 1
+                    return schema
+                self._metrics["stale_hits"] += 1
+            else:
+                self._metrics["misses"] += 1
+        if entry is not None:
+            self._refresh_in_background(key)
+            return entry[0]
+        # Cold miss: load once, other callers for the same key wait on the same load
+        with self._key_lock(key):
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            return self._load(key)
+
+    def warm(self, database_name: str = 'DB_NAME', table_names: list[str] = ['samples']) -> None:
+        """
+        Start loading a schema in the background so that the first request does not wait on it.
+        """
+        self._refresh_in_background(self._make_key(database_name, table_names))
+
+    def invalidate(self, database_name: Optional[str] = None) -> None:
+        """
+        Mark cached schemas as stale (all of them or those of one database) and refresh them in the background.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if database_name is None or key[0] == database_name]
+            for key in keys:
+                schema, _ = self._entries[key]
+                self._entries[key] = (schema, 0.0)
+        for key in keys:
+            self._refresh_in_background(key)
+
+    def stats(self) -> dict:
+        """
+        Report the cache hit/miss counters and refresh latencies.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["entries"] = len(self._entries)
+            metrics["refreshing"] = len(self._refreshing)
+        refreshes = metrics.pop("total_refresh_latency")
+        metrics["avg_refresh_latency"] = refreshes / metrics["refreshes"] if metrics["refreshes"] else None
+        return metrics
+
+schema_cache = SchemaCache(get_database_schema)
 
-@cached(cache=schema_cache)
 def get_cached_database_schema(database_name: str = 'DB_NAME', table_names: list[str] = ['samples']):
     """
     Retrieve the database schema using caching.
-    This will query the database only if the cache has expired.
+    A stale schema is served immediately and rebuilt in the background.
+    """
+    return schema_cache.get(database_name, table_names)
+
+def invalidate_schema_cache(database_name: Optional[str] = None) -> None:
+    """
+    Mark the cached schemas as stale, i.e. after the metadata of samples was updated.
+    """
+    schema_cache.invalidate(database_name)
+
+def get_schema_cache_stats() -> dict:
+    """
+    Report the schema cache metrics.
     """
-    return get_database_schema()
+    return schema_cache.stats()
 
 def execute_update_query(query, params=None, database_name: str = 'DB_NAME', batch_mode: bool = False):
     """
@@ -176,25 +481,20 @@ def execute_update_query(query, params=None, database_name: str = 'DB_NAME', bat
     Raises:
         SQLAlchemyError: If there is an error executing the query.
     """
-    engine = None
     try:
-        # Get a database connection
+        # Get the pooled engine for this database
         print("Getting database connection")
         engine = get_db_connection(database_name)
         
         # Execute the query
         if engine is not None:
             print("Executing update query")
-            connection = engine.connect()
-            
-            with connection.begin():
+            # The connection is returned to the pool when the block exits, even on error
+            with engine.connect() as connection, connection.begin():
                 if batch_mode and isinstance(params, list):
-                    # Execute batch update
-                    total_affected = 0
-                    for param_set in params:
-                        result = connection.execute(query, param_set)
-                        total_affected += result.rowcount
-                    affected_rows = total_affected
+                    # Execute batch update as a single executemany in one transaction
+                    result = connection.execute(query, params)
+                    affected_rows = result.rowcount
                 elif params is not None:
                     # Execute single update with parameters
                     result = connection.execute(query, params)
@@ -204,7 +504,6 @@ def execute_update_query(query, params=None, database_name: str = 'DB_NAME', bat
                     result = connection.execute(query)
                     affected_rows = result.rowcount
             
-            connection.close()
             print(f"Update query executed successfully. Rows affected: {affected_rows}")
             return affected_rows
         else:
@@ -213,6 +512,3 @@ def execute_update_query(query, params=None, database_name: str = 'DB_NAME', bat
     except SQLAlchemyError as e:
         logging.error(f"Database update error: {e}")
         raise
-    finally:
-        if engine:
-            engine.dispose()
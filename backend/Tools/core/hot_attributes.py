@@ -0,0 +1,249 @@
+# backend/Tools/core/hot_attributes.py
+import os
+import re
+import sys
+import time
+import logging
+import threading
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+from backend.Tools.core.database import execute_query, get_db_connection
+from backend.Tools.core.json_key_catalog import get_json_key_catalog
+from backend.Tools.core.local_store import local_db
+
+load_dotenv()
+
+HOT_ATTRIBUTES_STORE = "hot_attributes"
+# Keys indexed before the query log has enough history to rank them
+HOT_ATTRIBUTE_SEEDS = [key.strip() for key in os.getenv('HOT_ATTRIBUTE_SEEDS', 'Genotype,Cohort,Study,Scientist,Species').split(',') if key.strip()]
+# Number of JSON keys kept as indexed generated columns
+HOT_ATTRIBUTE_COUNT = int(os.getenv('HOT_ATTRIBUTE_COUNT', 8))
+# Whether the refresher may add the generated columns and their indexes itself (needs ALTER privileges)
+HOT_ATTRIBUTES_MANAGE_DDL = os.getenv('HOT_ATTRIBUTES_MANAGE_DDL', 'false').lower() == 'true'
+# Seconds between two refreshes of the indexed columns
+HOT_ATTRIBUTE_REFRESH_INTERVAL = int(os.getenv('HOT_ATTRIBUTE_REFRESH_INTERVAL', 3600))
+# Characters of a value kept in the index, longer values are still matched by the JSON recheck
+HOT_COLUMN_LENGTH = 255
+
+HOT_COLUMN_PREFIX = "hot_"
+_HOT_COLUMN_PATTERN = re.compile(r"^hot_[a-z0-9_]{1,60}$")
+# i.e. left(json_unquote(json_extract(`json_metadata`,_utf8mb4'$.Genotype')),255)
+_GENERATION_KEY_PATTERN = re.compile(r"\$\.\\?[\"']?([^\"'\\)]+)")
+
+logger = logging.getLogger(__name__)
+
+_indexed_lock = threading.Lock()
+_indexed = {}  # (database_name, table, json_column) -> ({json_key: column}, loaded_at)
+_metrics = {"indexed_filters": 0, "scanned_filters": 0}
+
+def hot_column_name(json_key: str) -> str:
+    """
+    Return the generated column holding a JSON key (i.e. 'hot_genotype' for 'Genotype').
+    """
+    return HOT_COLUMN_PREFIX + re.sub(r"[^a-z0-9]+", "_", json_key.lower()).strip("_")[:60]
+
+def _create_query_log_table(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS attribute_queries (
+            json_key TEXT PRIMARY KEY,
+            hits INTEGER NOT NULL DEFAULT 0,
+            last_queried REAL
+        )
+    """)
+
+def record_attribute_queries(json_keys: list[str]) -> None:
+    """
+    Count a search filtering on these JSON keys in the query log used to rank the hot attributes.
+    """
+    with local_db(HOT_ATTRIBUTES_STORE) as conn:
+        _create_query_log_table(conn)
+        conn.executemany(
+            """
+            INSERT INTO attribute_queries (json_key, hits, last_queried) VALUES (?, 1, ?)
+            ON CONFLICT(json_key) DO UPDATE SET hits = hits + 1, last_queried = excluded.last_queried
+            """,
+            [(key, time.time()) for key in set(json_keys)]
+        )
+
+def select_hot_attributes(
+    count: int = HOT_ATTRIBUTE_COUNT,
+    table: str = 'samples',
+    json_column: str = 'json_metadata',
+    database_name: str = 'DB_NAME'
+) -> list[dict]:
+    """
+    Rank the JSON keys worth indexing.
+
+    Keys are ranked by the number of searches filtering on them, then by whether they are seed keys,
+    then by the number of samples having them in the JSON key catalog. Keys absent from the catalog
+    are left out so that no column is generated for a key no sample has.
+
+    Args:
+        count (int): The number of keys to return.
+        table (str): The table holding the JSON column. Default is 'samples'.
+        json_column (str): The JSON column. Default is 'json_metadata'.
+        database_name (str): The name of the database. Default is 'DB_NAME'.
+
+    Returns:
+        list[dict]: The json_key, query hits and catalog frequency of the hottest keys.
+    """
+    frequencies = {}
+    for entry in get_json_key_catalog(table, json_column, database_name):
+        frequencies[entry["json_key"]] = frequencies.get(entry["json_key"], 0) + entry["frequency"]
+    with local_db(HOT_ATTRIBUTES_STORE) as conn:
+        _create_query_log_table(conn)
+        hits = dict(conn.execute("SELECT json_key, hits FROM attribute_queries").fetchall())
+    ranked = sorted(
+        frequencies,
+        key=lambda key: (-hits.get(key, 0), key not in HOT_ATTRIBUTE_SEEDS, -frequencies[key], key)
+    )
+    return [
+        {"json_key": key, "hits": hits.get(key, 0), "frequency": frequencies[key]}
+        for key in ranked[:count]
+    ]
+
+def load_indexed_attributes(table: str = 'samples', json_column: str = 'json_metadata', database_name: str = 'DB_NAME') -> dict:
+    """
+    Read the indexed generated hot_ columns of a table from information_schema.
+
+    Returns:
+        dict: The JSON key each indexed column extracts mapped to the column name.
+    """
+    query = text("""
+        SELECT c.COLUMN_NAME AS column_name, c.GENERATION_EXPRESSION AS expression
+        FROM information_schema.COLUMNS c
+        JOIN information_schema.STATISTICS s
+          ON s.TABLE_SCHEMA = c.TABLE_SCHEMA AND s.TABLE_NAME = c.TABLE_NAME
+         AND s.COLUMN_NAME = c.COLUMN_NAME AND s.SEQ_IN_INDEX = 1
+        WHERE c.TABLE_SCHEMA = DATABASE() AND c.TABLE_NAME = :table
+          AND c.COLUMN_NAME LIKE 'hot\\_%' AND c.GENERATION_EXPRESSION LIKE :json_column;
+    """).bindparams(table=table, json_column=f"%{json_column}%")
+    indexed = {}
+    for row in execute_query(query, database_name):
+        column, match = row["column_name"], _GENERATION_KEY_PATTERN.search(row["expression"] or "")
+        if match and _HOT_COLUMN_PATTERN.match(column):
+            indexed[match.group(1)] = column
+    return indexed
+
+def get_indexed_attributes(
+    table: str = 'samples',
+    json_column: str = 'json_metadata',
+    database_name: str = 'DB_NAME',
+    max_age: int = HOT_ATTRIBUTE_REFRESH_INTERVAL
+) -> dict:
+    """
+    Return the indexed hot columns of a table, reloaded from information_schema when older than max_age seconds.
+    An unreadable information_schema leaves every filter on JSON_EXTRACT.
+
+    Returns:
+        dict: The JSON key each indexed column extracts mapped to the column name.
+    """
+    key = (database_name, table, json_column)
+    with _indexed_lock:
+        entry = _indexed.get(key)
+        if entry is not None and time.time() - entry[1] < max_age:
+            return entry[0]
+        try:
+            indexed = load_indexed_attributes(table, json_column, database_name)
+        except Exception as e:
+            logger.warning(f"Could not read the hot attribute columns of {table}: {e}")
+            indexed = {}
+        _indexed[key] = (indexed, time.time())
+        return indexed
+
+def hot_column_ddl(json_key: str, table: str = 'samples', json_column: str = 'json_metadata') -> str:
+    """
+    Return the DDL adding the indexed virtual column of a JSON key.
+
+    The column is virtual, so adding it rewrites no rows, and the index is built online. Values
+    are truncated to HOT_COLUMN_LENGTH characters so that no insert fails on a long value.
+    """
+    column = hot_column_name(json_key)
+    # Quoted so that keys with spaces or dots are valid JSON paths
+    path = '$."' + json_key.replace('"', '\\"').replace("'", "''") + '"'
+    return (
+        f"ALTER TABLE {table} "
+        f"ADD COLUMN {column} VARCHAR({HOT_COLUMN_LENGTH}) COLLATE utf8mb4_bin "
+        f"GENERATED ALWAYS AS (LEFT(JSON_UNQUOTE(JSON_EXTRACT({json_column}, '{path}')), {HOT_COLUMN_LENGTH})) VIRTUAL, "
+        f"ADD INDEX idx_{column} ({column}), ALGORITHM=INPLACE, LOCK=NONE"
+    )
+
+def sync_hot_attribute_columns(
+    table: str = 'samples',
+    json_column: str = 'json_metadata',
+    database_name: str = 'DB_NAME',
+    manage_ddl: bool = HOT_ATTRIBUTES_MANAGE_DDL
+) -> dict:
+    """
+    Compare the hottest JSON keys with the indexed columns and add the missing columns.
+
+    Without manage_ddl the statements are only returned, for a DBA to apply. Columns of keys that
+    are no longer hot are reported but never dropped automatically.
+
+    Returns:
+        dict: The hot keys, the indexed columns, the keys added, the pending DDL and the cold columns.
+    """
+    hot_keys = [entry["json_key"] for entry in select_hot_attributes(table=table, json_column=json_column, database_name=database_name)]
+    indexed = get_indexed_attributes(table, json_column, database_name, max_age=0)
+    added, pending = [], []
+    for json_key in hot_keys:
+        if json_key in indexed:
+            continue
+        ddl = hot_column_ddl(json_key, table, json_column)
+        if not manage_ddl:
+            pending.append(ddl)
+            continue
+        try:
+            with get_db_connection(database_name).begin() as connection:
+                # Sent as is, a key may contain characters text() would read as bind parameters
+                connection.exec_driver_sql(ddl)
+            added.append(json_key)
+            logger.info(f"Added the indexed column {hot_column_name(json_key)} for {json_key}")
+        except Exception as e:
+            logger.error(f"Error adding the indexed column for {json_key}: {e}")
+            pending.append(ddl)
+    if added:
+        indexed = get_indexed_attributes(table, json_column, database_name, max_age=0)
+    return {
+        "hot_keys": hot_keys,
+        "indexed": indexed,
+        "added": added,
+        "pending_ddl": pending,
+        "cold_columns": [column for json_key, column in indexed.items() if json_key not in hot_keys]
+    }
+
+def build_attribute_condition(json_key: str, col_param: str, term_param: str, indexed: dict) -> str:
+    """
+    Build the WHERE condition matching a JSON key against a term, through its indexed column when there is one.
+
+    The JSON_EXTRACT comparison is kept as a recheck on the rows found through the index, so the
+    result is exactly the one of the full scan (case, numeric values and truncated long values).
+
+    Args:
+        json_key (str): The JSON key filtered on (i.e. 'Genotype').
+        col_param (str): The bind parameter holding the JSON path.
+        term_param (str): The bind parameter holding the term.
+        indexed (dict): The indexed columns from get_indexed_attributes.
+
+    Returns:
+        str: The SQL condition.
+    """
+    condition = f"JSON_EXTRACT(json_metadata, :{col_param}) = :{term_param}"
+    column = indexed.get(json_key)
+    if column is None or not _HOT_COLUMN_PATTERN.match(column):
+        _metrics["scanned_filters"] += 1
+        return condition
+    _metrics["indexed_filters"] += 1
+    return f"{column} = LEFT(:{term_param}, {HOT_COLUMN_LENGTH}) AND {condition}"
+
+def get_hot_attribute_stats() -> dict:
+    """
+    Report the indexed hot columns and how many filters used them or scanned the JSON.
+    """
+    with _indexed_lock:
+        indexed = {f"{key[0]}.{key[1]}.{key[2]}": dict(entry[0]) for key, entry in _indexed.items()}
+    return {**_metrics, "indexed": indexed}
@@ -0,0 +1,321 @@
+# backend/Tools/core/jobs.py
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+from dotenv import load_dotenv
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+from backend.Tools.core.local_store import local_db
+
+load_dotenv()
+
+JOB_STORE = "jobs"
+# Number of jobs run concurrently by the local worker pool
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+# Seconds between two heartbeats of the jobs a process owns, which also poll their cancel requests
+JOB_HEARTBEAT_INTERVAL = int(os.getenv('JOB_HEARTBEAT_INTERVAL', 10))
+# Unfinished jobs whose owner has not sent a heartbeat for this many seconds are failed
+JOB_STALE_AFTER = int(os.getenv('JOB_STALE_AFTER', 60))
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED_JOB_STATUSES = ("succeeded", "failed", "cancelled")
+
+logger = logging.getLogger(__name__)
+
+# A job handler receives the job payload and a progress callback and returns a JSON-serializable result
+JobHandler = Callable[[dict, Callable[[dict], None]], Awaitable[Any]]
+
+def _create_jobs_table(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            session_id TEXT,
+            status TEXT NOT NULL,
+            payload TEXT,
+            progress TEXT,
+            result TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            owner TEXT,
+            heartbeat REAL,
+            cancel_requested INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    # Tables created before jobs had an owner get the new columns
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+    for column, definition in (("owner", "TEXT"), ("heartbeat", "REAL"), ("cancel_requested", "INTEGER NOT NULL DEFAULT 0")):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+    conn.execute("CREATE INDEX IF NOT EXISTS jobs_session_idx ON jobs (session_id, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_idx ON jobs (status, heartbeat)")
+
+JOB_COLUMNS = (
+    "job_id, kind, session_id, status, progress, result, error, created_at, started_at, finished_at, "
+    "owner, cancel_requested"
+)
+
+def _row_to_job(row) -> dict:
+    job_id, kind, session_id, status, progress, result, error, created_at, started_at, finished_at, owner, cancel_requested = row
+    return {
+        "job_id": job_id,
+        "kind": kind,
+        "session_id": session_id,
+        "status": status,
+        "progress": json.loads(progress) if progress else None,
+        "result": json.loads(result) if result else None,
+        "error": error,
+        "created_at": created_at,
+        "started_at": started_at,
+        "finished_at": finished_at,
+        "owner": owner,
+        "cancel_requested": bool(cancel_requested)
+    }
+
+class JobQueue:
+    """
+    Persistent background job queue served by a pool of asyncio workers.
+
+    Jobs are recorded in a local SQLite table so that their status, progress and result survive the
+    request that submitted them. Handlers are registered per job kind and run on the application's
+    event loop, so a long-running job never holds an HTTP request.
+
+    Several backend processes can share the table: each job is owned by the process that queued it,
+    which sends heartbeats for it. Only jobs whose owner stopped sending heartbeats are failed, and
+    a job another process runs is cancelled through a flag its owner polls.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        self._workers = workers
+        self._handlers: dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: list[asyncio.Task] = []
+        self._running: dict[str, asyncio.Task] = {}
+        # i.e. 'backend-1:4242:1f0c2a9b'
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """
+        Register the coroutine function that runs the jobs of a kind.
+
+        Args:
+            kind (str): The job kind (i.e. 'update_metadata').
+            handler (JobHandler): Called with the job payload and a progress callback.
+        """
+        self._handlers[kind] = handler
+
+    async def start(self) -> None:
+        """
+        Start the worker pool and the heartbeat. Jobs left by processes that are no longer alive are marked as failed.
+        """
+        if self._worker_tasks:
+            return
+        with local_db(JOB_STORE) as conn:
+            _create_jobs_table(conn)
+        self._fail_stale_jobs()
+        self._queue = asyncio.Queue()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}") for i in range(self._workers)
+        ]
+        self._worker_tasks.append(asyncio.create_task(self._heartbeat(), name="job-heartbeat"))
+        logger.info(f"Started {self._workers} job workers as {self.owner}")
+
+    async def stop(self) -> None:
+        """
+        Cancel the running jobs and stop the worker pool.
+        """
+        for task in list(self._running.values()):
+            task.cancel()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+        logger.info("Stopped job workers")
+
+    async def submit(self, kind: str, payload: dict, session_id: Optional[str] = None) -> str:
+        """
+        Record a new job and queue it for the workers.
+
+        Args:
+            kind (str): The job kind. A handler must be registered for it.
+            payload (dict): JSON-serializable arguments passed to the handler.
+            session_id (Optional[str]): The session that submitted the job.
+
+        Returns:
+            str: The ID of the job.
+
+        Raises:
+            ValueError: If no handler is registered for the kind.
+            RuntimeError: If the worker pool was not started.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No job handler registered for {kind}")
+        if self._queue is None:
+            raise RuntimeError("The job queue is not started")
+        job_id = str(uuid.uuid4())
+        with local_db(JOB_STORE) as conn:
+            _create_jobs_table(conn)
+            conn.execute(
+                """
+                INSERT INTO jobs (job_id, kind, session_id, status, payload, created_at, owner, heartbeat)
+                VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)
+                """,
+                (job_id, kind, session_id, json.dumps(payload), time.time(), self.owner, time.time())
+            )
+        await self._queue.put(job_id)
+        logger.info(f"Queued {kind} job {job_id} for session {session_id}")
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """
+        Return the status, progress and result of a job or None if it does not exist.
+        """
+        with local_db(JOB_STORE) as conn:
+            _create_jobs_table(conn)
+            row = conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def list_jobs(self, session_id: Optional[str] = None, limit: int = 50) -> list[dict]:
+        """
+        Return the most recent jobs, optionally only those of a session.
+        """
+        query = f"SELECT {JOB_COLUMNS} FROM jobs"
+        params: list = []
+        if session_id:
+            query += " WHERE session_id = ?"
+            params.append(session_id)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with local_db(JOB_STORE) as conn:
+            _create_jobs_table(conn)
+            rows = conn.execute(query, params).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """
+        Cancel a queued or running job. Finished jobs are left unchanged.
+
+        A queued job is cancelled at once. A running job is flagged, and is cancelled by the
+        process running it, immediately if it is this one or at its next heartbeat otherwise.
+
+        Returns:
+            Optional[dict]: The job after the cancellation request or None if it does not exist.
+        """
+        job = self.get_job(job_id)
+        if job is None or job["status"] in FINISHED_JOB_STATUSES:
+            return job
+        with local_db(JOB_STORE) as conn:
+            conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,))
+            # Claimed like a worker would, so the job cannot start in the meantime
+            cancelled = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', error = ?, finished_at = ? WHERE job_id = ? AND status = 'queued'",
+                ("Cancelled before it started", time.time(), job_id)
+            ).rowcount
+        task = self._running.get(job_id)
+        if not cancelled and task is not None:
+            # The worker records the cancellation once the handler has unwound
+            task.cancel()
+        logger.info(f"Cancellation requested for job {job_id}")
+        return self.get_job(job_id)
+
+    def _fail_stale_jobs(self) -> None:
+        # Jobs whose owner stopped sending heartbeats (i.e. a process that was killed or restarted)
+        with local_db(JOB_STORE) as conn:
+            failed = conn.execute(
+                """
+                UPDATE jobs SET status = 'failed', error = ?, finished_at = ?
+                WHERE status IN ('queued', 'running') AND (heartbeat IS NULL OR heartbeat < ?)
+                """,
+                ("Interrupted: the process running the job stopped", time.time(), time.time() - JOB_STALE_AFTER)
+            ).rowcount
+        if failed:
+            logger.warning(f"Marked {failed} jobs of stopped processes as failed")
+
+    async def _heartbeat(self) -> None:
+        while True:
+            try:
+                with local_db(JOB_STORE) as conn:
+                    conn.execute(
+                        "UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status IN ('queued', 'running')",
+                        (time.time(), self.owner)
+                    )
+                    requested = [
+                        job_id for (job_id,) in conn.execute(
+                            "SELECT job_id FROM jobs WHERE owner = ? AND status = 'running' AND cancel_requested = 1",
+                            (self.owner,)
+                        )
+                    ]
+                for job_id in requested:
+                    task = self._running.get(job_id)
+                    if task is not None and not task.done():
+                        task.cancel()
+                self._fail_stale_jobs()
+            except Exception as e:
+                logger.error(f"Error in the job heartbeat: {e}")
+            await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+
+    def _set_progress(self, job_id: str, progress: dict) -> None:
+        with local_db(JOB_STORE) as conn:
+            conn.execute("UPDATE jobs SET progress = ? WHERE job_id = ?", (json.dumps(progress), job_id))
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        with local_db(JOB_STORE) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE job_id = ?",
+                (status, json.dumps(result, default=str) if result is not None else None, error, time.time(), job_id)
+            )
+
+    async def _run(self, job_id: str) -> None:
+        with local_db(JOB_STORE) as conn:
+            # Claimed with a conditional update, so a job cancelled meanwhile is never started
+            claimed = conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, heartbeat = ? WHERE job_id = ? AND status = 'queued'",
+                (time.time(), time.time(), job_id)
+            ).rowcount
+            if not claimed:
+                return
+            kind, payload = conn.execute("SELECT kind, payload FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+        def progress(update: dict) -> None:
+            self._set_progress(job_id, update)
+
+        task = asyncio.create_task(self._handlers[kind](json.loads(payload), progress))
+        self._running[job_id] = task
+        try:
+            result = await task
+            self._finish(job_id, "succeeded", result=result)
+            logger.info(f"Job {job_id} succeeded")
+        except asyncio.CancelledError:
+            self._finish(job_id, "cancelled", error="Cancelled while running")
+            logger.info(f"Job {job_id} cancelled")
+            # Propagate the cancellation if the worker itself is stopping
+            current = asyncio.current_task()
+            if current is not None and current.cancelling():
+                raise
+        except Exception as e:
+            self._finish(job_id, "failed", error=str(e))
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+        finally:
+            self._running.pop(job_id, None)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+# Process-wide job queue, started and stopped with the application
+job_queue = JobQueue()
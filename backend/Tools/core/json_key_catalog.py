@@ -0,0 +1,245 @@
+# backend/Tools/core/json_key_catalog.py
+import os
+import sys
+import json
+import time
+import logging
+from typing import Optional
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+from backend.Tools.core.database import stream_query
+from backend.Tools.core.local_store import (
+    local_db,
+    get_high_water_mark,
+    set_high_water_mark,
+    get_last_refresh,
+    reset_index_state
+)
+
+load_dotenv()
+
+CATALOG_STORE = "json_key_catalog"
+# Seconds after which a read triggers an incremental refresh of the catalog
+JSON_KEY_CATALOG_REFRESH_INTERVAL = int(os.getenv('JSON_KEY_CATALOG_REFRESH_INTERVAL', 300))
+
+logger = logging.getLogger(__name__)
+
+def _catalog_source(table: str, json_column: str, database_name: str) -> str:
+    return f"{database_name}.{table}.{json_column}"
+
+def _create_catalog_tables(conn) -> None:
+    # Keys last seen on each sample so that an update can be diffed against them
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sample_json_keys (
+            source TEXT NOT NULL,
+            uuid TEXT NOT NULL,
+            sample_type TEXT NOT NULL,
+            json_keys TEXT NOT NULL,
+            PRIMARY KEY (source, uuid)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS json_key_catalog (
+            source TEXT NOT NULL,
+            sample_type TEXT NOT NULL,
+            json_key TEXT NOT NULL,
+            frequency INTEGER NOT NULL DEFAULT 0,
+            last_seen TEXT,
+            PRIMARY KEY (source, sample_type, json_key)
+        )
+    """)
+
+def _apply_sample_keys(conn, source: str, uuid: str, sample_type: str, new_keys: set, updated_at: str) -> None:
+    """
+    Diff the keys of one sample against the keys recorded for it and adjust the key frequencies.
+    """
+    row = conn.execute(
+        "SELECT sample_type, json_keys FROM sample_json_keys WHERE source = ? AND uuid = ?",
+        (source, uuid)
+    ).fetchone()
+    old_type, old_keys = (row[0], set(json.loads(row[1]))) if row else (sample_type, set())
+    if old_type != sample_type:
+        removed, added, kept = old_keys, new_keys, set()
+    else:
+        removed, added, kept = old_keys - new_keys, new_keys - old_keys, old_keys & new_keys
+
+    conn.executemany(
+        """
+        UPDATE json_key_catalog SET frequency = frequency - 1
+        WHERE source = ? AND sample_type = ? AND json_key = ?
+        """,
+        [(source, old_type, key) for key in removed]
+    )
+    conn.executemany(
+        """
+        INSERT INTO json_key_catalog (source, sample_type, json_key, frequency, last_seen) VALUES (?, ?, ?, 1, ?)
+        ON CONFLICT(source, sample_type, json_key) DO UPDATE SET
+            frequency = frequency + 1,
+            last_seen = MAX(COALESCE(last_seen, ''), excluded.last_seen)
+        """,
+        [(source, sample_type, key, updated_at) for key in added]
+    )
+    conn.executemany(
+        """
+        UPDATE json_key_catalog SET last_seen = MAX(COALESCE(last_seen, ''), ?)
+        WHERE source = ? AND sample_type = ? AND json_key = ?
+        """,
+        [(updated_at, source, sample_type, key) for key in kept]
+    )
+    conn.execute(
+        """
+        INSERT INTO sample_json_keys (source, uuid, sample_type, json_keys) VALUES (?, ?, ?, ?)
+        ON CONFLICT(source, uuid) DO UPDATE SET
+            sample_type = excluded.sample_type,
+            json_keys = excluded.json_keys
+        """,
+        (source, uuid, sample_type, json.dumps(sorted(new_keys)))
+    )
+
+def refresh_json_key_catalog(
+    table: str = 'samples',
+    json_column: str = 'json_metadata',
+    database_name: str = 'DB_NAME',
+    batch_size: int = 1000
+) -> int:
+    """
+    Incrementally refresh the JSON key catalog from the rows updated since the last refresh.
+
+    Rows are read from the `updated_at` high-water mark onwards, so the first call scans the whole
+    table and later calls only read the rows that changed. Reprocessing a row is idempotent because
+    its keys are diffed against the keys recorded for the same sample.
+
+    Args:
+        table (str): The table holding the JSON column. Default is 'samples'.
+        json_column (str): The JSON column to catalog. Default is 'json_metadata'.
+        database_name (str): The name of the database to connect to. Default is 'DB_NAME'.
+        batch_size (int): Number of rows processed per local transaction. Default is 1000.
+
+    Returns:
+        int: The number of rows processed.
+    """
+    source = _catalog_source(table, json_column, database_name)
+    start_time = time.time()
+    processed = 0
+    with local_db(CATALOG_STORE) as conn:
+        _create_catalog_tables(conn)
+        high_water_mark = get_high_water_mark(conn, source)
+        if high_water_mark:
+            query = text(f"""
+                SELECT uuid, {json_column}, updated_at FROM {table}
+                WHERE {json_column} IS NOT NULL AND updated_at >= :hwm
+                ORDER BY updated_at;
+            """).bindparams(hwm=high_water_mark)
+        else:
+            query = text(f"""
+                SELECT uuid, {json_column}, updated_at FROM {table}
+                WHERE {json_column} IS NOT NULL
+                ORDER BY updated_at;
+            """)
+
+        for row in stream_query(query, database_name, batch_size=batch_size):
+            uuid = row.get("uuid")
+            value = row.get(json_column)
+            if not uuid or not value:
+                continue
+            try:
+                json_data = json.loads(value)
+            except Exception as e:
+                logger.error(f"Error parsing JSON from {table}.{json_column} for {uuid}: {e}")
+                continue
+            new_keys = set(json_data.keys()) if isinstance(json_data, dict) else set()
+            updated_at = str(row.get("updated_at"))
+            _apply_sample_keys(conn, source, uuid, uuid.split("-")[0], new_keys, updated_at)
+            # Rows without updated_at do not move the mark, 'None' would sort after every timestamp
+            if row.get("updated_at") is not None:
+                high_water_mark = max(high_water_mark or '', updated_at)
+            processed += 1
+            if processed % batch_size == 0:
+                conn.commit()
+
+        conn.execute("DELETE FROM json_key_catalog WHERE source = ? AND frequency <= 0", (source,))
+        set_high_water_mark(conn, source, high_water_mark)
+    logger.info(f"Refreshed JSON key catalog for {source} with {processed} rows in {time.time() - start_time:.2f} seconds")
+    return processed
+
+def rebuild_json_key_catalog(table: str = 'samples', json_column: str = 'json_metadata', database_name: str = 'DB_NAME') -> int:
+    """
+    Drop the catalog of a JSON column and rebuild it from a full scan (i.e. after samples were deleted).
+
+    Returns:
+        int: The number of rows processed.
+    """
+    source = _catalog_source(table, json_column, database_name)
+    with local_db(CATALOG_STORE) as conn:
+        _create_catalog_tables(conn)
+        conn.execute("DELETE FROM json_key_catalog WHERE source = ?", (source,))
+        conn.execute("DELETE FROM sample_json_keys WHERE source = ?", (source,))
+        reset_index_state(conn, source)
+    return refresh_json_key_catalog(table, json_column, database_name)
+
+def refresh_json_key_catalog_if_stale(
+    table: str = 'samples',
+    json_column: str = 'json_metadata',
+    database_name: str = 'DB_NAME',
+    max_age: int = JSON_KEY_CATALOG_REFRESH_INTERVAL
+) -> None:
+    """
+    Refresh the catalog only if it was never built or its last refresh is older than max_age seconds.
+    """
+    source = _catalog_source(table, json_column, database_name)
+    with local_db(CATALOG_STORE) as conn:
+        last_refresh = get_last_refresh(conn, source)
+    if last_refresh is None or time.time() - last_refresh > max_age:
+        refresh_json_key_catalog(table, json_column, database_name)
+
+def get_json_key_catalog(
+    table: str = 'samples',
+    json_column: str = 'json_metadata',
+    database_name: str = 'DB_NAME',
+    sample_types: Optional[list[str]] = None
+) -> list[dict]:
+    """
+    Return the cataloged JSON keys with their frequency and last-seen time per sample type.
+
+    Args:
+        table (str): The table holding the JSON column. Default is 'samples'.
+        json_column (str): The cataloged JSON column. Default is 'json_metadata'.
+        database_name (str): The name of the database. Default is 'DB_NAME'.
+        sample_types (Optional[list[str]]): Restrict the result to these sample types (i.e. ['MUS', 'PAV']).
+
+    Returns:
+        list[dict]: One dictionary per (sample_type, json_key) ordered by descending frequency.
+    """
+    source = _catalog_source(table, json_column, database_name)
+    query = "SELECT sample_type, json_key, frequency, last_seen FROM json_key_catalog WHERE source = ?"
+    params = [source]
+    if sample_types:
+        query += f" AND sample_type IN ({','.join('?' for _ in sample_types)})"
+        params.extend(sample_types)
+    query += " ORDER BY frequency DESC, json_key"
+    with local_db(CATALOG_STORE) as conn:
+        _create_catalog_tables(conn)
+        rows = conn.execute(query, params).fetchall()
+    return [
+        {"sample_type": sample_type, "json_key": json_key, "frequency": frequency, "last_seen": last_seen}
+        for sample_type, json_key, frequency, last_seen in rows
+    ]
+
+def get_catalog_keys(
+    table: str = 'samples',
+    json_column: str = 'json_metadata',
+    database_name: str = 'DB_NAME',
+    sample_types: Optional[list[str]] = None
+) -> list[str]:
+    """
+    Return the union of cataloged JSON keys, optionally restricted to some sample types.
+
+    Returns:
+        list[str]: The distinct JSON keys.
+    """
+    catalog = get_json_key_catalog(table, json_column, database_name, sample_types)
+    return list(dict.fromkeys(entry["json_key"] for entry in catalog))
@@ -0,0 +1,157 @@
+# backend/Tools/core/local_store.py
+import os
+import sys
+import time
+import asyncio
+import sqlite3
+import logging
+from contextlib import contextmanager
+from typing import Callable, Optional
+from dotenv import load_dotenv
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+load_dotenv()
+
+# Directory holding the local SQLite indexes derived from the MySQL database
+LOCAL_STORE_DIR = os.getenv('LOCAL_STORE_DIR', os.path.join(project_root, 'state_db'))
+# Seconds between two full rebuilds of an index, which drop the samples deleted from MySQL
+LOCAL_INDEX_REBUILD_INTERVAL = int(os.getenv('LOCAL_INDEX_REBUILD_INTERVAL', 86400))
+
+logger = logging.getLogger(__name__)
+
+def get_local_db_path(name: str) -> str:
+    """
+    Return the path of a local SQLite store, creating its directory if needed.
+
+    Args:
+        name (str): The name of the store (without extension).
+
+    Returns:
+        str: The path to the SQLite file.
+    """
+    os.makedirs(LOCAL_STORE_DIR, exist_ok=True)
+    return os.path.join(LOCAL_STORE_DIR, f"{name}.db")
+
+@contextmanager
+def local_db(name: str):
+    """
+    Open a connection to a local SQLite store in WAL mode.
+    The transaction is committed when the block exits and rolled back on error.
+
+    Args:
+        name (str): The name of the store (without extension).
+
+    Yields:
+        sqlite3.Connection: The open connection.
+    """
+    conn = sqlite3.connect(get_local_db_path(name), timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS index_state (
+                index_name TEXT PRIMARY KEY,
+                high_water_mark TEXT,
+                refreshed_at REAL
+            )
+        """)
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def get_high_water_mark(conn: sqlite3.Connection, index_name: str) -> Optional[str]:
+    """
+    Return the last source value (i.e. an updated_at timestamp) an index was refreshed up to.
+
+    Args:
+        conn (sqlite3.Connection): An open local store connection.
+        index_name (str): The name of the index.
+
+    Returns:
+        Optional[str]: The high-water mark or None if the index was never built.
+    """
+    row = conn.execute(
+        "SELECT high_water_mark FROM index_state WHERE index_name = ?", (index_name,)
+    ).fetchone()
+    return row[0] if row else None
+
+def set_high_water_mark(conn: sqlite3.Connection, index_name: str, high_water_mark: Optional[str]) -> None:
+    """
+    Record the high-water mark of an index along with the time of the refresh.
+
+    Args:
+        conn (sqlite3.Connection): An open local store connection.
+        index_name (str): The name of the index.
+        high_water_mark (Optional[str]): The last source value the index covers.
+    """
+    conn.execute(
+        """
+        INSERT INTO index_state (index_name, high_water_mark, refreshed_at) VALUES (?, ?, ?)
+        ON CONFLICT(index_name) DO UPDATE SET
+            high_water_mark = excluded.high_water_mark,
+            refreshed_at = excluded.refreshed_at
+        """,
+        (index_name, high_water_mark, time.time())
+    )
+
+def get_last_refresh(conn: sqlite3.Connection, index_name: str) -> Optional[float]:
+    """
+    Return the epoch time of the last refresh of an index.
+
+    Args:
+        conn (sqlite3.Connection): An open local store connection.
+        index_name (str): The name of the index.
+
+    Returns:
+        Optional[float]: The time of the last refresh or None if the index was never built.
+    """
+    row = conn.execute(
+        "SELECT refreshed_at FROM index_state WHERE index_name = ?", (index_name,)
+    ).fetchone()
+    return row[0] if row else None
+
+def reset_index_state(conn: sqlite3.Connection, index_name: str) -> None:
+    """
+    Forget the high-water mark of an index so that the next refresh rebuilds it.
+
+    Args:
+        conn (sqlite3.Connection): An open local store connection.
+        index_name (str): The name of the index.
+    """
+    conn.execute("DELETE FROM index_state WHERE index_name = ?", (index_name,))
+
+async def run_periodic(
+    refresh_fn: Callable[[], object],
+    interval: int,
+    rebuild_fn: Optional[Callable[[], object]] = None,
+    rebuild_interval: int = LOCAL_INDEX_REBUILD_INTERVAL
+) -> None:
+    """
+    Run a blocking refresh in a worker thread every interval seconds until cancelled.
+
+    Incremental refreshes only see the rows that were added or updated, so when a rebuild_fn is
+    given it runs instead of the refresh once every rebuild_interval seconds. Errors are logged
+    and the loop carries on.
+
+    Args:
+        refresh_fn (Callable): The incremental refresh (i.e. refresh_uid_index).
+        interval (int): Seconds between two runs.
+        rebuild_fn (Optional[Callable]): The full rebuild of the same index (i.e. rebuild_uid_index).
+        rebuild_interval (int): Seconds between two rebuilds. Default is LOCAL_INDEX_REBUILD_INTERVAL.
+    """
+    last_rebuild = time.monotonic()
+    while True:
+        fn = refresh_fn
+        if rebuild_fn is not None and time.monotonic() - last_rebuild >= rebuild_interval:
+            fn, last_rebuild = rebuild_fn, time.monotonic()
+        try:
+            await asyncio.to_thread(fn)
+        except Exception as e:
+            logger.error(f"Error running {fn.__name__}: {e}")
+        await asyncio.sleep(interval)
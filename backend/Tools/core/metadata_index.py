@@ -0,0 +1,366 @@
+# backend/Tools/core/metadata_index.py
+import os
+import re
+import sys
+import json
+import time
+import heapq
+import logging
+import threading
+from typing import Iterable, NamedTuple, Optional
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+from backend.Tools.core.database import stream_query
+from backend.Tools.core.local_store import local_db, get_high_water_mark, set_high_water_mark, get_last_refresh, reset_index_state
+
+load_dotenv()
+
+METADATA_INDEX_STORE = "metadata_index"
+METADATA_INDEX_SOURCE = "DB_NAME.samples.json_metadata"
+# Seconds between two incremental refreshes of the inverted index
+METADATA_INDEX_REFRESH_INTERVAL = int(os.getenv('METADATA_INDEX_REFRESH_INTERVAL', 300))
+# Values longer than this are indexed by their tokens only
+METADATA_INDEX_MAX_VALUE_LENGTH = 200
+# Kinds of postings: verbatim top-level string values for exact lookups, and normalized values
+# and their words for term search
+VALUE_POSTING = "value"
+TEXT_POSTING = "text"
+
+logger = logging.getLogger(__name__)
+
+# Refreshes replace the postings of the samples they read, so two of them must not interleave
+_refresh_lock = threading.Lock()
+
+class TermQuery(NamedTuple):
+    """
+    One clause of an index search: a term, optionally restricted to an attribute and matched as a prefix.
+    An exact clause matches the whole string value of a top-level attribute, byte for byte, like
+    JSON_EXTRACT(json_metadata, '$.attribute') = term does in MySQL.
+    """
+    term: str
+    attribute: Optional[str] = None
+    prefix: bool = False
+    exact: bool = False
+
+def normalize_term(value) -> str:
+    """
+    Normalize a metadata value or search term: lower case with collapsed whitespace.
+    """
+    return " ".join(str(value).lower().split())
+
+def tokenize(value: str) -> list[str]:
+    """
+    Split a normalized value into its word tokens (i.e. ['c57bl', '6', 'wild', 'type']).
+    """
+    return re.findall(r"\w+", value)
+
+def _iter_values(json_data: dict) -> Iterable[tuple[str, str]]:
+    # Nested objects are indexed under dotted attributes and lists by each of their items
+    stack = [("", json_data)]
+    while stack:
+        path, value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend((f"{path}.{key}" if path else str(key), item) for key, item in value.items())
+        elif isinstance(value, list):
+            stack.extend((path, item) for item in value)
+        elif value is not None and value != "" and path:
+            yield path.lower(), normalize_term(value)
+
+def extract_postings(json_data: dict) -> set[tuple[str, str, str]]:
+    """
+    Return the (kind, attribute, term) triples a sample is posted under.
+
+    Value postings hold the verbatim string values of the top-level attributes. Numbers, lists and
+    objects get none, as a string term never equals them in MySQL either. Text postings hold every
+    normalized value, nested and list ones included, and each of its word tokens.
+    """
+    postings = set()
+    if not isinstance(json_data, dict):
+        return postings
+    for attribute, value in json_data.items():
+        if isinstance(value, str) and len(value) <= METADATA_INDEX_MAX_VALUE_LENGTH:
+            postings.add((VALUE_POSTING, str(attribute), value))
+    for attribute, value in _iter_values(json_data):
+        if len(value) <= METADATA_INDEX_MAX_VALUE_LENGTH:
+            postings.add((TEXT_POSTING, attribute, value))
+        postings.update((TEXT_POSTING, attribute, token) for token in tokenize(value))
+    return postings
+
+def _create_index_tables(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS postings (
+            kind TEXT NOT NULL,
+            attribute TEXT NOT NULL,
+            term TEXT NOT NULL,
+            uuid TEXT NOT NULL,
+            sample_type TEXT NOT NULL,
+            PRIMARY KEY (kind, attribute, term, uuid)
+        ) WITHOUT ROWID
+    """)
+    # Searches on a term in any attribute, and removal of the postings of an updated sample
+    conn.execute("CREATE INDEX IF NOT EXISTS postings_term_idx ON postings (kind, term, uuid)")
+    conn.execute("CREATE INDEX IF NOT EXISTS postings_uuid_idx ON postings (uuid)")
+
+def _post_sample(conn, uuid: str, json_data: dict) -> None:
+    # The postings of the sample are replaced, which makes reposting it idempotent
+    conn.execute("DELETE FROM postings WHERE uuid = ?", (uuid,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO postings (kind, attribute, term, uuid, sample_type) VALUES (?, ?, ?, ?, ?)",
+        [(kind, attribute, term, uuid, uuid.split("-")[0]) for kind, attribute, term in extract_postings(json_data)]
+    )
+
+def refresh_metadata_index(batch_size: int = 1000) -> int:
+    """
+    Incrementally refresh the inverted index from the samples updated since the last refresh.
+
+    Rows are read from the `updated_at` high-water mark onwards, so the first call scans the whole
+    table and later calls only read the rows that changed. The postings of every row read are
+    replaced, which makes reprocessing a row idempotent.
+
+    Args:
+        batch_size (int): Number of rows processed per local transaction. Default is 1000.
+
+    Returns:
+        int: The number of rows processed.
+    """
+    start_time = time.time()
+    processed = 0
+    with _refresh_lock, local_db(METADATA_INDEX_STORE) as conn:
+        _create_index_tables(conn)
+        high_water_mark = get_high_water_mark(conn, METADATA_INDEX_SOURCE)
+        if high_water_mark:
+            query = text("""
+                SELECT uuid, json_metadata, updated_at FROM samples
+                WHERE json_metadata IS NOT NULL AND updated_at >= :hwm
+                ORDER BY updated_at;
+            """).bindparams(hwm=high_water_mark)
+        else:
+            query = text("""
+                SELECT uuid, json_metadata, updated_at FROM samples
+                WHERE json_metadata IS NOT NULL
+                ORDER BY updated_at;
+            """)
+
+        for row in stream_query(query, 'DB_NAME', batch_size=batch_size):
+            uuid = row.get("uuid")
+            if not uuid:
+                continue
+            try:
+                json_data = json.loads(row.get("json_metadata") or "{}")
+            except Exception as e:
+                logger.error(f"Error parsing json_metadata for {uuid}: {e}")
+                continue
+            _post_sample(conn, uuid, json_data)
+            # Rows without updated_at do not move the mark, 'None' would sort after every timestamp
+            if row.get("updated_at") is not None:
+                high_water_mark = max(high_water_mark or '', str(row["updated_at"]))
+            processed += 1
+            if processed % batch_size == 0:
+                conn.commit()
+        set_high_water_mark(conn, METADATA_INDEX_SOURCE, high_water_mark)
+    logger.info(f"Refreshed the metadata index with {processed} rows in {time.time() - start_time:.2f} seconds")
+    return processed
+
+def index_samples(samples: dict) -> int:
+    """
+    Repost samples whose metadata was just written, without waiting for the next refresh.
+
+    Writers call this before invalidating cached answers, so that no search answered between the
+    write and the refresh is cached from the previous postings. The refresh rereads the rows later.
+
+    Args:
+        samples (dict): The new json_metadata of each written UID.
+
+    Returns:
+        int: The number of samples reposted, 0 if the index was never built.
+    """
+    with _refresh_lock, local_db(METADATA_INDEX_STORE) as conn:
+        if get_last_refresh(conn, METADATA_INDEX_SOURCE) is None:
+            return 0
+        for uuid, json_data in samples.items():
+            _post_sample(conn, uuid, json_data)
+    return len(samples)
+
+def rebuild_metadata_index() -> int:
+    """
+    Drop the inverted index and rebuild it from a full scan (i.e. after samples were deleted).
+
+    Returns:
+        int: The number of rows processed.
+    """
+    with _refresh_lock, local_db(METADATA_INDEX_STORE) as conn:
+        _create_index_tables(conn)
+        conn.execute("DELETE FROM postings")
+        reset_index_state(conn, METADATA_INDEX_SOURCE)
+    return refresh_metadata_index()
+
+def _fetch_postings(
+    conn,
+    kind: str,
+    term: str,
+    attribute: Optional[str],
+    prefix: bool,
+    sample_types: Optional[list[str]]
+) -> list[str]:
+    # Prefixes are matched with a range on the term so that the index is used
+    query = "SELECT DISTINCT uuid FROM postings WHERE kind = ? AND "
+    if prefix:
+        query += "term >= ? AND term < ?"
+        params = [kind, term, term + "\U0010ffff"]
+    else:
+        query += "term = ?"
+        params = [kind, term]
+    if attribute:
+        # Value postings keep the attribute as written, like a JSON path does
+        query += " AND attribute = ?"
+        params.append(attribute if kind == VALUE_POSTING else attribute.lower())
+    if sample_types:
+        query += f" AND sample_type IN ({','.join('?' for _ in sample_types)})"
+        params.extend(sample_types)
+    query += " ORDER BY uuid"
+    return [uuid for (uuid,) in conn.execute(query, params)]
+
+def intersect_postings(postings: list[list[str]]) -> list[str]:
+    """
+    Intersect sorted posting lists, merging from the shortest so the work is bounded by the rarest term.
+    """
+    if not postings:
+        return []
+    postings = sorted(postings, key=len)
+    result = postings[0]
+    for other in postings[1:]:
+        if not result:
+            break
+        merged, i, j = [], 0, 0
+        while i < len(result) and j < len(other):
+            if result[i] == other[j]:
+                merged.append(result[i])
+                i += 1
+                j += 1
+            elif result[i] < other[j]:
+                i += 1
+            else:
+                j += 1
+        result = merged
+    return result
+
+def union_postings(postings: list[list[str]]) -> list[str]:
+    """
+    Merge sorted posting lists into one sorted list without duplicates.
+    """
+    result = []
+    for uuid in heapq.merge(*postings):
+        if not result or result[-1] != uuid:
+            result.append(uuid)
+    return result
+
+def search_metadata_index(
+    queries: list[TermQuery],
+    operator: str = "and",
+    sample_types: Optional[list[str]] = None
+) -> Optional[list[str]]:
+    """
+    Return the UIDs of the samples matching the term queries, without querying MySQL.
+
+    An exact clause matches the samples whose attribute is exactly the term. Any other clause
+    matches a sample when the term equals one of its normalized values or tokens, or starts one of
+    them for a prefix query. A term of several words also matches the samples having all of its
+    words, in the clause's attribute when it has one, with the last word as a prefix for a prefix query.
+
+    Args:
+        queries (list[TermQuery]): The clauses (i.e. [TermQuery('apoe4', 'genotype'), TermQuery('cohort b', 'cohort')]).
+        operator (str): 'and' to intersect the clauses or 'or' to unite them. Default is 'and'.
+        sample_types (Optional[list[str]]): Keep only samples of these types (i.e. ['MUS']).
+
+    Returns:
+        Optional[list[str]]: The sorted matching UIDs, or None if the index was never built or
+            an exact term is too long to have value postings.
+
+    Raises:
+        ValueError: If the operator is neither 'and' nor 'or'.
+    """
+    if operator not in ("and", "or"):
+        raise ValueError(f"Invalid operator: {operator}")
+    if any(query.exact and len(query.term) > METADATA_INDEX_MAX_VALUE_LENGTH for query in queries):
+        return None
+    with local_db(METADATA_INDEX_STORE) as conn:
+        # The tables exist once a refresh has completed
+        if get_last_refresh(conn, METADATA_INDEX_SOURCE) is None:
+            return None
+        clause_postings = []
+        for query in queries:
+            if query.exact:
+                clause_postings.append(
+                    _fetch_postings(conn, VALUE_POSTING, query.term, query.attribute, query.prefix, sample_types)
+                )
+                continue
+            term = normalize_term(query.term)
+            postings = _fetch_postings(conn, TEXT_POSTING, term, query.attribute, query.prefix, sample_types)
+            tokens = tokenize(term)
+            if len(tokens) > 1:
+                # Samples where the term is not a whole value match on all of its words
+                postings = union_postings([postings, intersect_postings([
+                    _fetch_postings(conn, TEXT_POSTING, token, query.attribute, query.prefix and k == len(tokens) - 1, sample_types)
+                    for k, token in enumerate(tokens)
+                ])])
+            clause_postings.append(postings)
+    if operator == "and":
+        return intersect_postings(clause_postings)
+    return union_postings(clause_postings)
+
+def _match_term(terms: set[str], term: str, prefix: bool) -> bool:
+    return any(value.startswith(term) for value in terms) if prefix else term in terms
+
+def match_sample(json_data: dict, queries: list[TermQuery], operator: str = "and") -> bool:
+    """
+    Tell whether a sample matches the term queries, with the semantics of search_metadata_index.
+
+    Used to filter the rows of a MySQL scan when the index cannot answer, so that both paths return
+    the same samples.
+
+    Args:
+        json_data (dict): The json_metadata of the sample.
+        queries (list[TermQuery]): The clauses, as given to search_metadata_index.
+        operator (str): 'and' if every clause must match or 'or' if any may. Default is 'and'.
+
+    Returns:
+        bool: True if the sample matches.
+
+    Raises:
+        ValueError: If the operator is neither 'and' nor 'or'.
+    """
+    if operator not in ("and", "or"):
+        raise ValueError(f"Invalid operator: {operator}")
+    postings = extract_postings(json_data)
+    matches = []
+    for query in queries:
+        if query.exact:
+            terms = {term for kind, attribute, term in postings
+                     if kind == VALUE_POSTING and (not query.attribute or attribute == query.attribute)}
+            matches.append(_match_term(terms, query.term, query.prefix))
+            continue
+        terms = {term for kind, attribute, term in postings
+                 if kind == TEXT_POSTING and (not query.attribute or attribute == query.attribute.lower())}
+        term = normalize_term(query.term)
+        tokens = tokenize(term)
+        matches.append(_match_term(terms, term, query.prefix) or (len(tokens) > 1 and all(
+            _match_term(terms, token, query.prefix and k == len(tokens) - 1) for k, token in enumerate(tokens)
+        )))
+    return all(matches) if operator == "and" else any(matches)
+
+def scan_tokens(queries: list[TermQuery]) -> list[str]:
+    """
+    Return words every sample matching the non-exact clauses contains in its raw json_metadata.
+
+    A MySQL scan filters on LOWER(json_metadata) LIKE '%word%' for each of them before match_sample
+    is applied. Only ASCII words are returned, the others may be escaped in the stored JSON.
+    """
+    tokens = set()
+    for query in queries:
+        if not query.exact:
+            tokens.update(token for token in tokenize(normalize_term(query.term)) if token.isascii())
+    return sorted(tokens)
@@ -0,0 +1,285 @@
+# backend/Tools/core/metadata_snapshot.py
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+import pandas as pd
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+from backend.Tools.core.database import stream_query
+from backend.Tools.core.local_store import LOCAL_STORE_DIR, local_db, get_high_water_mark, set_high_water_mark, get_last_refresh, reset_index_state
+from backend.Tools.core.sample_closure import sample_type_prefix
+
+load_dotenv()
+
+SNAPSHOT_STORE = "metadata_snapshot"
+SNAPSHOT_SOURCE = "DB_NAME.samples.snapshot"
+# Directory of the Parquet files, one per sample type
+SNAPSHOT_DIR = os.path.join(LOCAL_STORE_DIR, "snapshots")
+# Seconds between two incremental refreshes of the snapshot
+METADATA_SNAPSHOT_REFRESH_INTERVAL = int(os.getenv('METADATA_SNAPSHOT_REFRESH_INTERVAL', 900))
+# Parsed rows held in memory before they are written to part files of their sample types
+METADATA_SNAPSHOT_FLUSH_ROWS = int(os.getenv('METADATA_SNAPSHOT_FLUSH_ROWS', 20000))
+# Label of the group of samples without a value for a group-by attribute
+MISSING_VALUE = "(missing)"
+
+logger = logging.getLogger(__name__)
+
+# Refreshes rewrite the files of the sample types they read, so two of them must not interleave
+_refresh_lock = threading.Lock()
+_frames_lock = threading.Lock()
+_frames = {}  # sample_type -> (mtime, DataFrame)
+
+def snapshot_path(sample_type: str) -> str:
+    """
+    Return the path of the Parquet file of a sample type.
+    """
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    return os.path.join(SNAPSHOT_DIR, f"samples_{sample_type}.parquet")
+
+def _to_text(value) -> str:
+    return value if isinstance(value, str) else json.dumps(value) if isinstance(value, (list, dict)) else str(value)
+
+def _type_columns(frame: pd.DataFrame) -> pd.DataFrame:
+    # Attributes whose values are all JSON numbers become numeric columns and the others strings,
+    # so numeric-looking strings such as IDs keep their leading zeros
+    for column in frame.columns:
+        if column in ("uuid", "updated_at"):
+            continue
+        values = frame[column].dropna()
+        if len(values) and values.map(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)).all():
+            frame[column] = pd.to_numeric(frame[column])
+        else:
+            frame[column] = frame[column].map(_to_text, na_action="ignore").astype("string")
+    return frame
+
+def build_frame(records: list[dict]) -> pd.DataFrame:
+    """
+    Flatten the parsed metadata of samples of one type into typed columns.
+
+    Args:
+        records (list[dict]): Dictionaries with the uuid, updated_at and json_metadata of each sample.
+
+    Returns:
+        pd.DataFrame: One row per sample, with a column per JSON attribute (nested ones dotted).
+    """
+    frame = pd.json_normalize(records, sep=".")
+    return _type_columns(frame.astype(object).where(frame.notna(), None))
+
+def _write_frame(frame: pd.DataFrame, sample_type: str) -> None:
+    # Written next to the current file and swapped in, so readers never see a partial file
+    path = snapshot_path(sample_type)
+    frame.reset_index(drop=True).to_parquet(f"{path}.tmp", index=False)
+    os.replace(f"{path}.tmp", path)
+
+def _flush_parts(changed: dict, parts: dict) -> None:
+    # Each sample type's parsed rows become a typed part file, and are released
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    for sample_type, records in changed.items():
+        paths = parts.setdefault(sample_type, [])
+        path = os.path.join(SNAPSHOT_DIR, f"samples_{sample_type}.part{len(paths)}.parquet")
+        build_frame(records).to_parquet(path, index=False)
+        paths.append(path)
+    changed.clear()
+
+def _merge_parts(sample_type: str, paths: list[str]) -> None:
+    # The parts are in updated_at order, so the last version of a sample wins
+    frame = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+    frame = frame.drop_duplicates("uuid", keep="last")
+    path = snapshot_path(sample_type)
+    if os.path.exists(path):
+        previous = pd.read_parquet(path)
+        frame = pd.concat([previous[~previous["uuid"].isin(frame["uuid"])], frame], ignore_index=True)
+    _write_frame(_type_columns(frame), sample_type)
+
+def _remove_parts(parts: dict) -> None:
+    for path in (path for paths in parts.values() for path in paths):
+        if os.path.exists(path):
+            os.remove(path)
+
+def refresh_metadata_snapshot(batch_size: int = 1000, flush_rows: int = METADATA_SNAPSHOT_FLUSH_ROWS) -> dict:
+    """
+    Incrementally refresh the Parquet snapshot from the samples updated since the last refresh.
+
+    Rows are read from the `updated_at` high-water mark onwards. Every flush_rows rows, the parsed
+    rows are written to part files of their sample types, so a first build never holds the whole
+    table as Python objects. Only the files of the sample types with updated rows are then
+    rewritten, one type at a time, with the updated rows replacing their previous version.
+
+    Args:
+        batch_size (int): Number of rows fetched per round trip. Default is 1000.
+        flush_rows (int): Number of parsed rows held before writing part files. Default is METADATA_SNAPSHOT_FLUSH_ROWS.
+
+    Returns:
+        dict: The number of updated rows by sample type.
+    """
+    start_time = time.time()
+    with _refresh_lock, local_db(SNAPSHOT_STORE) as conn:
+        high_water_mark = get_high_water_mark(conn, SNAPSHOT_SOURCE)
+        if high_water_mark:
+            query = text("""
+                SELECT uuid, json_metadata, updated_at FROM samples
+                WHERE json_metadata IS NOT NULL AND updated_at >= :hwm
+                ORDER BY updated_at;
+            """).bindparams(hwm=high_water_mark)
+        else:
+            query = text("""
+                SELECT uuid, json_metadata, updated_at FROM samples
+                WHERE json_metadata IS NOT NULL
+                ORDER BY updated_at;
+            """)
+
+        changed, parts, stats = {}, {}, {}
+        pending = 0
+        try:
+            for row in stream_query(query, 'DB_NAME', batch_size=batch_size):
+                uuid = row.get("uuid")
+                if not uuid:
+                    continue
+                try:
+                    json_data = json.loads(row.get("json_metadata") or "{}")
+                except Exception as e:
+                    logger.error(f"Error parsing json_metadata for {uuid}: {e}")
+                    continue
+                updated_at = str(row["updated_at"]) if row.get("updated_at") is not None else None
+                record = json_data if isinstance(json_data, dict) else {}
+                sample_type = sample_type_prefix(uuid)
+                changed.setdefault(sample_type, []).append({**record, "uuid": uuid, "updated_at": updated_at})
+                stats[sample_type] = stats.get(sample_type, 0) + 1
+                # Rows without updated_at do not move the mark, 'None' would sort after every timestamp
+                if updated_at is not None:
+                    high_water_mark = max(high_water_mark or '', updated_at)
+                pending += 1
+                if pending >= flush_rows:
+                    _flush_parts(changed, parts)
+                    pending = 0
+            _flush_parts(changed, parts)
+
+            for sample_type, paths in parts.items():
+                _merge_parts(sample_type, paths)
+        finally:
+            _remove_parts(parts)
+        set_high_water_mark(conn, SNAPSHOT_SOURCE, high_water_mark)
+    logger.info(f"Refreshed the metadata snapshot in {time.time() - start_time:.2f} seconds: {stats}")
+    return stats
+
+def update_snapshot_samples(samples: dict) -> dict:
+    """
+    Write samples whose metadata was just written to the snapshot, without waiting for the next refresh.
+
+    Writers call this before invalidating cached answers, so that no count answered between the
+    write and the refresh is cached from the previous snapshot. The refresh rereads the rows later.
+
+    Args:
+        samples (dict): The new json_metadata of each written UID.
+
+    Returns:
+        dict: The number of samples written by sample type, empty if the snapshot was never built.
+    """
+    updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    changed, parts, stats = {}, {}, {}
+    for uuid, json_data in samples.items():
+        sample_type = sample_type_prefix(uuid)
+        changed.setdefault(sample_type, []).append({**json_data, "uuid": uuid, "updated_at": updated_at})
+        stats[sample_type] = stats.get(sample_type, 0) + 1
+    with _refresh_lock, local_db(SNAPSHOT_STORE) as conn:
+        if get_last_refresh(conn, SNAPSHOT_SOURCE) is None:
+            return {}
+        try:
+            _flush_parts(changed, parts)
+            for sample_type, paths in parts.items():
+                _merge_parts(sample_type, paths)
+        finally:
+            _remove_parts(parts)
+    logger.info(f"Wrote the updated samples to the metadata snapshot: {stats}")
+    return stats
+
+def rebuild_metadata_snapshot() -> dict:
+    """
+    Delete the snapshot and rebuild it from all the samples (i.e. after samples were deleted).
+
+    Returns:
+        dict: The number of rows by sample type.
+    """
+    with _refresh_lock, local_db(SNAPSHOT_STORE) as conn:
+        for name in os.listdir(SNAPSHOT_DIR) if os.path.isdir(SNAPSHOT_DIR) else []:
+            if name.endswith(".parquet"):
+                os.remove(os.path.join(SNAPSHOT_DIR, name))
+        reset_index_state(conn, SNAPSHOT_SOURCE)
+    return refresh_metadata_snapshot()
+
+def load_snapshot(sample_type: str) -> Optional[pd.DataFrame]:
+    """
+    Return the snapshot of a sample type, memory-mapped from its Parquet file and reloaded when the file changes.
+
+    Returns:
+        Optional[pd.DataFrame]: The samples of the type, an empty frame if the type has none,
+            or None if the snapshot was never built.
+    """
+    with local_db(SNAPSHOT_STORE) as conn:
+        if get_last_refresh(conn, SNAPSHOT_SOURCE) is None:
+            return None
+    path = snapshot_path(sample_type)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["uuid", "updated_at"])
+    mtime = os.path.getmtime(path)
+    with _frames_lock:
+        entry = _frames.get(sample_type)
+        if entry is None or entry[0] != mtime:
+            entry = (mtime, pd.read_parquet(path, memory_map=True))
+            _frames[sample_type] = entry
+        return entry[1]
+
+def _resolve_columns(frame: pd.DataFrame, attributes: list[str]) -> list[str]:
+    # Attributes are matched to the columns ignoring case, as users and the LLM rarely get it right
+    columns = {column.lower(): column for column in frame.columns}
+    unknown = [attribute for attribute in attributes if attribute.lower() not in columns]
+    if unknown:
+        raise ValueError(f"Unknown attributes {unknown}. Available attributes: {sorted(c for c in frame.columns if c != 'updated_at')}")
+    return [columns[attribute.lower()] for attribute in attributes]
+
+def aggregate_frame(
+    frame: pd.DataFrame,
+    group_by: Optional[list[str]] = None,
+    filters: Optional[dict] = None
+) -> pd.DataFrame:
+    """
+    Filter samples on attribute values and count them per group, with vectorized pandas operations.
+
+    Args:
+        frame (pd.DataFrame): The samples, one column per attribute (i.e. from load_snapshot).
+        group_by (Optional[list[str]]): The attributes to count per value of (i.e. ['Genotype']).
+        filters (Optional[dict]): Attribute -> value or list of values to keep, compared ignoring case
+            (i.e. {'Study': 'Water Study'}).
+
+    Returns:
+        pd.DataFrame: The group-by columns and a count column, largest groups first.
+
+    Raises:
+        ValueError: If an attribute is not a column of the frame.
+    """
+    if filters:
+        columns = _resolve_columns(frame, list(filters))
+        mask = pd.Series(True, index=frame.index)
+        for column, values in zip(columns, filters.values()):
+            values = values if isinstance(values, list) else [values]
+            if pd.api.types.is_numeric_dtype(frame[column]):
+                mask &= frame[column].isin(pd.to_numeric(pd.Series(values), errors="coerce").dropna())
+            else:
+                wanted = {str(value).strip().lower() for value in values}
+                mask &= frame[column].astype("string").str.strip().str.lower().isin(wanted).fillna(False)
+        frame = frame[mask]
+    if not group_by:
+        return pd.DataFrame({"count": [len(frame)]})
+    columns = _resolve_columns(frame, group_by)
+    groups = frame[columns].astype("string").fillna(MISSING_VALUE)
+    counts = groups.value_counts(dropna=False).rename("count").reset_index()
+    return counts.sort_values(["count"] + columns, ascending=[False] + [True] * len(columns), ignore_index=True)
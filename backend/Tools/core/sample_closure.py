@@ -0,0 +1,203 @@
+# backend/Tools/core/sample_closure.py
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Optional
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+from backend.Tools.core.database import stream_query
+from backend.Tools.core.local_store import local_db, get_last_refresh, set_high_water_mark, reset_index_state
+
+load_dotenv()
+
+CLOSURE_STORE = "sample_closure"
+CLOSURE_SOURCE = "DB_NAME1.seek_sample_tree"
+# Seconds between two incremental refreshes of the closure table
+SAMPLE_CLOSURE_REFRESH_INTERVAL = int(os.getenv('SAMPLE_CLOSURE_REFRESH_INTERVAL', 300))
+
+logger = logging.getLogger(__name__)
+
+# Refreshes diff the tree against the local copy, so two of them must not interleave
+_refresh_lock = threading.Lock()
+
+def sample_type_prefix(uid: str) -> str:
+    """
+    Return the sample-type prefix of a UID (i.e. 'PAV' for 'PAV-220630FLY-1031', 'D.SEQ' for a raw sequencing file).
+    """
+    return uid.split("-")[0]
+
+def _create_closure_tables(conn) -> None:
+    # Direct children of every tree node, with a hash of the source value to detect changes
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tree_nodes (
+            uuid TEXT PRIMARY KEY,
+            children_hash TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tree_edges (
+            parent TEXT NOT NULL,
+            child TEXT NOT NULL,
+            PRIMARY KEY (parent, child)
+        )
+    """)
+    # One row per (ancestor, descendant) pair at any depth, the node itself excluded
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sample_closure (
+            ancestor TEXT NOT NULL,
+            descendant TEXT NOT NULL,
+            depth INTEGER NOT NULL,
+            descendant_type TEXT NOT NULL,
+            PRIMARY KEY (ancestor, descendant)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS sample_closure_type_idx ON sample_closure (ancestor, descendant_type, depth)")
+    conn.execute("CREATE INDEX IF NOT EXISTS sample_closure_descendant_idx ON sample_closure (descendant, ancestor)")
+
+def _add_edge(conn, parent: str, child: str) -> None:
+    # Every ancestor of the parent (and the parent) becomes an ancestor of every node of the child's subtree
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO sample_closure (ancestor, descendant, depth, descendant_type)
+        SELECT a.ancestor, d.descendant, a.depth + d.depth + 1, d.descendant_type
+        FROM (
+            SELECT ancestor, depth FROM sample_closure WHERE descendant = :parent
+            UNION ALL SELECT :parent, 0
+        ) AS a, (
+            SELECT descendant, depth, descendant_type FROM sample_closure WHERE ancestor = :child
+            UNION ALL SELECT :child, 0, :child_type
+        ) AS d
+        """,
+        {"parent": parent, "child": child, "child_type": sample_type_prefix(child)}
+    )
+    conn.execute("INSERT OR IGNORE INTO tree_edges (parent, child) VALUES (?, ?)", (parent, child))
+
+def _remove_edge(conn, parent: str, child: str) -> None:
+    # Sample lineages are trees, so the pairs through this edge are exactly ancestors x subtree
+    conn.execute(
+        """
+        DELETE FROM sample_closure
+        WHERE ancestor IN (SELECT ancestor FROM sample_closure WHERE descendant = :parent UNION SELECT :parent)
+          AND descendant IN (SELECT descendant FROM sample_closure WHERE ancestor = :child UNION SELECT :child)
+        """,
+        {"parent": parent, "child": child}
+    )
+    conn.execute("DELETE FROM tree_edges WHERE parent = ? AND child = ?", (parent, child))
+
+def refresh_sample_closure(batch_size: int = 1000) -> dict:
+    """
+    Incrementally refresh the closure table from dmac.seek_sample_tree.
+
+    Only the narrow `children` column is read. A node whose children hash is unchanged is skipped,
+    and for the others the removed and added edges are applied to the closure, so the cost of a
+    refresh after the first build is proportional to the changed lineages.
+
+    Args:
+        batch_size (int): Number of rows fetched per round trip and processed per local transaction.
+
+    Returns:
+        dict: The number of tree rows read, of changed nodes and of added and removed edges.
+    """
+    start_time = time.time()
+    stats = {"rows": 0, "changed_nodes": 0, "added_edges": 0, "removed_edges": 0}
+    query = text("SELECT uuid, children FROM dmac.seek_sample_tree;")
+    with _refresh_lock, local_db(CLOSURE_STORE) as conn:
+        _create_closure_tables(conn)
+        known = dict(conn.execute("SELECT uuid, children_hash FROM tree_nodes").fetchall())
+        seen = set()
+        for row in stream_query(query, 'DB_NAME1', batch_size=batch_size):
+            uuid, children = row.get("uuid"), row.get("children") or "[]"
+            if not uuid:
+                continue
+            stats["rows"] += 1
+            seen.add(uuid)
+            children_hash = hashlib.sha1(children.encode()).hexdigest()
+            if known.get(uuid) == children_hash:
+                continue
+            try:
+                new_children = set(json.loads(children) or [])
+            except Exception as e:
+                logger.error(f"Error parsing the children of {uuid}: {e}")
+                continue
+            old_children = {child for (child,) in conn.execute("SELECT child FROM tree_edges WHERE parent = ?", (uuid,))}
+            for child in old_children - new_children:
+                _remove_edge(conn, uuid, child)
+            for child in new_children - old_children:
+                _add_edge(conn, uuid, child)
+            conn.execute(
+                "INSERT OR REPLACE INTO tree_nodes (uuid, children_hash) VALUES (?, ?)", (uuid, children_hash)
+            )
+            stats["changed_nodes"] += 1
+            stats["removed_edges"] += len(old_children - new_children)
+            stats["added_edges"] += len(new_children - old_children)
+            if stats["changed_nodes"] % batch_size == 0:
+                conn.commit()
+
+        # Nodes deleted from the tree lose their edges to their children
+        for uuid in set(known) - seen:
+            for (child,) in conn.execute("SELECT child FROM tree_edges WHERE parent = ?", (uuid,)).fetchall():
+                _remove_edge(conn, uuid, child)
+                stats["removed_edges"] += 1
+            conn.execute("DELETE FROM tree_nodes WHERE uuid = ?", (uuid,))
+        set_high_water_mark(conn, CLOSURE_SOURCE, None)
+    logger.info(f"Refreshed sample closure in {time.time() - start_time:.2f} seconds: {stats}")
+    return stats
+
+def rebuild_sample_closure() -> dict:
+    """
+    Drop the closure table and rebuild it from the whole tree.
+    """
+    with _refresh_lock, local_db(CLOSURE_STORE) as conn:
+        _create_closure_tables(conn)
+        for table in ("sample_closure", "tree_edges", "tree_nodes"):
+            conn.execute(f"DELETE FROM {table}")
+        reset_index_state(conn, CLOSURE_SOURCE)
+    return refresh_sample_closure()
+
+def get_closure_descendants(
+    uid: str,
+    type_prefixes: Optional[list[str]] = None,
+    max_depth: Optional[int] = None,
+    limit: Optional[int] = None
+) -> Optional[list[str]]:
+    """
+    Return the descendants of a sample from the closure table, nearest first.
+
+    Args:
+        uid (str): The UID of the sample.
+        type_prefixes (Optional[list[str]]): Keep only these sample types (i.e. ['PAV', 'TIS', 'D.SEQ']).
+        max_depth (Optional[int]): Keep only descendants at most this many generations below the sample.
+        limit (Optional[int]): Return at most this many descendants.
+
+    Returns:
+        Optional[list[str]]: The descendant UIDs, or None if the closure table was never built or
+        the sample was not in the tree at the last refresh (i.e. created since).
+    """
+    query = "SELECT descendant FROM sample_closure WHERE ancestor = ?"
+    params = [uid]
+    if type_prefixes:
+        query += f" AND descendant_type IN ({','.join('?' for _ in type_prefixes)})"
+        params.extend(type_prefixes)
+    if max_depth is not None:
+        query += " AND depth <= ?"
+        params.append(max_depth)
+    query += " ORDER BY depth, descendant"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    with local_db(CLOSURE_STORE) as conn:
+        if get_last_refresh(conn, CLOSURE_SOURCE) is None:
+            return None
+        _create_closure_tables(conn)
+        # An unknown sample and a sample without descendants both have no closure rows
+        if conn.execute("SELECT 1 FROM tree_nodes WHERE uuid = ?", (uid,)).fetchone() is None:
+            return None
+        return [descendant for (descendant,) in conn.execute(query, params)]
@@ -0,0 +1,180 @@
+# backend/Tools/core/uid_index.py
+import os
+import re
+import sys
+import time
+import logging
+import threading
+from typing import NamedTuple, Optional
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+from backend.Tools.core.database import stream_query
+from backend.Tools.core.local_store import local_db, get_high_water_mark, set_high_water_mark, get_last_refresh, reset_index_state
+from backend.Tools.core.sample_closure import sample_type_prefix
+
+load_dotenv()
+
+UID_INDEX_STORE = "uid_index"
+UID_INDEX_SOURCE = "DB_NAME.samples.uuid"
+# Seconds between two incremental refreshes of the UID index
+UID_INDEX_REFRESH_INTERVAL = int(os.getenv('UID_INDEX_REFRESH_INTERVAL', 300))
+
+# i.e. '220630FLY' -> date '220630', lab 'FLY'
+_DATE_LAB_PATTERN = re.compile(r"^(\d{6})([A-Za-z]*)$")
+
+logger = logging.getLogger(__name__)
+
+# Refreshes read from the same high-water mark, so two of them must not interleave
+_refresh_lock = threading.Lock()
+
+class UidParts(NamedTuple):
+    sample_type: str
+    date: Optional[str]
+    lab: Optional[str]
+    number: Optional[int]
+
+def parse_uid(uid: str) -> UidParts:
+    """
+    Split a UID of the form TYPE-YYMMDDLAB-N into its segments (i.e. 'PAV-220630FLY-1031' -> ('PAV', '220630', 'FLY', 1031)).
+    Segments of UIDs that do not follow the format are None.
+    """
+    segments = uid.split("-")
+    date = lab = number = None
+    if len(segments) >= 2:
+        match = _DATE_LAB_PATTERN.match(segments[1])
+        if match:
+            date, lab = match.group(1), match.group(2) or None
+    if len(segments) >= 3 and segments[-1].isdigit():
+        number = int(segments[-1])
+    return UidParts(sample_type_prefix(uid), date, lab, number)
+
+def _create_uid_tables(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sample_uids (
+            uuid TEXT PRIMARY KEY,
+            sample_type TEXT NOT NULL,
+            date TEXT,
+            lab TEXT,
+            number INTEGER
+        ) WITHOUT ROWID
+    """)
+    # Type listings and counts, with range scans over the date segment
+    conn.execute("CREATE INDEX IF NOT EXISTS sample_uids_type_idx ON sample_uids (sample_type, date, lab, number)")
+    conn.execute("CREATE INDEX IF NOT EXISTS sample_uids_lab_idx ON sample_uids (lab, date)")
+
+def refresh_uid_index(batch_size: int = 1000) -> int:
+    """
+    Incrementally add the samples created since the last refresh to the UID index.
+
+    UIDs never change once a sample is created, so rows are read from the `id` high-water mark
+    onwards and only the narrow uuid column is transferred. Deleted samples are removed by
+    rebuild_uid_index.
+
+    Args:
+        batch_size (int): Number of rows processed per local transaction. Default is 1000.
+
+    Returns:
+        int: The number of UIDs added.
+    """
+    start_time = time.time()
+    added = 0
+    with _refresh_lock, local_db(UID_INDEX_STORE) as conn:
+        _create_uid_tables(conn)
+        high_water_mark = int(get_high_water_mark(conn, UID_INDEX_SOURCE) or 0)
+        query = text("SELECT id, uuid FROM samples WHERE id > :hwm ORDER BY id;").bindparams(hwm=high_water_mark)
+        rows = []
+        for row in stream_query(query, 'DB_NAME', batch_size=batch_size):
+            high_water_mark = max(high_water_mark, int(row["id"]))
+            if not row.get("uuid"):
+                continue
+            rows.append((row["uuid"], *parse_uid(row["uuid"])))
+            if len(rows) >= batch_size:
+                conn.executemany("INSERT OR REPLACE INTO sample_uids VALUES (?, ?, ?, ?, ?)", rows)
+                added += len(rows)
+                rows = []
+                conn.commit()
+        conn.executemany("INSERT OR REPLACE INTO sample_uids VALUES (?, ?, ?, ?, ?)", rows)
+        added += len(rows)
+        set_high_water_mark(conn, UID_INDEX_SOURCE, str(high_water_mark))
+    logger.info(f"Added {added} UIDs to the UID index in {time.time() - start_time:.2f} seconds")
+    return added
+
+def rebuild_uid_index() -> int:
+    """
+    Drop the UID index and rebuild it from all the samples (i.e. after samples were deleted).
+
+    Returns:
+        int: The number of UIDs indexed.
+    """
+    with _refresh_lock, local_db(UID_INDEX_STORE) as conn:
+        _create_uid_tables(conn)
+        conn.execute("DELETE FROM sample_uids")
+        reset_index_state(conn, UID_INDEX_SOURCE)
+    return refresh_uid_index()
+
+def get_uids_by_prefix(
+    sample_type: str,
+    lab: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: Optional[int] = None
+) -> Optional[list[str]]:
+    """
+    Return the UIDs of a sample type from the UID index, in date, lab and number order.
+
+    Args:
+        sample_type (str): The sample-type prefix (i.e. 'PAV').
+        lab (Optional[str]): Keep only the UIDs of this lab code (i.e. 'FLY').
+        date_from (Optional[str]): Keep only the UIDs dated on or after this YYMMDD date.
+        date_to (Optional[str]): Keep only the UIDs dated on or before this YYMMDD date.
+        limit (Optional[int]): Return at most this many UIDs.
+
+    Returns:
+        Optional[list[str]]: The UIDs, or None if the index was never built.
+    """
+    query = "SELECT uuid FROM sample_uids WHERE sample_type = ?"
+    params = [sample_type]
+    if date_from:
+        query += " AND date >= ?"
+        params.append(date_from)
+    if date_to:
+        query += " AND date <= ?"
+        params.append(date_to)
+    if lab:
+        query += " AND lab = ?"
+        params.append(lab)
+    query += " ORDER BY date, lab, number, uuid"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    with local_db(UID_INDEX_STORE) as conn:
+        if get_last_refresh(conn, UID_INDEX_SOURCE) is None:
+            return None
+        _create_uid_tables(conn)
+        return [uuid for (uuid,) in conn.execute(query, params)]
+
+def count_uids_by_type(sample_types: Optional[list[str]] = None) -> Optional[dict]:
+    """
+    Count the samples of every sample type from the UID index.
+
+    Args:
+        sample_types (Optional[list[str]]): Count only these sample types (i.e. ['PAV', 'TIS']).
+
+    Returns:
+        Optional[dict]: The number of samples by sample type, or None if the index was never built.
+    """
+    query = "SELECT sample_type, COUNT(*) FROM sample_uids"
+    params = []
+    if sample_types:
+        query += f" WHERE sample_type IN ({','.join('?' for _ in sample_types)})"
+        params.extend(sample_types)
+    query += " GROUP BY sample_type ORDER BY sample_type"
+    with local_db(UID_INDEX_STORE) as conn:
+        if get_last_refresh(conn, UID_INDEX_SOURCE) is None:
+            return None
+        _create_uid_tables(conn)
+        return dict(conn.execute(query, params).fetchall())
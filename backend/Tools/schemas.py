@@ -177,3 +177,5 @@ class UpdatePipelineMetadata(BaseModel):
     logs: list[str]
     errors: Optional[list[str]] = None
     stats: dict[str, Any]
+    job_id: Optional[str] = None
+    status: Optional[str] = None
@@ -15,7 +15,7 @@ from backend.Tools.services.helpers import async_wrap
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 sys.path.append(project_root)
 
-from backend.Tools.core.database import execute_query
+from backend.Tools.core.async_database import async_execute_query
 
 logger = logging.getLogger(__name__)
 
@@ -43,8 +43,7 @@ def get_sample_name(sample_metadata: List[dict]) -> str | None:
         print("Error: Sample name not found.")
         return None
 
-@async_wrap    
-def fetch_any_sample(uid: str) -> List[dict] | None:
+async def fetch_any_sample(uid: str) -> List[dict] | None:
     """
     Fetches the metadata for a given sample UID in the database.
 
@@ -59,7 +58,7 @@ def fetch_any_sample(uid: str) -> List[dict] | None:
     FROM seek_production.samples
     WHERE uuid = :uid;
     """)
-    sample_metadata = execute_query(query.bindparams(uid=uid))
+    sample_metadata = await async_execute_query(query.bindparams(uid=uid))
     return sample_metadata
 
 
@@ -107,8 +106,7 @@ async def retrieve_sample_info(uid: str) -> List[dict] | None:
         logger.error(f"Error saving NHP information to JSON: {e}")
         return None
     
-@async_wrap    
-def fetchChildren(term: str) -> List[str]:
+async def fetchChildren(term: str) -> List[str]:
     """
     Fetch the children of a given sample.
     """
@@ -118,15 +116,14 @@ def fetchChildren(term: str) -> List[str]:
         FROM dmac.seek_sample_tree
         WHERE uuid = :term;
         """)
-        res = execute_query(query.bindparams(term=term), 'DB_NAME1')
+        res = await async_execute_query(query.bindparams(term=term), 'DB_NAME1')
         children = json.loads(res[0]['children'])
         return children
     except Exception as e:
         logger.error(f"Error fetching NHP metadata: {e}")
         return []
 
-@async_wrap
-def fetchChildrenMetadata(term: str) -> List[dict]:
+async def fetchChildrenMetadata(term: str) -> List[dict]:
     """
     Fetch the children metadata for a given term from the database.
 
@@ -143,7 +140,7 @@ def fetchChildrenMetadata(term: str) -> List[dict]:
         FROM dmac.seek_sample_tree
         WHERE uuid = :term;
         """)
-        children_metadata = execute_query(query.bindparams(term=term), 'DB_NAME1')
+        children_metadata = await async_execute_query(query.bindparams(term=term), 'DB_NAME1')
         return children_metadata
     except Exception as e:
         logger.error(f"Error fetching NHP metadata: {e}")
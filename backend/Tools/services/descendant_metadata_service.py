@@ -16,12 +16,12 @@ from backend.Tools.services.multiSample_metadata_service import multi_sample_inf
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 sys.path.append(project_root)
 
-from backend.Tools.core.database import execute_query
+from backend.Tools.core.async_database import async_execute_query
+from backend.Tools.services.tree_walker import iter_descendants, fetch_descendant_batches
 
 logger = logging.getLogger(__name__)
 
-@async_wrap
-def fetchChildrenMetadata(term: str) -> List[dict]:
+async def fetchChildrenMetadata(term: str) -> List[dict]:
     """
     Fetch the children metadata for a given term from the database.
 
@@ -38,44 +38,27 @@ def fetchChildrenMetadata(term: str) -> List[dict]:
         FROM dmac.seek_sample_tree
         WHERE uuid = :term;
         """)
-        children_metadata = execute_query(query.bindparams(term=term), 'DB_NAME1')
+        children_metadata = await async_execute_query(query.bindparams(term=term), 'DB_NAME1')
         return children_metadata
     except Exception as e:
         logger.error(f"Error fetching NHP metadata: {e}")
         return []
 
-async def fetch_all_descendants(term: str) -> List[str]:
+async def fetch_all_descendants(term: str, max_depth: int = None, filter: List[str] = None, limit: int = None) -> List[str]:
     """
     Fetch all descendants of a given sample.
 
     Args:
         term (str): The UUID of the sample to search for in the database.
+        max_depth (int, optional): Only return descendants at most this many generations below the sample.
+        filter (List[str], optional): Only return descendants of these sample types (i.e. ['PAV', 'TIS']).
+        limit (int, optional): Only return the first limit descendants.
 
     Returns:
         List[str]: A list of all descendant UUIDs. Returns an empty list if an error occurs.
     """
     try:
-        # Fetch the children metadata
-        children_metadata = await fetchChildrenMetadata(term)
-        if not children_metadata:
-            return []
-
-        # Parse the 'full' JSON structure
-        full_structure = json.loads(children_metadata[0]['full'])
-
-        # Recursive function to collect all descendants
-        def collect_descendants(node):
-            descendants = []
-            if 'children' in node:
-                for child in node['children']:
-                    descendants.append(child['id'])
-                    descendants.extend(collect_descendants(child))
-            return descendants
-
-        # Start collecting from the root node
-        all_descendants = collect_descendants(full_structure[0])
-        # print(all_descendants)
-        return all_descendants
+        return [uid async for uid in iter_descendants(term, max_depth=max_depth, type_prefixes=filter, limit=limit)]
 
     except Exception as e:
         logger.error(f"Error fetching all descendants: {e}")
@@ -101,26 +84,6 @@ async def fetchDescendantMetadata(term: str, filter: List[str] = None) -> List[d
                     Returns an empty list if an error occurs.
     """
     try:
-        # Fetch all descendant UUIDs
-        descendants_uuids = await fetch_all_descendants(term)
-        if filter:
-            # Apply filter to the descendant UUIDs
-            descendants_uuids = [child for child in descendants_uuids if any(f in child for f in filter)]
-        
-        # Add the original term to the list of UUIDs
-        descendants_uuids.append(term)
-        
-        if not descendants_uuids:
-            logger.warning("No descendants found for the given term.")
-            return []
-
-        # Prepare the SQL query with placeholders
-        # placeholders = ",".join([f":uuid_{i}" for i in range(len(descendants_uuids))])
-        # query = text(f"""
-        # SELECT uuid, json_metadata
-        # FROM seek_production.samples
-        # WHERE uuid IN ({placeholders});
-        # """)
         query = text(
             """
             SELECT uuid, json_metadata
@@ -129,15 +92,14 @@ async def fetchDescendantMetadata(term: str, filter: List[str] = None) -> List[d
             """
         )
         query_text = query.bindparams(bindparam("uids", expanding=True))
-        all_metadata = execute_query(query_text.params(uids=descendants_uuids), 'DB_NAME')
-        
-        # Create a dictionary for bind parameters
-        # bind_params = {f"uuid_{i}": uuid for i, uuid in enumerate(descendants_uuids)}
-        
-        # Execute the query
-        # all_metadata = execute_query(query.bindparams(**bind_params), 'DB_NAME')
+
+        async def fetch_batch(uids: List[str]) -> List[dict]:
+            return await async_execute_query(query_text.params(uids=uids), 'DB_NAME')
+
+        # Fetch the metadata of the term and of its descendants of the requested types, batch by batch during the traversal
+        descendants_uuids, all_metadata = await fetch_descendant_batches(term, fetch_batch, type_prefixes=filter)
         logger.info(f"Fetched metadata for {len(all_metadata)} entries.")
-        results = multi_sample_info_retrieval(descendants_uuids, all_metadata)
+        results = await multi_sample_info_retrieval(descendants_uuids, all_metadata)
         return results
 
     except Exception as e:
@@ -12,9 +12,22 @@ def async_wrap(func):
     return wrapper
 
 import time
+import inspect
 
 
 def timer_wrap(func):
+    if inspect.iscoroutinefunction(func):
+        # Time the awaited coroutine rather than its creation
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            print(f"Executing {func.__name__}...")
+            start_time = time.time()
+            result = await func(*args, **kwargs)
+            elapsed_time = time.time() - start_time
+            print(f"Function {func.__name__} took {elapsed_time:.4f} seconds to complete.")
+            return result
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         print(f"Executing {func.__name__}...")
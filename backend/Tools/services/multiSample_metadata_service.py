@@ -3,28 +3,82 @@
 import json
 import logging
 from pydantic import ValidationError
-from typing import List, Union
+from typing import Iterator, List, Tuple, Union
 from sqlalchemy import text, bindparam
 import os, sys
 # import pandas as pd
-# import asyncio
+import asyncio
 from backend.Tools.services.helpers import async_wrap, timer_wrap
 # from backend.Tools.schemas import ALLOWED_KEYS
 # Add the project root directory to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 sys.path.append(project_root)
 
-from backend.Tools.core.database import execute_query
+from backend.Tools.core.async_database import async_execute_query, async_stream_query
+from backend.Tools.core.metadata_index import search_metadata_index, TermQuery
+from backend.Tools.core.metadata_snapshot import load_snapshot, build_frame, aggregate_frame
+from backend.Tools.core.hot_attributes import record_attribute_queries, get_indexed_attributes, build_attribute_condition
 
 logger = logging.getLogger(__name__)
 
 
+def iter_sample_metadata(uids: List[str], metadata: List[dict]) -> Iterator[Tuple[str, dict | None]]:
+    """
+    Join the requested UIDs with the rows of their metadata, yielding one result per UID as soon as it is parsed.
+
+    The rows are indexed by UUID once, so the join is linear in the number of UIDs and rows, and only
+    the json_metadata of the requested UIDs is parsed, once per row.
+
+    Args:
+        uids (List[str]): The UIDs of the samples, in the order of the results.
+        metadata (List[dict]): The rows with the uuid and json_metadata of the samples.
+
+    Yields:
+        Tuple[str, dict | None]: The UID and its parsed metadata, or None if it has no row or its JSON is invalid.
+    """
+    rows = {entry['uuid']: entry for entry in metadata}
+    parsed = {}
+    for uid in uids:
+        if uid not in parsed:
+            entry = rows.get(uid)
+            if entry is None:
+                parsed[uid] = None
+            else:
+                try:
+                    parsed[uid] = json.loads(entry['json_metadata'])
+                except (TypeError, json.JSONDecodeError) as jde:
+                    logger.error(f"Error decoding JSON of {uid}: {jde}")
+                    parsed[uid] = None
+        yield uid, parsed[uid]
+
+def join_sample_metadata(uids: List[str], metadata: List[dict]) -> Tuple[dict, List[str]]:
+    """
+    Map each requested UID to its parsed metadata, reporting the UIDs without metadata separately.
+
+    Args:
+        uids (List[str]): The UIDs of the samples.
+        metadata (List[dict]): The rows with the uuid and json_metadata of the samples.
+
+    Returns:
+        Tuple[dict, List[str]]: The metadata by UID and the UIDs that have no row or invalid JSON.
+    """
+    metadata_dict = {}
+    missing = []
+    for uid, sample_metadata in iter_sample_metadata(uids, metadata):
+        if sample_metadata is None:
+            missing.append(uid)
+        else:
+            metadata_dict[uid] = sample_metadata
+    return metadata_dict, missing
+
 @async_wrap
 @timer_wrap
 def multi_sample_info_retrieval(uids: List[str], metadata: List[dict]) -> List[dict] | None:
     """
     Retrieves the metadata for multiple samples in the database.
 
+    UIDs without metadata are logged and left out of the result instead of failing the whole batch.
+
     Args:
         uids (List[str]): The UIDs of the samples.
         metadata (List[dict]): The metadata for the samples.
@@ -36,44 +90,19 @@ def multi_sample_info_retrieval(uids: List[str], metadata: List[dict]) -> List[d
     if not metadata:
         logger.error("No metadata found.")
         return None
-    for entry in metadata:
-        # if name in entry["json_metadata"]["Name"]:
-        entry['parsed_metadata'] = json.loads(entry['json_metadata'])
-
-    processed_data = []
 
     try:
-        uuids = [entry['uuid'] for entry in metadata]
-        metadata_dict = {}
-        for uid in uids:
-            idx = uuids.index(uid)
-            metadata_dict[uid] = metadata[idx]['parsed_metadata']
-        logger.info(f"Metadata retrieved for UIDs: {uids}")
-    except json.JSONDecodeError as jde:
-        logger.error(f"Error decoding JSON: {jde}")
-        metadata_dict = {}
-    except ValueError as ve:
-        logger.error(f"UID not found in metadata: {ve}")
-        metadata_dict = {}
+        metadata_dict, missing = join_sample_metadata(uids, metadata)
     except Exception as e:
         logger.error(f"Unexpected error during metadata retrieval: {e}")
-        metadata_dict = {}
-
-    try:
-        processed_data.append(metadata_dict)
-    except ValidationError as ve:
-        logger.error(f"Validation error: {ve}")
-    except Exception as e:
-        logger.error(f"Unexpected error while processing data: {e}")
-
-    logger.info(f"Processed data: {processed_data}")
-    # Export data to JSON
-    try:
-        return processed_data
-    except Exception as e:
-        logger.error(f"Error saving NHP information to JSON: {e}")
         return None
 
+    if missing:
+        logger.warning(f"No metadata found for {len(missing)} of {len(uids)} UIDs: {missing}")
+    logger.info(f"Metadata retrieved for {len(metadata_dict)} UIDs.")
+    logger.debug(f"Processed data: {metadata_dict}")
+    return [metadata_dict]
+
 
 @timer_wrap
 async def get_metadata_by_uids(uids: List[str]) -> List[dict]:
@@ -93,7 +122,7 @@ async def get_metadata_by_uids(uids: List[str]) -> List[dict]:
             """
         )
         query_text = query.bindparams(bindparam("uids", expanding=True))
-        metadata = execute_query(query_text.params(uids=uids), 'DB_NAME')
+        metadata = await async_execute_query(query_text.params(uids=uids), 'DB_NAME')
         if not metadata:
             logger.warning(f"No metadata found for UIDs: {uids}")
             return []
@@ -104,9 +133,8 @@ async def get_metadata_by_uids(uids: List[str]) -> List[dict]:
         return []
 
 
-@async_wrap
 @timer_wrap
-def get_uids_by_terms_and_field(cols: Union[str, List[str]], terms: List[str]) -> List[str]:
+async def get_uids_by_terms_and_field(cols: Union[str, List[str]], terms: List[str]) -> List[str]:
     """
     Get all UIDs for a given list of terms and for specific column(s) in a table.
     If multiple columns are provided, the number of terms must match the number of columns.
@@ -136,24 +164,40 @@ def get_uids_by_terms_and_field(cols: Union[str, List[str]], terms: List[str]) -
             logger.error(f"Number of columns {formatted_cols} and terms {terms} do not match.")
             return []
         
+        # Log the searched keys for the hot attribute ranking and look up their indexed columns
+        json_keys = [c[2:] for c in formatted_cols]
+        await asyncio.to_thread(record_attribute_queries, json_keys)
+
+        indexed = await asyncio.to_thread(get_indexed_attributes)
+
+        # Hot attributes have an indexed column in MySQL that narrows the query, the others are
+        # looked up in the local metadata index, with the full scan when it cannot answer
+        if not any(key in indexed for key in json_keys):
+            index_uids = await asyncio.to_thread(
+                search_metadata_index, [TermQuery(term, attribute=key, exact=True) for key, term in zip(json_keys, terms)]
+            )
+            if index_uids is not None:
+                logger.info(f"Retrieved {len(index_uids)} UIDs from the metadata index.")
+                return index_uids
+
         # Build dynamic WHERE clause and bind parameters.
         conditions = []
         bind_params = {}
-        for idx, (col_value, term_value) in enumerate(zip(formatted_cols, terms)):
-            conditions.append(f"JSON_EXTRACT(json_metadata, :col{idx}) = :term{idx}")
+        for idx, (json_key, col_value, term_value) in enumerate(zip(json_keys, formatted_cols, terms)):
+            conditions.append(build_attribute_condition(json_key, f"col{idx}", f"term{idx}", indexed))
             bind_params[f"col{idx}"] = col_value
             bind_params[f"term{idx}"] = term_value
 
         where_clause = " AND ".join(conditions)
         query_str = f"""
-            SELECT uuid, json_metadata
+            SELECT uuid
             FROM seek_production.samples
             WHERE {where_clause};
         """
         query = text(query_str)
 
         # Execute query and extract UIDs.
-        results = execute_query(query.bindparams(**bind_params), 'DB_NAME')
+        results = await async_execute_query(query.bindparams(**bind_params), 'DB_NAME')
         uids = [result['uuid'] for result in results]
 
         if not uids:
@@ -164,4 +208,54 @@ def get_uids_by_terms_and_field(cols: Union[str, List[str]], terms: List[str]) -
         return uids
     except Exception as e:
         logger.error(f"Error in get_uids_by_terms_and_fields: {e}")
-        return []
\ No newline at end of file
+        return []
+
+@timer_wrap
+async def count_samples_by_attributes(sample_type: str, json_keys: Union[str, List[str]] = None, terms: List[str] = None) -> str:
+    """
+    Count the samples of a sample type, filtered and grouped by json_metadata attributes. The counts are exact.
+    The first json_keys are filters matched in order to the terms, and the remaining json_keys are the attributes to count per value of.
+    i.e. "How many MUS samples per genotype in the Water Study?": sample_type='MUS', json_keys=['Study', 'Genotype'], terms=['Water Study'].
+    Args:
+        sample_type (str): The sample type of the samples to count.
+        json_keys (str | List[str]): The json_keys of the filter attributes followed by those of the group-by attributes.
+        terms (List[str]): The values of the filter attributes.
+    Returns:
+        str: A table of the count of samples per group, or an error message.
+    """
+    try:
+        if isinstance(json_keys, str):
+            json_keys = [json_keys]
+        json_keys, terms = json_keys or [], terms or []
+        if len(terms) > len(json_keys):
+            return f"Expected at most {len(json_keys)} terms for the json_keys {json_keys}, got {terms}."
+        filters = dict(zip(json_keys, terms))
+        group_by = json_keys[len(terms):]
+
+        frame = await asyncio.to_thread(load_snapshot, sample_type)
+        if frame is None:
+            query = text(
+                """
+                SELECT uuid, json_metadata, updated_at
+                FROM seek_production.samples
+                WHERE uuid LIKE :type
+                """
+            )
+            # Streamed so that only the parsed records, not the raw rows as well, are held at once
+            records = [
+                {**(json.loads(row['json_metadata'] or '{}') or {}), "uuid": row['uuid']}
+                async for row in async_stream_query(query.bindparams(type=f"{sample_type}-%"), 'DB_NAME')
+            ]
+            frame = await asyncio.to_thread(build_frame, records)
+        if frame.empty:
+            return f"No {sample_type} samples found."
+
+        counts = await asyncio.to_thread(aggregate_frame, frame, group_by, filters)
+        logger.info(f"Counted {sample_type} samples by {group_by} with filters {filters}: {len(counts)} groups")
+        return counts.to_csv(sep="|", index=False)
+    except ValueError as ve:
+        logger.warning(f"Invalid attributes in count_samples_by_attributes: {ve}")
+        return str(ve)
+    except Exception as e:
+        logger.error(f"Error in count_samples_by_attributes: {e}")
+        return f"Error counting {sample_type} samples: {e}"
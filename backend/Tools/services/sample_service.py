@@ -4,7 +4,7 @@ import json
 import logging
 from pydantic import ValidationError
 from typing import List
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 import os
 import sys
 import pandas as pd
@@ -15,7 +15,10 @@ from backend.Tools.services.helpers import async_wrap
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 sys.path.append(project_root)
 
-from backend.Tools.core.database import execute_query
+from backend.Tools.core.async_database import async_execute_query
+from backend.Tools.core.metadata_index import search_metadata_index, match_sample, scan_tokens, TermQuery
+from backend.Tools.core.uid_index import get_uids_by_prefix
+from backend.Tools.services.tree_walker import iter_descendants, fetch_descendant_batches
 
 logger = logging.getLogger(__name__)
 
@@ -43,8 +46,7 @@ def get_sample_name(sample_metadata: List[dict]) -> str | None:
         print("Error: Sample name not found.")
         return None
 
-@async_wrap    
-def fetch_any_sample(uid: str) -> List[dict] | None:
+async def fetch_any_sample(uid: str) -> List[dict] | None:
     """
     Fetches the metadata for a given sample UID in the database.
 
@@ -59,7 +61,7 @@ def fetch_any_sample(uid: str) -> List[dict] | None:
     FROM seek_production.samples
     WHERE uuid = :uid;
     """)
-    sample_metadata = execute_query(query.bindparams(uid=uid))
+    sample_metadata = await async_execute_query(query.bindparams(uid=uid))
     return sample_metadata
 
 
@@ -107,8 +109,7 @@ async def retrieve_sample_info(uid: str) -> List[dict] | None:
         logger.error(f"Error saving NHP information to JSON: {e}")
         return None
 
-@async_wrap
-def fetchChildrenMetadata(term: str) -> List[dict]:
+async def fetchChildrenMetadata(term: str) -> List[dict]:
     """
     Fetch the children metadata for a given term from the database.
 
@@ -125,14 +126,13 @@ def fetchChildrenMetadata(term: str) -> List[dict]:
         FROM dmac.seek_sample_tree
         WHERE uuid = :term;
         """)
-        children_metadata = execute_query(query.bindparams(term=term), 'DB_NAME1')
+        children_metadata = await async_execute_query(query.bindparams(term=term), 'DB_NAME1')
         return children_metadata
     except Exception as e:
         logger.error(f"Error fetching NHP metadata: {e}")
         return []
 
-@async_wrap    
-def fetchChildren(term: str) -> List[str]:
+async def fetchChildren(term: str) -> List[str]:
     """
     Fetch the children of a given sample.
     """
@@ -142,45 +142,28 @@ def fetchChildren(term: str) -> List[str]:
         FROM dmac.seek_sample_tree
         WHERE uuid = :term;
         """)
-        res = execute_query(query.bindparams(term=term), 'DB_NAME1')
+        res = await async_execute_query(query.bindparams(term=term), 'DB_NAME1')
         children = json.loads(res[0]['children'])
         return children
     except Exception as e:
         logger.error(f"Error fetching NHP metadata: {e}")
         return []
 
-async def fetch_all_descendants(term: str) -> List[str]:
+async def fetch_all_descendants(term: str, max_depth: int = None, filter: List[str] = None, limit: int = None) -> List[str]:
     """
     Fetch all descendants of a given sample.
 
     Args:
         term (str): The UUID of the sample to search for in the database.
+        max_depth (int, optional): Only return descendants at most this many generations below the sample.
+        filter (List[str], optional): Only return descendants of these sample types (i.e. ['PAV', 'TIS']).
+        limit (int, optional): Only return the first limit descendants.
 
     Returns:
         List[str]: A list of all descendant UUIDs. Returns an empty list if an error occurs.
     """
     try:
-        # Fetch the children metadata
-        children_metadata = await fetchChildrenMetadata(term)
-        if not children_metadata:
-            return []
-
-        # Parse the 'full' JSON structure
-        full_structure = json.loads(children_metadata[0]['full'])
-
-        # Recursive function to collect all descendants
-        def collect_descendants(node):
-            descendants = []
-            if 'children' in node:
-                for child in node['children']:
-                    descendants.append(child['id'])
-                    descendants.extend(collect_descendants(child))
-            return descendants
-
-        # Start collecting from the root node
-        all_descendants = collect_descendants(full_structure[0])
-        # print(all_descendants)
-        return all_descendants
+        return [uid async for uid in iter_descendants(term, max_depth=max_depth, type_prefixes=filter, limit=limit)]
 
     except Exception as e:
         logger.error(f"Error fetching all descendants: {e}")
@@ -206,32 +189,17 @@ async def fetchDescendantMetadata(term: str, filter: List[str] = None) -> List[d
                     Returns an empty list if an error occurs.
     """
     try:
-        # Fetch all descendant UUIDs
-        descendants_uuids = await fetch_all_descendants(term)
-        if filter:
-            # Apply filter to the descendant UUIDs
-            descendants_uuids = [child for child in descendants_uuids if any(f in child for f in filter)]
-        
-        # Add the original term to the list of UUIDs
-        descendants_uuids.append(term)
-        
-        if not descendants_uuids:
-            logger.warning("No descendants found for the given term.")
-            return []
-
-        # Prepare the SQL query with placeholders
-        placeholders = ",".join([f":uuid_{i}" for i in range(len(descendants_uuids))])
-        query = text(f"""
+        query = text("""
         SELECT uuid, json_metadata
         FROM seek_production.samples
-        WHERE uuid IN ({placeholders});
-        """)
-        
-        # Create a dictionary for bind parameters
-        bind_params = {f"uuid_{i}": uuid for i, uuid in enumerate(descendants_uuids)}
-        
-        # Execute the query
-        all_metadata = execute_query(query.bindparams(**bind_params), 'DB_NAME')
+        WHERE uuid IN :uids;
+        """).bindparams(bindparam("uids", expanding=True))
+
+        async def fetch_batch(uids: List[str]) -> List[dict]:
+            return await async_execute_query(query.params(uids=uids), 'DB_NAME')
+
+        # Fetch the metadata of the term and of its descendants of the requested types, batch by batch during the traversal
+        _, all_metadata = await fetch_descendant_batches(term, fetch_batch, type_prefixes=filter)
         logger.info(f"Fetched metadata for {len(all_metadata)} entries.")
         print(all_metadata)
         return all_metadata
@@ -280,8 +248,7 @@ async def fetch_protocol(uid: str) -> str | None:
     else:
         return None
 
-@async_wrap
-def get_uids_by_type(type: str) -> List[str]:
+async def get_uids_by_type(type: str) -> List[str]:
     """
     Get all UIDs of a given sample type.
     args:
@@ -289,6 +256,11 @@ def get_uids_by_type(type: str) -> List[str]:
     returns:
         List[str]: A list of UIDs of the given type.
     """
+    sample_type = type.rstrip('%-')
+    uids = await asyncio.to_thread(get_uids_by_prefix, sample_type)
+    if uids is not None:
+        return uids
+
     query = text(
         """
         SELECT uuid
@@ -296,32 +268,53 @@ def get_uids_by_type(type: str) -> List[str]:
         WHERE uuid like :type
         """
     )
-    uids = execute_query(query.bindparams(type=type), 'DB_NAME')
-    return uids
+    rows = await async_execute_query(query.bindparams(type=f"{sample_type}-%"), 'DB_NAME')
+    return [row['uuid'] for row in rows]
 
-@async_wrap
-def get_uids_by_type_and_terms(type: str, terms: List[str]) -> List[str]:
+async def get_uids_by_type_and_terms(type: str, terms: List[str]) -> List[str]:
     """
     Get all UIDs of a given type with these terms in the json_metadata.
+    A term matches the start of a value or of a word of a value, case-insensitively, both in the
+    metadata index and in the MySQL scan used when the index is not built.
     args:
         type (str): The sample type of the UIDs to get.
-        terms (List[str]): The terms to search for in the json_metadata.
+        terms (List[str]): The terms to search for in the json_metadata. All UIDs of the type if empty.
     returns:
         List[str]: A list of UIDs of the given type with the terms in the json_metadata.
     """
+    if not terms:
+        return await get_uids_by_type(type)
+    sample_type = type.rstrip('%-')
+    queries = [TermQuery(term, prefix=True) for term in terms]
+    uids = await asyncio.to_thread(search_metadata_index, queries, "and", [sample_type])
+    if uids is not None:
+        return uids
+
+    # The scan narrows on the words of the terms, the rows are then matched like the index does
+    tokens = scan_tokens(queries)
+    conditions = " ".join(f"AND LOWER(json_metadata) like :token{i}" for i in range(len(tokens)))
     query = text(
-        """
-        SELECT uuid
+        f"""
+        SELECT uuid, json_metadata
         FROM seek_production.samples
         WHERE uuid like :type
-        AND json_metadata like :terms
+        {conditions}
         """
     )
-    uids = execute_query(query.bindparams(type=type, terms=terms), 'DB_NAME')
-    return uids
-
-@async_wrap
-def get_metadata_by_uids(uids: List[str]) -> List[dict]:
+    bind_params = {f"token{i}": f"%{token}%" for i, token in enumerate(tokens)}
+    rows = await async_execute_query(query.bindparams(type=f"{sample_type}-%", **bind_params), 'DB_NAME')
+    uids = []
+    for row in rows:
+        try:
+            json_data = json.loads(row['json_metadata'] or "{}")
+        except Exception as e:
+            logger.error(f"Error parsing json_metadata for {row['uuid']}: {e}")
+            continue
+        if match_sample(json_data, queries):
+            uids.append(row['uuid'])
+    return sorted(uids)
+
+async def get_metadata_by_uids(uids: List[str]) -> List[dict]:
     """
     Get all metadata for a given list of UIDs.
     args:
@@ -336,7 +329,8 @@ def get_metadata_by_uids(uids: List[str]) -> List[dict]:
         WHERE uuid in :uids
         """
     )
-    metadata = execute_query(query.bindparams(uids=uids), 'DB_NAME')
+    query_text = query.bindparams(bindparam("uids", expanding=True))
+    metadata = await async_execute_query(query_text.params(uids=uids), 'DB_NAME')
     return metadata
 
 
@@ -4,7 +4,7 @@ import json
 import logging
 from pydantic import ValidationError
 from typing import List
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 import os
 import sys
 import pandas as pd
@@ -16,12 +16,13 @@ from backend.Tools.services.multiSample_metadata_service import multi_sample_inf
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 sys.path.append(project_root)
 
-from backend.Tools.core.database import execute_query
+from backend.Tools.core.async_database import async_execute_query
+from backend.Tools.core.metadata_index import search_metadata_index, match_sample, scan_tokens, TermQuery
+from backend.Tools.core.uid_index import get_uids_by_prefix, count_uids_by_type
 
 logger = logging.getLogger(__name__)
 
-@async_wrap
-def get_uids_by_type(type: str) -> List[str]:
+async def get_uids_by_type(type: str) -> List[str]:
     """
     Get all UIDs of a given sample type.
     args:
@@ -29,6 +30,11 @@ def get_uids_by_type(type: str) -> List[str]:
     returns:
         List[str]: A list of UIDs of the given type.
     """
+    sample_type = type.rstrip('%-')
+    uids = await asyncio.to_thread(get_uids_by_prefix, sample_type)
+    if uids is not None:
+        return uids
+
     query = text(
         """
         SELECT uuid
@@ -36,32 +42,76 @@ def get_uids_by_type(type: str) -> List[str]:
         WHERE uuid like :type
         """
     )
-    uids = execute_query(query.bindparams(type=type), 'DB_NAME')
-    return uids
+    rows = await async_execute_query(query.bindparams(type=f"{sample_type}-%"), 'DB_NAME')
+    return [row['uuid'] for row in rows]
+
+async def count_samples_by_type(types: List[str] = None) -> str:
+    """
+    Count the samples of every sample type, or of the given sample types. The counts are exact.
+    i.e. "How many samples of each type are there?": types=None, "How many MUS samples are there?": types=['MUS'].
+    args:
+        types (List[str], optional): The sample types to count. Default is all of them.
+    returns:
+        str: A table of the number of samples per sample type.
+    """
+    counts = await asyncio.to_thread(count_uids_by_type, types)
+    if counts is None:
+        query = text(
+            """
+            SELECT SUBSTRING_INDEX(uuid, '-', 1) AS sample_type, COUNT(*) AS count
+            FROM seek_production.samples
+            GROUP BY sample_type
+            """
+        )
+        rows = await async_execute_query(query, 'DB_NAME')
+        counts = {row['sample_type']: row['count'] for row in rows if not types or row['sample_type'] in types}
+    logger.info(f"Counted the samples of {len(counts)} sample types")
+    return "\n".join(["sample_type|count"] + [f"{sample_type}|{count}" for sample_type, count in sorted(counts.items())])
 
-@async_wrap
-def get_uids_by_type_and_terms(type: str, terms: List[str]) -> List[str]:
+async def get_uids_by_type_and_terms(type: str, terms: List[str]) -> List[str]:
     """
     Get all UIDs of a given type with these terms in the json_metadata.
+    A term matches the start of a value or of a word of a value, case-insensitively, both in the
+    metadata index and in the MySQL scan used when the index is not built.
     args:
         type (str): The sample type of the UIDs to get.
-        terms (List[str]): The terms to search for in the json_metadata.
+        terms (List[str]): The terms to search for in the json_metadata. All UIDs of the type if empty.
     returns:
         List[str]: A list of UIDs of the given type with the terms in the json_metadata.
     """
+    if not terms:
+        return await get_uids_by_type(type)
+    sample_type = type.rstrip('%-')
+    queries = [TermQuery(term, prefix=True) for term in terms]
+    uids = await asyncio.to_thread(search_metadata_index, queries, "and", [sample_type])
+    if uids is not None:
+        return uids
+
+    # The scan narrows on the words of the terms, the rows are then matched like the index does
+    tokens = scan_tokens(queries)
+    conditions = " ".join(f"AND LOWER(json_metadata) like :token{i}" for i in range(len(tokens)))
     query = text(
-        """
-        SELECT uuid
+        f"""
+        SELECT uuid, json_metadata
         FROM seek_production.samples
         WHERE uuid like :type
-        AND json_metadata like :terms
+        {conditions}
         """
     )
-    uids = execute_query(query.bindparams(type=type, terms=terms), 'DB_NAME')
-    return uids
+    bind_params = {f"token{i}": f"%{token}%" for i, token in enumerate(tokens)}
+    rows = await async_execute_query(query.bindparams(type=f"{sample_type}-%", **bind_params), 'DB_NAME')
+    uids = []
+    for row in rows:
+        try:
+            json_data = json.loads(row['json_metadata'] or "{}")
+        except Exception as e:
+            logger.error(f"Error parsing json_metadata for {row['uuid']}: {e}")
+            continue
+        if match_sample(json_data, queries):
+            uids.append(row['uuid'])
+    return sorted(uids)
 
-@async_wrap
-def get_metadata_by_uids(uids: List[str]) -> List[dict]:
+async def get_metadata_by_uids(uids: List[str]) -> List[dict]:
     """
     Get all metadata for a given list of UIDs.
     args:
@@ -76,8 +126,9 @@ def get_metadata_by_uids(uids: List[str]) -> List[dict]:
         WHERE uuid in :uids
         """
     )
-    metadata = execute_query(query.bindparams(uids=uids), 'DB_NAME')
-    results = multi_sample_info_retrieval(uids, metadata)
+    query_text = query.bindparams(bindparam("uids", expanding=True))
+    metadata = await async_execute_query(query_text.params(uids=uids), 'DB_NAME')
+    results = await multi_sample_info_retrieval(uids, metadata)
     return results
 
 
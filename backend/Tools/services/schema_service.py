@@ -41,7 +41,7 @@ async def extract_relevant_schema(database_name: str = 'DB_NAME', table_names: l
         logger.info(f"Retrieving schema for database '{database_name}'")
         start_time = time.time()
         # Retrieve up-to-date schema (cached)
-        schema = get_cached_database_schema()
+        schema = get_cached_database_schema(database_name, table_names)
         schema_json = json.dumps(schema, indent=2)
         # save schema to file
         # with open('db_schema.json', 'w') as f:
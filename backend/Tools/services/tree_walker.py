@@ -0,0 +1,173 @@
+# backend/Tools/services/tree_walker.py
+
+import os
+import sys
+import json
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Tuple
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+from backend.Tools.core.async_database import async_execute_query
+from backend.Tools.core.sample_closure import get_closure_descendants, sample_type_prefix
+
+load_dotenv()
+
+# Number of descendant UIDs whose metadata is fetched per query
+DESCENDANT_BATCH_SIZE = int(os.getenv('DESCENDANT_BATCH_SIZE', 500))
+# Metadata queries of descendant batches running at once
+DESCENDANT_FETCH_CONCURRENCY = int(os.getenv('DESCENDANT_FETCH_CONCURRENCY', 4))
+
+logger = logging.getLogger(__name__)
+
+def walk_tree(
+    root: dict,
+    max_depth: Optional[int] = None,
+    type_prefixes: Optional[List[str]] = None
+) -> Iterator[str]:
+    """
+    Lazily yield the descendant IDs of a node of a `full` sample tree in depth-first pre-order.
+
+    The walk uses an explicit stack instead of recursion, so it neither copies lists at every level
+    nor hits the recursion limit on deep lineages. Stop consuming the generator to stop the walk.
+
+    Args:
+        root (dict): A tree node with an 'id' and a 'children' list of nodes.
+        max_depth (Optional[int]): Do not descend more than this many generations below the root.
+        type_prefixes (Optional[List[str]]): Yield only descendants of these sample types (i.e. ['PAV', 'TIS']).
+            Nodes of other types are still walked through.
+
+    Yields:
+        str: The ID of each descendant.
+    """
+    stack = [(child, 1) for child in reversed(root.get('children') or [])]
+    while stack:
+        node, depth = stack.pop()
+        node_id = node['id']
+        if not type_prefixes or sample_type_prefix(node_id) in type_prefixes:
+            yield node_id
+        if max_depth is None or depth < max_depth:
+            stack.extend((child, depth + 1) for child in reversed(node.get('children') or []))
+
+async def load_sample_tree(term: str) -> Optional[dict]:
+    """
+    Load and parse the `full` tree of a sample from dmac.seek_sample_tree.
+
+    Returns:
+        Optional[dict]: The root node of the tree or None if the sample has no tree.
+    """
+    query = text("""
+    SELECT uuid, full
+    FROM dmac.seek_sample_tree
+    WHERE uuid = :term;
+    """)
+    rows = await async_execute_query(query.bindparams(term=term), 'DB_NAME1')
+    if not rows:
+        return None
+    return json.loads(rows[0]['full'])[0]
+
+async def iter_descendants(
+    term: str,
+    max_depth: Optional[int] = None,
+    type_prefixes: Optional[List[str]] = None,
+    limit: Optional[int] = None
+) -> AsyncIterator[str]:
+    """
+    Yield the descendant UIDs of a sample, from the closure table when it is built and from a walk
+    of the sample's tree otherwise.
+
+    Args:
+        term (str): The UID of the sample.
+        max_depth (Optional[int]): Do not descend more than this many generations below the sample.
+        type_prefixes (Optional[List[str]]): Yield only descendants of these sample types.
+        limit (Optional[int]): Stop after this many descendants (i.e. the first 100).
+
+    Yields:
+        str: The UID of each descendant.
+    """
+    descendants = await asyncio.to_thread(get_closure_descendants, term, type_prefixes, max_depth, limit)
+    if descendants is None:
+        root = await load_sample_tree(term)
+        if root is None:
+            return
+        descendants = walk_tree(root, max_depth, type_prefixes)
+    for count, uid in enumerate(descendants, start=1):
+        yield uid
+        if limit is not None and count >= limit:
+            return
+
+async def iter_descendant_batches(
+    term: str,
+    batch_size: int = DESCENDANT_BATCH_SIZE,
+    **filters
+) -> AsyncIterator[List[str]]:
+    """
+    Yield the descendant UIDs of a sample in lists of at most batch_size, as the traversal produces them.
+
+    Args:
+        term (str): The UID of the sample.
+        batch_size (int): Maximum number of UIDs per batch.
+        **filters: max_depth, type_prefixes and limit as in iter_descendants.
+
+    Yields:
+        List[str]: The next batch of descendant UIDs.
+    """
+    batch = []
+    async for uid in iter_descendants(term, **filters):
+        batch.append(uid)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def fetch_descendant_batches(
+    term: str,
+    fetch_batch: Callable[[List[str]], Awaitable[List[dict]]],
+    batch_size: int = DESCENDANT_BATCH_SIZE,
+    max_concurrency: int = DESCENDANT_FETCH_CONCURRENCY,
+    **filters
+) -> Tuple[List[str], List[dict]]:
+    """
+    Fetch the rows of a sample and its descendants batch by batch, while the traversal goes on.
+
+    A fetch is started as soon as a batch of UIDs is complete, with at most max_concurrency
+    fetches running at once, so the first queries overlap with the rest of the walk.
+
+    Args:
+        term (str): The UID of the sample.
+        fetch_batch (Callable): Coroutine function returning the rows of a list of UIDs.
+        batch_size (int): Maximum number of UIDs per fetch.
+        max_concurrency (int): Maximum number of fetches running at once.
+        **filters: max_depth, type_prefixes and limit as in iter_descendants.
+
+    Returns:
+        Tuple[List[str], List[dict]]: The UIDs, the sample's own last, and the rows of all batches in traversal order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_fetch(batch: List[str]) -> List[dict]:
+        async with semaphore:
+            return await fetch_batch(batch)
+
+    uids, tasks = [], []
+    try:
+        async for batch in iter_descendant_batches(term, batch_size, **filters):
+            uids.extend(batch)
+            tasks.append(asyncio.create_task(run_fetch(batch)))
+            # Let the fetch send its query before the walk produces the next batch
+            await asyncio.sleep(0)
+        uids.append(term)
+        tasks.append(asyncio.create_task(run_fetch([term])))
+        batches = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    logger.info(f"Fetched {len(uids)} UIDs of {term} in {len(tasks)} batches")
+    return uids, [row for rows in batches for row in rows]
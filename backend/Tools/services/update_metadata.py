@@ -7,27 +7,35 @@ from sqlalchemy.exc import SQLAlchemyError
 import os, base64 
 from io import StringIO
 from dotenv import load_dotenv
-from typing import Dict, List, Tuple, Set, Optional, Any, Union
+from typing import Dict, List, Tuple, Set, Optional, Any, Union, Callable, AsyncIterator
+import inspect
 
 import sys
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 sys.path.append(project_root)
 
-from backend.Tools.core.database import execute_query, execute_update_query
+from backend.Tools.core.async_database import async_execute_query, async_execute_update_query
+from backend.Tools.core.database import invalidate_schema_cache
+from backend.Tools.core.jobs import job_queue
+from backend.Tools.core.metadata_index import index_samples
+from backend.Tools.core.metadata_snapshot import update_snapshot_samples
 from backend.Tools.services.helpers import async_wrap, timer_wrap
 from src.chatbot.studio.models import SampleTypeAttributes, InputCSV
+from src.chatbot.studio.response_cache import invalidate_uids
 import asyncio
 from backend.Tools.schemas import UpdatePipelineMetadata
 import logging.handlers
 
 load_dotenv()
 
+# Number of CSV rows validated, fetched, merged and written together when an upload is spooled to disk
+UPDATE_CSV_CHUNK_SIZE = int(os.getenv('UPDATE_CSV_CHUNK_SIZE', 5000))
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@async_wrap
 @timer_wrap
-def get_st_attributes(
+async def get_st_attributes(
     output_format: str = 'object',
     filter_by: Optional[List[str]] = None
 ) -> Union[pd.DataFrame, List[SampleTypeAttributes]]:
@@ -54,7 +62,7 @@ def get_st_attributes(
         JOIN seek_production.sample_types st 
             ON sa.sample_type_id = st.id;
     """)
-    df = execute_query(query, database_name='DB_NAME', output_format='df')
+    df = await async_execute_query(query, database_name='DB_NAME', output_format='df')
     
     # Apply filtering if provided
     if filter_by:
@@ -89,12 +97,14 @@ def get_st_attributes(
 def get_input_data(file_data: InputCSV) -> pd.DataFrame:
     """
     Reads and processes the input CSV file containing sample data to update.
+    The CSV is decoded and parsed once and the resulting frame is reused by every stage of the pipeline.
     
     Args:
         file_data (InputCSV): InputCSV instance containing file data and metadata
         
     Returns:
-        pd.DataFrame: Processed input data with extracted SampleType from UID.
+        pd.DataFrame: Processed input data with extracted SampleType from UID. Every attribute is read as
+            a string and empty cells are None so that the merged metadata stays valid JSON.
         
     Raises:
         FileNotFoundError: If input.csv does not exist.
@@ -102,7 +112,15 @@ def get_input_data(file_data: InputCSV) -> pd.DataFrame:
     # Decode the base64 content
     decoded_content = base64.b64decode(file_data.content).decode('utf-8')
     # Convert the decoded content to a pandas DataFrame
-    input = pd.read_csv(StringIO(decoded_content))
+    input = pd.read_csv(StringIO(decoded_content), dtype=str)
+    return prepare_input_frame(input)
+
+
+def prepare_input_frame(input: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds the SampleType column extracted from the UID and moves UID and SampleType first.
+    """
+    input = input.astype(object).where(input.notna(), None)
     input["SampleType"] = input["UID"].str.split("-").str[0]
     cols = ["UID", "SampleType"] + [col for col in input.columns if col not in ["UID", "SampleType"]]
     # Reorder DataFrame
@@ -112,79 +130,73 @@ def get_input_data(file_data: InputCSV) -> pd.DataFrame:
 
 # @async_wrap
 @timer_wrap
-async def check_attributes(st_attributes: pd.DataFrame, file_data: InputCSV) -> pd.DataFrame:
+async def check_attributes(st_attributes: pd.DataFrame, input: pd.DataFrame) -> pd.DataFrame:
     """
     Verifies that attributes in the input file exist in the database for each sample type.
     
     Args:
         st_attributes (pd.DataFrame): DataFrame containing attribute titles and sample type titles.
+        input (pd.DataFrame): The parsed input data returned by get_input_data.
         
     Returns:
         pd.DataFrame: Matrix showing which attributes (1=exists, 0=doesn't exist) are valid for each sample type.
     """
     ##ENSURE Attributes you want to update exist in the DB. 1 == exist, 0 == dont exist
 
-    input = await get_input_data(file_data)
-
     # Step 1: Get unique SampleTypes
     unique_sample_types = input["SampleType"].unique()
     # Step 2: Extract attributes to check (all column names except UID and SampleType)
     attributes = [col for col in input.columns if col not in ["UID", "SampleType"]]
-    # Step 3: Filter st_attributes to keep only relevant SampleTypes
-    st_filtered = st_attributes[st_attributes["sample_type_title"].isin(unique_sample_types)]
-    # Step 4: Create attributes_to_check DataFrame
-    attributes_to_check = pd.DataFrame(columns=["SampleType"] + attributes)
-    attributes_to_check["SampleType"] = unique_sample_types
-    # Step 5: Populate attributes_to_check
-    for sample_type in unique_sample_types:
-        valid_attributes = set(st_filtered[st_filtered["sample_type_title"] == sample_type]["attribute_title"])
-        attributes_to_check.loc[attributes_to_check["SampleType"] == sample_type, attributes] = [
-            1 if attr in valid_attributes else 0 for attr in attributes
-        ]
-
-    # Print full DataFrame
-    # print(attributes_to_check)
-    return attributes_to_check
+    # Step 3: Filter st_attributes to keep only relevant SampleTypes and attributes
+    st_filtered = st_attributes[
+        st_attributes["sample_type_title"].isin(unique_sample_types)
+        & st_attributes["attribute_title"].isin(attributes)
+    ]
+    # Step 4: Build the sample type x attribute matrix in one pass
+    attributes_to_check = (
+        pd.crosstab(st_filtered["sample_type_title"], st_filtered["attribute_title"])
+        .clip(upper=1)
+        .reindex(index=unique_sample_types, columns=attributes, fill_value=0)
+        .fillna(0)
+        .astype(int)
+    )
+    attributes_to_check.index.name = None
+    attributes_to_check.columns.name = None
+    attributes_to_check.insert(0, "SampleType", unique_sample_types)
+    return attributes_to_check.reset_index(drop=True)
 
 
 # @async_wrap
 @timer_wrap
-async def filter_attributes(attributes_to_check: pd.DataFrame, file_data: InputCSV) -> pd.DataFrame:
+async def filter_attributes(attributes_to_check: pd.DataFrame, input: pd.DataFrame) -> pd.DataFrame:
     """
     Filters out samples with attributes that don't exist in the database.
     
     Args:
         attributes_to_check (pd.DataFrame): Matrix showing which attributes are valid for each sample type.
+        input (pd.DataFrame): The parsed input data returned by get_input_data.
         
     Returns:
         pd.DataFrame: Filtered input data containing only samples with valid attributes.
     """
     ### Removes samples from input who have 0's in the above sample.
-    input = await get_input_data(file_data)
-    
-    # Step 1: Identify SampleTypes with a '0' in any attribute
-    sample_types_to_remove = attributes_to_check[attributes_to_check.eq(0).any(axis=1)]["SampleType"]
 
-    # Step 2: Generate removal reasons
-    removal_reasons = []
-    for _, row in attributes_to_check.iterrows():
-        if row["SampleType"] in sample_types_to_remove.values:
-            invalid_attributes = row.index[row.eq(0)].tolist()
-            for attr in invalid_attributes:
-                removal_reasons.append(f"Sample Type {row['SampleType']} removed because of 0 in attribute {attr}")
+    # Step 1: Identify the (SampleType, attribute) pairs with a '0'
+    invalid = attributes_to_check.melt(id_vars="SampleType", var_name="attribute", value_name="exists")
+    invalid = invalid[invalid["exists"] == 0]
+    sample_types_to_remove = invalid["SampleType"].unique()
 
-    # Print all removal reasons
-    for reason in removal_reasons:
-        print(reason)
+    # Step 2: Print all removal reasons
+    for sample_type, attr in zip(invalid["SampleType"], invalid["attribute"]):
+        print(f"Sample Type {sample_type} removed because of 0 in attribute {attr}")
 
     # Step 3: Filter input DataFrame
     input_filtered = input[~input["SampleType"].isin(sample_types_to_remove)]
     return input_filtered
 
 
-@async_wrap
 @timer_wrap
-def fetch_relevant_metadata(input_filtered: pd.DataFrame) -> Tuple[Dict[str, Dict[str, Any]], int]:
+async def fetch_relevant_metadata(input_filtered: pd.DataFrame) -> Tuple[Dict[str, Dict[str, Any]], int]:
     """
     Fetches metadata for samples in batches from the database.
     
@@ -229,7 +241,7 @@ def fetch_relevant_metadata(input_filtered: pd.DataFrame) -> Tuple[Dict[str, Dic
 
         
         # results = cursor.fetchall()
-        results = execute_query(query_text.params(batch=batch), 'DB_NAME')
+        results = await async_execute_query(query_text.params(batch=batch), 'DB_NAME')
         if results:
             metadata_dict.update({row["uuid"]: json.loads(row["json_metadata"]) for row in results if row["json_metadata"]})
         
@@ -258,6 +270,9 @@ def fetch_relevant_metadata(input_filtered: pd.DataFrame) -> Tuple[Dict[str, Dic
 def update_metadata(metadata_dict: Dict[str, Dict[str, Any]], input_filtered: pd.DataFrame) -> Tuple[List[Tuple[str, str]], List[str]]:
     """
     Updates sample metadata in memory based on input data.
+    Samples are merged per sample type: the attributes every sample of the type has are found with
+    one set intersection per type and merged without a per-sample check, so only the remaining
+    attributes are looked up in each sample's metadata.
     
     Args:
         metadata_dict (Dict[str, Dict[str, Any]]): Dictionary mapping UIDs to their JSON metadata.
@@ -271,98 +286,202 @@ def update_metadata(metadata_dict: Dict[str, Dict[str, Any]], input_filtered: pd
     # Step 2: Update json_metadata in memory
     update_data = []
     not_found_attrs = []
-    # update_start = time.time()
 
     logging.info("In-memory json update process started.")
 
-    for _, row in input_filtered.iterrows():
-        uid = row["UID"]
-        
-        if uid in metadata_dict:
+    # Only samples that were fetched from the database can be updated
+    input_found = input_filtered[input_filtered["UID"].isin(list(metadata_dict))]
+    attributes = [col for col in input_found.columns if col not in ["UID", "SampleType"]]
+
+    for sample_type, group in input_found.groupby("SampleType", sort=False):
+        uids = group["UID"].tolist()
+        common = set.intersection(*(set(metadata_dict[uid]) for uid in uids))
+        # Usually empty, as the samples of a type share their attributes
+        uncommon = [attr for attr in attributes if attr not in common]
+        records = group[attributes].to_dict("records")
+        for uid, values in zip(uids, records):
             metadata = metadata_dict[uid]
-            updated = False
-            
             # Only update existing attributes
-            for attr in row.index:
-                if attr not in ["UID", "SampleType"]:  # Skip UID and SampleType
-                    if attr in metadata:
-                        metadata[attr] = row[attr]  # Update attribute
-                        updated = True
-                    else:
-                        msg = f"Attribute '{attr}' doesn't exist for sample UUID '{uid}'"
-                        logging.warning(msg)
-                        not_found_attrs.append(msg)
-            
-            if updated:
+            for attr in uncommon:
+                if attr not in metadata:
+                    del values[attr]
+                    not_found_attrs.append(f"Attribute '{attr}' doesn't exist for sample UUID '{uid}'")
+            if values:
+                metadata.update(values)
                 update_data.append((json.dumps(metadata), uid))
 
-    # update_end = time.time()
-    # logging.info(f"Processed {len(update_data)} updates in {update_end - update_start:.2f} seconds.")
+    if not_found_attrs:
+        logging.warning(f"{len(not_found_attrs)} attributes don't exist on their samples, i.e. {not_found_attrs[0]}")
     logging.info(f"Processed {len(update_data)} updates.")
 
     return update_data, not_found_attrs
 
 
-@async_wrap
+# MySQL error codes raised when a batch waits on or deadlocks with another transaction's row locks
+LOCK_WAIT_ERROR_CODES = (1205, 1213)
+UPDATE_MIN_BATCH_SIZE = 25
+UPDATE_MAX_BATCH_SIZE = 1000
+# Batches committing faster than this many seconds grow, slower ones shrink
+UPDATE_TARGET_BATCH_SECONDS = 1.0
+UPDATE_MAX_LOCK_RETRIES = 5
+
+
+def is_lock_wait_error(err: SQLAlchemyError) -> bool:
+    """
+    Whether a database error is a lock wait timeout or a deadlock, i.e. a batch that can be retried smaller.
+    """
+    orig = getattr(err, "orig", None)
+    args = getattr(orig, "args", None)
+    return bool(args) and args[0] in LOCK_WAIT_ERROR_CODES
+
+
 @timer_wrap
-def update_records(update_data: List[Tuple[str, str]], batch_size: int, not_found_attrs: List[str]) -> Optional[List[str]]:
+async def update_records(update_data: List[Tuple[str, str]], batch_size: int, not_found_attrs: List[str]) -> Dict[str, Any]:
     """
     Performs batch updates to the database with the updated metadata.
+
+    Each batch is written with a single executemany in its own transaction. The batch size adapts to
+    lock contention: it is halved and the batch retried on a lock wait timeout or deadlock, and it grows
+    again while batches commit faster than UPDATE_TARGET_BATCH_SECONDS.
     
     Args:
         update_data (List[Tuple[str, str]]): List of tuples (json_metadata, uuid) for database update.
-        batch_size (int): Size of batches for database updates.
+        batch_size (int): Initial size of batches for database updates.
         not_found_attrs (List[str]): List of warning messages for attributes not found.
         
     Returns:
-        Optional[List[str]]: List of warning messages if any, None otherwise.
+        Dict[str, Any]: Write statistics with the number of rows affected, the number of records that
+            could not be written, the number of lock retries and the timing of every committed batch.
     """
-    # Step 3: Perform batch updates (Avoids Locking) with Debugging
     bulk_update_start = time.time()
-    update_query = text("UPDATE seek_production.samples SET json_metadata = :metadata WHERE uuid = :uuid")
-
-    for i in range(0, len(update_data), batch_size):
-        batch = update_data[i:i+batch_size]
-        total_batches = (len(update_data) + batch_size - 1) // batch_size
-
-        print(f"Trying to update batch {i // batch_size + 1} with {len(batch)} records...")
-
+    update_query = text(
+        "UPDATE seek_production.samples SET json_metadata = :metadata, updated_at = NOW() WHERE uuid = :uuid"
+    )
+    stats = {"rows_affected": 0, "failed_records": 0, "lock_retries": 0, "batches": []}
+
+    position = 0
+    retries = 0
+    batch_number = 0
+    while position < len(update_data):
+        batch = update_data[position:position + batch_size]
+        params = [{"metadata": metadata, "uuid": uuid} for metadata, uuid in batch]
+        batch_start = time.time()
         try:
-            # cursor.executemany(update_query, batch)
-            # conn.commit()  # Commit after every batch
-            params = {"metadata": batch[0][0], "uuid": batch[0][1]}
-            execute_update_query(update_query, params, 'DB_NAME')
-            print(f"✅ Committed batch {i // batch_size + 1}/{total_batches} with {len(batch)} records.")
-            logging.info(f"✅ Committed batch {i // batch_size + 1} with {len(batch)} records.")
-            
-            time.sleep(0.1)  # Add short delay to prevent locks
-
+            rows_affected = await async_execute_update_query(update_query, params, 'DB_NAME', batch_mode=True)
         except SQLAlchemyError as err:
-            print(f"❌ ERROR in batch {i // batch_size + 1}: {err}")
-            logging.error(f"❌ ERROR in batch {i // batch_size + 1}: {err}")
+            if is_lock_wait_error(err) and retries < UPDATE_MAX_LOCK_RETRIES:
+                retries += 1
+                stats["lock_retries"] += 1
+                batch_size = max(UPDATE_MIN_BATCH_SIZE, batch_size // 2)
+                logging.warning(f"Lock contention on batch {batch_number + 1}, retrying with {batch_size} records: {err}")
+                await asyncio.sleep(0.1 * 2 ** retries)
+                continue
+            logging.error(f"❌ ERROR in batch {batch_number + 1}: {err}")
+            stats["failed_records"] = len(update_data) - position
             break  # Stop further updates if we hit an error
 
-    bulk_update_end = time.time()
-    logging.info(f"Updated {len(update_data)} records in {bulk_update_end - bulk_update_start:.2f} seconds.")
-    print(f"Updated {len(update_data)} records.")
+        batch_seconds = time.time() - batch_start
+        batch_number += 1
+        position += len(batch)
+        retries = 0
+        stats["rows_affected"] += rows_affected
+        stats["batches"].append({"size": len(batch), "seconds": round(batch_seconds, 4)})
+        logging.info(f"✅ Committed batch {batch_number} with {len(batch)} records in {batch_seconds:.2f} seconds.")
 
-    # total_time = bulk_update_end - bulk_update_start
+        if batch_seconds < UPDATE_TARGET_BATCH_SECONDS / 2:
+            batch_size = min(UPDATE_MAX_BATCH_SIZE, batch_size * 2)
+        elif batch_seconds > UPDATE_TARGET_BATCH_SECONDS:
+            batch_size = max(UPDATE_MIN_BATCH_SIZE, batch_size // 2)
 
-    # logging.info(f"Update process completed in {total_time:.2f} seconds.")
-    # print(f"Update process completed in {total_time:.2f} seconds.")
+    bulk_update_end = time.time()
+    logging.info(f"Updated {stats['rows_affected']} of {len(update_data)} records in {bulk_update_end - bulk_update_start:.2f} seconds.")
 
-    # Optional: Print missing attributes
+    # Optional: Log missing attributes
     if not_found_attrs:
-        print("\nMissing attributes:")
-        for msg in not_found_attrs[:10]:  # Print first 10 missing attributes for preview
-            print(msg)
-        print(f"...and {len(not_found_attrs) - 10} more." if len(not_found_attrs) > 10 else "")
-        return not_found_attrs
-    else:
-        return None
+        logging.warning(f"{len(not_found_attrs)} attributes were not found, i.e. {not_found_attrs[:10]}")
+    return stats
+
+
+async def iter_input_chunks(file_data: InputCSV, chunk_size: int = UPDATE_CSV_CHUNK_SIZE) -> AsyncIterator[pd.DataFrame]:
+    """
+    Yields the input data in frames of at most chunk_size rows.
 
+    An upload spooled to disk (file_data.path) is read lazily so that only one chunk is held in memory.
+    A base64-encoded upload (file_data.content) is decoded once and yielded as a single frame.
 
-async def update_metadata_pipeline(file_data: InputCSV) -> UpdatePipelineMetadata:
+    Args:
+        file_data (InputCSV): InputCSV instance containing file data and metadata
+        chunk_size (int): Maximum number of rows per chunk for spooled uploads.
+
+    Yields:
+        pd.DataFrame: Processed input data with extracted SampleType from UID.
+    """
+    if not file_data.path:
+        yield await get_input_data(file_data)
+        return
+    reader = pd.read_csv(file_data.path, dtype=str, chunksize=chunk_size)
+    try:
+        while True:
+            # Parsing is blocking, so each chunk is read off the event loop
+            chunk = await asyncio.to_thread(next, reader, None)
+            if chunk is None:
+                break
+            yield prepare_input_frame(chunk)
+    finally:
+        reader.close()
+
+
+async def update_input_frame(st_attributes: pd.DataFrame, input_data: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Runs the validate → fetch → merge → write stages for one frame of input data.
+
+    Args:
+        st_attributes (pd.DataFrame): DataFrame containing attribute titles and sample type titles.
+        input_data (pd.DataFrame): Processed input data returned by get_input_data or iter_input_chunks.
+
+    Returns:
+        Dict[str, Any]: The number of records processed, the missing attribute messages and the write statistics.
+    """
+    # Check if attributes you want to update exist in the DB
+    logger.info("Checking if attributes exist in the DB")
+    attributes_to_check = await check_attributes(st_attributes, input_data)
+    
+    # Removes samples from input who have 0's in the attributes_to_check
+    logger.info("Filtering samples with missing attributes")
+    input_filtered = await filter_attributes(attributes_to_check, input_data)
+    
+    # Fetch json_metadata in Batches
+    logger.info("Fetching json_metadata in Batches")
+    metadata_dict, batch_size = await fetch_relevant_metadata(input_filtered)
+    
+    # Update json_metadata in memory
+    logger.info("Updating json_metadata in memory")
+    update_data, not_found_attrs = await update_metadata(metadata_dict, input_filtered)
+    
+    # Perform batch updates
+    logger.info("Performing batch updates")
+    write_stats = await update_records(update_data, batch_size, not_found_attrs)
+
+    # The search index and the count snapshot are brought up to date first, so that the answers
+    # cached after the invalidation are current
+    written = {uid: metadata_dict[uid] for _, uid in update_data[:len(update_data) - write_stats["failed_records"]]}
+    await asyncio.to_thread(index_samples, written)
+    await asyncio.to_thread(update_snapshot_samples, written)
+    # Cached answers about the written samples are stale, including those of a partially failed write
+    await asyncio.to_thread(invalidate_uids, [uid for _, uid in update_data])
+    return {
+        "records_processed": len(input_filtered),
+        "records_updated": len(update_data) - write_stats["failed_records"],
+        "not_found_attrs": not_found_attrs,
+        **write_stats
+    }
+
+
+async def update_metadata_pipeline(
+    file_data: InputCSV,
+    chunk_size: int = UPDATE_CSV_CHUNK_SIZE,
+    progress_callback: Optional[Callable[[Dict[str, Any]], Any]] = None
+) -> UpdatePipelineMetadata:
     """
     Main function that orchestrates the entire metadata update process.
     
@@ -374,8 +493,14 @@ async def update_metadata_pipeline(file_data: InputCSV) -> UpdatePipelineMetadat
     5. Updates metadata in memory
     6. Performs batch updates to the database
 
+    Steps 2 to 6 run once per chunk of the input, so an upload spooled to disk is processed with
+    bounded memory whatever its size.
+
     Args:
         file_data (InputCSV): InputCSV instance containing file data and metadata
+        chunk_size (int): Maximum number of rows processed per chunk for spooled uploads.
+        progress_callback (Optional[Callable]): Called (or awaited) after every chunk with the
+            chunk number, the rows processed so far and the records updated so far.
     
     Returns:
         Dict[str, Any]: Dictionary containing execution results and logs
@@ -396,9 +521,16 @@ async def update_metadata_pipeline(file_data: InputCSV) -> UpdatePipelineMetadat
             "total_records_processed": 0,
             "records_updated": 0,
             "missing_attributes": 0,
-            "execution_time": 0
+            "execution_time": 0,
+            "rows_affected": 0,
+            "failed_records": 0,
+            "lock_retries": 0,
+            "chunks": 0,
+            "batches": []
         }
     }
+    stats = results["stats"]
+    not_found_attrs = []
     
     try:
         start_time = time.time()
@@ -407,42 +539,50 @@ async def update_metadata_pipeline(file_data: InputCSV) -> UpdatePipelineMetadat
         logger.info("Getting sample attributes")
         st_attributes = await get_st_attributes(output_format = 'df', filter_by = None)
         
-        # Check if attributes you want to update exist in the DB
-        logger.info("Checking if attributes exist in the DB")
-        attributes_to_check = await check_attributes(st_attributes, file_data)
-        
-        # Removes samples from input who have 0's in the attributes_to_check
-        logger.info("Filtering samples with missing attributes")
-        input_filtered = await filter_attributes(attributes_to_check, file_data)
+        # Decode and parse the uploaded CSV once, chunk by chunk when it was spooled to disk
+        async for input_data in iter_input_chunks(file_data, chunk_size):
+            chunk_stats = await update_input_frame(st_attributes, input_data)
+            stats["chunks"] += 1
+            stats["total_records_processed"] += chunk_stats["records_processed"]
+            stats["records_updated"] += chunk_stats["records_updated"]
+            stats["rows_affected"] += chunk_stats["rows_affected"]
+            stats["failed_records"] += chunk_stats["failed_records"]
+            stats["lock_retries"] += chunk_stats["lock_retries"]
+            stats["batches"].extend(chunk_stats["batches"])
+            stats["missing_attributes"] += len(chunk_stats["not_found_attrs"])
+            # Only the messages that can be reported are kept across chunks
+            not_found_attrs.extend(chunk_stats["not_found_attrs"][:max(0, 100 - len(not_found_attrs))])
+            logger.info(f"Processed chunk {stats['chunks']}: {stats['total_records_processed']} records processed, {stats['records_updated']} updated")
+
+            if progress_callback is not None:
+                progress = progress_callback({
+                    "chunk": stats["chunks"],
+                    "records_processed": stats["total_records_processed"],
+                    "records_updated": stats["records_updated"]
+                })
+                if inspect.isawaitable(progress):
+                    await progress
+            if chunk_stats["failed_records"]:
+                break  # Stop further chunks if a write failed
         
-        # Fetch json_metadata in Batches
-        logger.info("Fetching json_metadata in Batches")
-        metadata_dict, batch_size = await fetch_relevant_metadata(input_filtered)
-        
-        # Update json_metadata in memory
-        logger.info("Updating json_metadata in memory")
-        update_data, not_found_attrs = await update_metadata(metadata_dict, input_filtered)
-        
-        # Perform batch updates
-        logger.info("Performing batch updates")
-        await update_records(update_data, batch_size, not_found_attrs)
+        # The written metadata may add JSON keys, so the cached schema is refreshed in the background
+        if stats["records_updated"]:
+            invalidate_schema_cache('DB_NAME')
         
         end_time = time.time()
         execution_time = end_time - start_time
         logger.info(f"Total time taken: {execution_time:.2f} seconds")
-        
-        # Update stats
-        results["stats"]["total_records_processed"] = len(input_filtered)
-        results["stats"]["records_updated"] = len(update_data)
-        results["stats"]["missing_attributes"] = len(not_found_attrs) if not_found_attrs else 0
-        results["stats"]["execution_time"] = execution_time
+        stats["execution_time"] = execution_time
         
         # Add missing attribute warnings if any
         if not_found_attrs:
             results["errors"] = not_found_attrs[:100]  # Limit to first 100
-            results["missing_attributes"] = len(not_found_attrs)
-            if len(not_found_attrs) > 100:
-                results["errors"].append(f"...and {len(not_found_attrs) - 100} more attribute errors")
+            results["missing_attributes"] = stats["missing_attributes"]
+            if stats["missing_attributes"] > 100:
+                results["errors"].append(f"...and {stats['missing_attributes'] - 100} more attribute errors")
+        if stats["failed_records"]:
+            results["success"] = False
+            results["errors"].append(f"{stats['failed_records']} records could not be written")
                 
     except Exception as e:
         logger.error(f"Pipeline failed: {str(e)}", exc_info=True)
@@ -459,6 +599,52 @@ async def update_metadata_pipeline(file_data: InputCSV) -> UpdatePipelineMetadat
     
     return results
 
+async def run_update_metadata_job(payload: dict, progress: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+    """
+    Job handler running update_metadata_pipeline in the background and deleting the spooled upload afterwards.
+
+    Args:
+        payload (dict): The InputCSV fields of the upload.
+        progress (Callable): Records the progress of the job after every chunk.
+
+    Returns:
+        Dict[str, Any]: The UpdatePipelineMetadata of the update.
+    """
+    file_data = InputCSV(**payload)
+    try:
+        return await update_metadata_pipeline(file_data, progress_callback=progress)
+    finally:
+        if file_data.path and os.path.exists(file_data.path):
+            os.remove(file_data.path)
+
+job_queue.register("update_metadata", run_update_metadata_job)
+
+
+async def submit_update_metadata_job(file_data: InputCSV) -> UpdatePipelineMetadata:
+    """
+    Queues the metadata update of an uploaded CSV as a background job and returns its handle immediately.
+    The spooled upload is moved to a path owned by the job so that it outlives the request.
+
+    Args:
+        file_data (InputCSV): InputCSV instance containing file data and metadata
+
+    Returns:
+        Dict[str, Any]: An UpdatePipelineMetadata carrying the job ID and its queued status.
+    """
+    if file_data.path:
+        job_path = f"{os.path.splitext(file_data.path)[0]}.job.csv"
+        os.replace(file_data.path, job_path)
+        file_data = file_data.model_copy(update={"path": job_path})
+    job_id = await job_queue.submit("update_metadata", file_data.model_dump(), session_id=file_data.session_id)
+    return {
+        "success": True,
+        "logs": [f"Metadata update queued as job {job_id}. Its status and progress are available at /jobs/{job_id}."],
+        "errors": [],
+        "stats": {},
+        "job_id": job_id,
+        "status": "queued"
+    }
+
 if __name__ == "__main__":
     result = asyncio.run(update_metadata_pipeline())
         # Optionally print logs
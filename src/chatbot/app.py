@@ -2,7 +2,7 @@
 import streamlit as st
 from dotenv import load_dotenv
 import asyncio
-import sys, os, base64, io
+import sys, os, base64, io, json
 # from io import StringIO
 from datetime import datetime, timezone
 import aiohttp  # For async HTTP requests
@@ -78,9 +78,10 @@ def setup_ui():
     for speaker, message in st.session_state.conversation:
         st.chat_message(speaker.lower()).write(message)
 
-    # Set a unique session ID and version for the conversation
-    st.session_state.session_id = str(uuid.uuid4())
-    st.session_state.version = 1
+    # Set a unique session ID and version once per browser session; Streamlit reruns this script on every interaction
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = str(uuid.uuid4())
+        st.session_state.version = 1
 
     user_input = st.chat_input(placeholder="e.g., Tell me more about sample NHP-220630FLY-15?")
     return uploaded_file, user_input, st.session_state.session_id, st.session_state.version
@@ -117,6 +118,62 @@ async def run_agent_chatbot(user_input: str, session_id: str, version: int):
         st.error(f"Connection error: {str(e)}")
         return {}
 
+async def stream_agent_chatbot(user_input: str, session_id: str, version: int):
+    """
+    Send the user input to the streaming endpoint, showing the graph progress and the answer
+    while it is generated. Returns the final messages like run_agent_chatbot.
+    """
+    delta = {
+        "session_id": session_id,
+        "new_message": user_input,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "version": version
+    }
+    backend_url = "http://backend:8000/sampleretriever/invoke-stream/"
+    # Only the time between two events is bounded, a long answer keeps the stream alive
+    timeout = aiohttp.ClientTimeout(total=None, sock_read=600)
+
+    status = st.status("Thinking...", expanded=False)
+    answer = st.empty()
+    streamed = ""
+    result = []
+    try:
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.post(backend_url, json=delta) as response:
+                if response.status != 200:
+                    error_msg = await response.text()
+                    st.error(f"Backend error: {response.status} - {error_msg}")
+                    return []
+                event = None
+                async for raw_line in response.content:
+                    line = raw_line.decode("utf-8").rstrip("\n")
+                    if line.startswith("event: "):
+                        event = line[len("event: "):]
+                        continue
+                    if not line.startswith("data: "):
+                        continue
+                    data = json.loads(line[len("data: "):])
+                    if event == "node_start":
+                        status.update(label=f"Running {data['node']}...")
+                    elif event == "node_end":
+                        status.write(f"{data['node']} finished in {data['seconds']:.1f} s")
+                    elif event == "token" and data["node"] == "response_formatter":
+                        streamed = data["delta"] if data.get("reset") else streamed + data["delta"]
+                        answer.markdown(streamed)
+                    elif event == "final":
+                        result = data["messages"]
+                    elif event == "error":
+                        st.error(data["detail"])
+    except asyncio.TimeoutError:
+        st.error("Request timed out. Please try again.")
+    except aiohttp.ClientError as e:
+        st.error(f"Connection error: {str(e)}")
+    finally:
+        status.update(label="Done", state="complete")
+        # The validated answer is displayed by display_ai_response
+        answer.empty()
+    return result
+
 def display_user_input(user_input):
     st.chat_message("user").write(user_input)
     st.session_state.conversation.append(("User", user_input))
@@ -157,8 +214,7 @@ async def run_all():
     # Process the chat input if provided
     if user_input and session_id:
         display_user_input(user_input)
-        with st.spinner('Thinking...'):
-            result = await run_agent_chatbot(user_input, session_id, version)
+        result = await stream_agent_chatbot(user_input, session_id, version)
         display_ai_response(result)
         # Remove the uploaded file from the session state after processing the chat input
     return remove_uploaded_file()
@@ -21,8 +21,8 @@ file_map = {
     "conversationalist.baml": "class ChatResponse {\n    name string @description(\"The name of the current worker : conversationalist\")\n    retrieve_info bool @description(\"Whether to retrieve information from the database\")\n    response string? @description(\"The response to the user's query only if retrieve_info is false\")\n    user_query string @description(\"The user's query\")\n    justification string @description(\"The justification for the response\")\n}\n\n// client<llm> ConversationalistClient {\n//   provider \"openai\"\n//   retry_policy MaxRetries\n//   options {\n//     api_key env.OPENAI_API_KEY\n//     model \"gpt-4o\"\n//     temperature 0.7\n//   }\n// }\n\nfunction Conversationalist(context: Payload) -> ChatResponse {\n    client MyClient\n    prompt #\"\n        {{ GetSystemPrompt() }}\n\n        {{ GetNExtSEEKIntro() }}\n\n        Your task is to examine the user query {{ context.user_query }} and parsed query in {{ context.resource }} to determine if it is a question that requires information to be retrieved from the database.\n\n        If it is, set retrieve_info to true and return the user_query, your justification, and the response should be null.\n\n        If it is not, set retrieve_info to false and return the user_query, your justification, and the response should be a friendly and helpful reply to the user's query.\n\n        Do not make up information. If you do not know the answer, set retrieve_info to 'true' in order to start the process for retrieving information from the database.\n\n        If the user asks to update the metadata of the samples, set retrieve_info to true and return the user_query, your justification, and the response should be null.\n\n        \\nImportant: If the user's query is not related to NExtSEEK or data management, set retrieve_info to false and return the user_query, your justification, and your response should be a friendly reply to the user outlining your role. \n        {{ ctx.output_format }}\n    \"#\n}\n\ntest converse {\n    functions [Conversationalist]\n    args {\n        user_query #\"Hey! What's up?\"#\n    }\n}\n\ntest converse2 {\n    functions [Conversationalist]\n    args {\n        user_query #\"Hi! Where can I find the protocol for the sample NHP-220630FLY-15?\"#\n    }\n}\n\ntest converse3 {\n        functions [Conversationalist]\n    args {\n        user_query #\"Hi! Which country has the best food?\"#\n    }\n}\n\n\n\n\n",
     "data_summarizer.baml": "\nfunction SummarizeData(inputMessage: Payload) -> DataSummarizer {\n    client MyClient\n    prompt #\"\n      {{ GetSystemPrompt() }}\n      {{ GetNExtSEEKIntro() }}\n\n    Analyze the conversation and create a concise but informative summary to answer the user's query. \n\n    You must also use the resources provided as additional context to you to answer the user's query.\n    \n    Focus on:\n    1. Key points relevant to the user's query\n    2. Important details from available resources\n    3. Your summary should attempt to answer the user's query based on the information available\n    4. Never make up information, only use the information provided\n    5. Format your response as if addressing the user directly\n\n    User Query:\n    {{ inputMessage.user_query }}\n\n\n    Resources:\n    {{ inputMessage.resource }}\n\n    Messages:\n    {{ PrintMessages(inputMessage.aggregatedMessages) }}\n\n    {{ ctx.output_format }}\n    \"#\n}\n\ntest BasicSummary {\n  functions [SummarizeData]\n  args {\n    inputMessage {\n      user_query \"Can you help me find protocols related to RNA extraction from blood samples?\"\n      aggregatedMessages [\n        {\n          name \"user\"\n          message \"Can you help me find protocols related to RNA extraction from blood samples?\"\n          role \"user\"\n        }\n      ]\n      last_worker \"user\"\n    }\n  }\n}\n\ntest ComplexSummary {\n  functions [SummarizeData]\n  args {\n    inputMessage {\n      user_query \"I need the protocol from sample MIT-123 and its metadata\"\n      aggregatedMessages [\n        {\n          name \"protocol_retriever\"\n          message \"I retrieved the protocol for sample MIT-123 and its metadata\"\n          role \"assistant\"\n        }\n      ]\n      last_worker \"protocol_retriever\"\n      resource {\n        sampleMetadata [\n          {\n            id \"MIT-123\"\n            type \"blood_sample\"\n          }\n        ]\n        protocolUrl \"https://protocols.mit.edu/123\"\n        sampleUrl \"https://nextseek.mit.edu/seek/sampletree/uid=MIT-123\"\n      }\n    }\n  }\n}",
     "generators.baml": "// This helps use auto generate libraries you can use in the language of\n// your choice. You can have multiple generators if you use multiple languages.\n// Just ensure that the output_dir is different for each generator.\ngenerator target {\n    // Valid values: \"python/pydantic\", \"typescript\", \"ruby/sorbet\", \"rest/openapi\"\n    output_type \"python/pydantic\"\n\n    // Where the generated code will be saved (relative to baml_src/)\n    output_dir \"../\"\n\n    // The version of the BAML package you have installed (e.g. same version as your baml-py or @boundaryml/baml).\n    // The BAML VSCode extension version should also match this version.\n    version \"0.89.0\"\n\n    // Valid values: \"sync\", \"async\"\n    // This controls what `b.FunctionName()` will be (sync or async).\n    default_client_mode sync\n}\n",
-    "models.baml": "class DataSummarizer {\n    summary string @description(\"The summary of the input message\")\n    explanation string @description(\"The explanation for your response (how)\")\n    justification string @description(\"The justification for your response (why)\")\n}\n\nclass ToolArgs {\n    json_keys string?|string[]? @description(\"json_metadata key(s) for the attribute(s) to search\")\n    terms string[]? @description(\"terms to search for in the database\")\n    uid string?|string[]? @description(\"exact uid of each sample provided by the user\")\n    sample_type string[]? @description(\"specific sample type(s) to pass to the tool\")\n}\n\nclass Navigator {\n    agent Agent @description(\"The current agent in the conversation\")\n    explanation string @description(\"The description for choosing the next tool and tool arguments (how)\")\n    next_tool string @description(\"The next tool to use from the agent's toolbox\")\n    tool_args ToolArgs @description(\"The arguments to pass to the tool\")\n    justification string @description(\"The justification for choosing the next tool (why)\")\n}\n\nclass Responder {\n    Next_worker Agent @description(\"The next worker to call\")\n    explanation string @description(\"The explanation for choosing the next worker (how)\")\n    justification string @description(\"The justification for choosing the next worker (why)\")\n}\n\nclass ResponseFormatter {\n    formattedResponse string @description(\"Formatted response for the user\")\n    name string @description(\"The name of the current worker : response_formatter\")\n    explanation string @description(\"The explanation for your response (how)\")\n    justification string @description(\"The justification for your response (why)\")\n}\n\nclass Supervisor {\n    Next_worker Agent @description(\"The next worker to call\")\n    explanation string @description(\"The explanation for choosing the next worker (how)\")\n    justification string @description(\"The justification for choosing the next worker (why)\")\n}\n\nclass Metadata {\n    Link_PrimaryData string?\n    Name string? | int?\n    UID string\n    @@dynamic // allows adding fields dynamically at runtime\n}\n\nclass Messages {\n    name string @description(\"The name of the sender\")\n    message string @description(\"The message content\")\n    role string @description(\"The role of the sender (i.e. user, assistant)\")\n}\n\nclass Payload {\n    // system_message string @description(\"The system message\")\n    user_query string @description(\"The user message\")\n    aggregatedMessages Messages[] @description(\"The aggregated messages in the conversation\")\n    resource ResourceBox? @description(\"The resources available to the agent\")\n    last_worker string @description(\"The last worker that processed the message\")\n}\n\nclass Agent {\n    agent string @description(\"The name of the agent\")\n    role string @description(\"The role of the agent\")\n    toolbox map<string, ToolMetadata>? @description(\"The toolbox of the agent\")\n}\n\nclass Validator {\n    name string @description(\"The name of the current agent : validator\")\n    explanation string @description(\"The explanation for your response (how)\")\n    Valid bool @description(\"Whether the response is valid\")\n    response string? @description(\"same as inputMessage\")\n    error string? @description(\"The error message if the response contains an error\")\n    Clarifying_Question string? @description(\"A clarifying question to the user if Valid is false\")\n    justification string @description(\"The justification for your response (why)\")\n}\n\nclass ToolMetadata {\n    doc string @description(\"The documentation of the tool\")\n    signature string @description(\"The signature of the tool\")\n}\n\nclass Table {\n    name string @description(\"The name of the table\")\n    columns Column[] @description(\"The columns in the table\")\n}\n\nclass Column {\n    name string @description(\"The name of the column\")\n    type string @description(\"The type of the column\")\n    nullable bool @description(\"Whether the column can be null\")\n    default string? @description(\"The default value of the column\")\n    json_keys string[]? @description(\"The keys in the JSON column\")\n}\n\nclass DBSchema {\n    tables Table[] @description(\"The relevant tables in the database\")\n}\n\nclass SchemaMapper {\n    name string @description(\"The name of the agent: schema_mapper\")\n    relevant_keys string[] @description(\"The relevant keys in the database\")\n    schema_map DBSchema @description(\"The mapped schema of the database based on the user query\")\n    justification string @description(\"The justification for the mapping and proposed query\")\n    explanation string @description(\"The explanation for the mapping\")\n}\n\nclass SampleTypeAttributes {\n    sampletype string @description(\"The sample type i.e. MUS, TIS, CEL\")\n    st_description string @description(\"The description of the sample type\")\n    attributes string[] @description(\"The attributes of the sample type\")\n}\n\nclass UpdatePipelineMetadata{\n    success bool @description(\"Whether the update was successful\")\n    logs string[] @description(\"The logs from running the update pipeline\")\n    errors string[]? @description(\"The errors from running the update pipeline\")\n    stats map<string, int>? @description(\"The stats from running the update pipeline\")\n}\n\nclass ResourceBox {\n    sample_metadata Metadata? | Metadata[]? | string? @description(\"Sample metadata\")\n    protocolURL string? @description(\"Protocol download URL i.e.: https://nextseek.mit.edu/seek/sop/uid=<protocol_uid>\")\n    sampleURL string? @description(\"Sample URL i.e.: https://nextseek.mit.edu/seek/sampletree/uid=<sample_uid>\")\n    UIDs string[]? @description(\"List of UIDs\")\n    db_schema DBSchema? @description(\"A complete or partial schema of the database\")\n    parsed_query ParsedQuery? @description(\"The parsed user query\")\n    st_attributes SampleTypeAttributes[]? | SampleTypeAttributes? @description(\"The sample type attributes\")\n    update_info UpdatePipelineMetadata? @description(\"The update information\")\n}\n\nclass ParsedQuery {\n    uid string[]? | string? @description(\"extracted UIDs of the samples from the user query\")\n    sampletype string[]? | string? @description(\"extracted sample type from the user query i.e. mouse, tissue, cell line etc.\")\n    assay string[]? | string? @description(\"extracted assay from the user query i.e. flow cytometry, sequencing, etc.\")\n    attribute string[]? | string? @description(\"extracted attribute from the user query i.e. genotype, treatment, species, etc.\")\n    terms string[]? | string? @description(\"extracted terms from the user query associated with a specific attribute i.e. 'rituximab' for treatment \")\n}",
-    "navigator.baml": "\n// client<llm> NavClient {\n//   provider \"openai\"\n//   retry_policy MaxRetries\n//   options {\n//     api_key env.OPENAI_API_KEY\n//     model \"gpt-4o\"\n//     temperature 0\n//   }\n// }\n\nfunction Navigate(agent: Agent, payload: Payload) -> Navigator {\n    client MyClient\n    prompt #\"\n\n    {{ GetSystemPrompt() }}\n    {{ GetNExtSEEKIntro() }}\n\n    Your role is to determine the next appropriate tool to use from an agent's toolbox.\n\n    Instructions:\n    1. Analyze the user query {{ payload.user_query }} and conversation context\n    2. Select a tool from the agent's toolbox that best addresses the user query\n    3. Format tool arguments precisely based on the tool's requirements\n    4. Provide clear justification for your tool selection\n    5. Do not return a tool if none appear suitable to answer the user query. Instead return an empty string for the tool name and an empty list for the tool arguments.\n    6. You must carefully assess the metadadata on the tool selected to ensure that the arguments provided are valid. \n    7. Also, when providing the tool arguments, use the mapped database schema in {{ payload.resource }} to determine the exact database terms to pass in. \n    8. Do not make assumptions about the database schema. Only use the mapped schema in the resources.\n\n    Constraints:\n    - The tool name must exactly match one in the agent's toolbox\n    - Tool arguments should be specific and actionable\n    - If no suitable tool exists, explain why in the justification\n    - Only return the values for the tool arguments \n\n    - Conversation Context:\n    {{ payload }}\n    {{ ctx.output_format }}\n\n    {{ _.role(\"system\") }}\n    Current agent state and available tools:\n    \n    Agent Information:\n    {{ agent }}\n\n    Agent Toolbox:\n    {{ agent.toolbox }}\n  \"#\n}\n\ntest navigator {\n    functions [Navigate]\n    args {\n        agent {\n            agent \"basic_sample_info_retriever\"\n            role \"retrieves basic sample metadata\"\n            messages {\n                system_message #\"You are a helpful assistant that is tasked with answering user questions about a data management platform called NExtSEEK.\"#\n                user_query #\"What is the weather today?\"#\n                aggredatedMessages [#\"Can you tell me a little about the sample NHP-220630FLY-15?\"#]\n            }\n            resource {\n            }\n            toolbox [\"get_sample_name\", \"retrieve_sample_info\"]\n            tools_description {\n            \"get_sample_name\" #\"Get the name of the sample.\\nArgs:\\nsample_metadata (list): A list of dictionaries containing sample metadata.\\nReturns: str: The name of the sample.\"#\n            \"retrieve_sample_info\" #\"Retrieve the sample information for a given sample UID.\\nArgs:\\nuid (str): The UID of the sample.\\nReturns:\\nList[dict] | None: A list containing the metadata dictionary for the sample or None if an error occurred.\"#\n        }\n    }\n    }\n}\n",
+    "models.baml": "class DataSummarizer {\n    summary string @description(\"The summary of the input message\")\n    explanation string @description(\"The explanation for your response (how)\")\n    justification string @description(\"The justification for your response (why)\")\n}\n\nclass ToolArgs {\n    json_keys string?|string[]? @description(\"json_metadata key(s) for the attribute(s) to search\")\n    terms string[]? @description(\"terms to search for in the database\")\n    uid string?|string[]? @description(\"exact uid of each sample provided by the user\")\n    sample_type string[]? @description(\"specific sample type(s) to pass to the tool\")\n}\n\nclass ToolCall {\n    tool string @description(\"A tool from the agent's toolbox\")\n    tool_args ToolArgs @description(\"The arguments to pass to the tool\")\n}\n\nclass Navigator {\n    agent Agent @description(\"The current agent in the conversation\")\n    explanation string @description(\"The description for choosing the next tool and tool arguments (how)\")\n    next_tool string @description(\"The next tool to use from the agent's toolbox\")\n    tool_args ToolArgs @description(\"The arguments to pass to the tool\")\n    additional_calls ToolCall[] @description(\"Other tool calls answering further parts of the user query, independent of next_tool and of each other. Empty if next_tool answers the whole query\")\n    justification string @description(\"The justification for choosing the next tool (why)\")\n}\n\nclass Responder {\n    Next_worker Agent @description(\"The next worker to call\")\n    explanation string @description(\"The explanation for choosing the next worker (how)\")\n    justification string @description(\"The justification for choosing the next worker (why)\")\n}\n\nclass ResponseFormatter {\n    formattedResponse string @description(\"Formatted response for the user\")\n    name string @description(\"The name of the current worker : response_formatter\")\n    explanation string @description(\"The explanation for your response (how)\")\n    justification string @description(\"The justification for your response (why)\")\n}\n\nclass Supervisor {\n    Next_worker Agent @description(\"The next worker to call\")\n    explanation string @description(\"The explanation for choosing the next worker (how)\")\n    justification string @description(\"The justification for choosing the next worker (why)\")\n}\n\nclass Metadata {\n    Link_PrimaryData string?\n    Name string? | int?\n    UID string\n    @@dynamic // allows adding fields dynamically at runtime\n}\n\nclass Messages {\n    name string @description(\"The name of the sender\")\n    message string @description(\"The message content\")\n    role string @description(\"The role of the sender (i.e. user, assistant)\")\n}\n\nclass Payload {\n    // system_message string @description(\"The system message\")\n    user_query string @description(\"The user message\")\n    aggregatedMessages Messages[] @description(\"The aggregated messages in the conversation\")\n    resource ResourceBox? @description(\"The resources available to the agent\")\n    last_worker string @description(\"The last worker that processed the message\")\n}\n\nclass Agent {\n    agent string @description(\"The name of the agent\")\n    role string @description(\"The role of the agent\")\n    toolbox map<string, ToolMetadata>? @description(\"The toolbox of the agent\")\n}\n\nclass Validator {\n    name string @description(\"The name of the current agent : validator\")\n    explanation string @description(\"The explanation for your response (how)\")\n    Valid bool @description(\"Whether the response is valid\")\n    response string? @description(\"same as inputMessage\")\n    error string? @description(\"The error message if the response contains an error\")\n    Clarifying_Question string? @description(\"A clarifying question to the user if Valid is false\")\n    justification string @description(\"The justification for your response (why)\")\n}\n\nclass ToolMetadata {\n    doc string @description(\"The documentation of the tool\")\n    signature string @description(\"The signature of the tool\")\n}\n\nclass Table {\n    name string @description(\"The name of the table\")\n    columns Column[] @description(\"The columns in the table\")\n}\n\nclass Column {\n    name string @description(\"The name of the column\")\n    type string @description(\"The type of the column\")\n    nullable bool @description(\"Whether the column can be null\")\n    default string? @description(\"The default value of the column\")\n    json_keys string[]? @description(\"The keys in the JSON column\")\n}\n\nclass DBSchema {\n    tables Table[] @description(\"The relevant tables in the database\")\n}\n\nclass SchemaMapper {\n    name string @description(\"The name of the agent: schema_mapper\")\n    relevant_keys string[] @description(\"The relevant keys in the database\")\n    schema_map DBSchema @description(\"The mapped schema of the database based on the user query\")\n    justification string @description(\"The justification for the mapping and proposed query\")\n    explanation string @description(\"The explanation for the mapping\")\n}\n\nclass SampleTypeAttributes {\n    sampletype string @description(\"The sample type i.e. MUS, TIS, CEL\")\n    st_description string @description(\"The description of the sample type\")\n    attributes string[] @description(\"The attributes of the sample type\")\n}\n\nclass UpdatePipelineMetadata{\n    success bool @description(\"Whether the update was successful\")\n    logs string[] @description(\"The logs from running the update pipeline\")\n    errors string[]? @description(\"The errors from running the update pipeline\")\n    stats map<string, int | float | map<string, float>[]>? @description(\"The stats from running the update pipeline, including the per-batch write timings\")\n    job_id string? @description(\"The ID of the background job running the update\")\n    status string? @description(\"The status of the background job: queued, running, succeeded, failed or cancelled\")\n}\n\nclass ResourceBox {\n    sample_metadata Metadata? | Metadata[]? | string? @description(\"Sample metadata\")\n    protocolURL string? @description(\"Protocol download URL i.e.: https://nextseek.mit.edu/seek/sop/uid=<protocol_uid>\")\n    sampleURL string? @description(\"Sample URL i.e.: https://nextseek.mit.edu/seek/sampletree/uid=<sample_uid>\")\n    UIDs string[]? @description(\"List of UIDs\")\n    db_schema DBSchema? @description(\"A complete or partial schema of the database\")\n    parsed_query ParsedQuery? @description(\"The parsed user query\")\n    st_attributes SampleTypeAttributes[]? | SampleTypeAttributes? @description(\"The sample type attributes\")\n    update_info UpdatePipelineMetadata? @description(\"The update information\")\n    aggregates string? @description(\"Exact sample counts per attribute value, as a table with | separators\")\n}\n\nclass ParsedQuery {\n    uid string[]? | string? @description(\"extracted UIDs of the samples from the user query\")\n    sampletype string[]? | string? @description(\"extracted sample type from the user query i.e. mouse, tissue, cell line etc.\")\n    assay string[]? | string? @description(\"extracted assay from the user query i.e. flow cytometry, sequencing, etc.\")\n    attribute string[]? | string? @description(\"extracted attribute from the user query i.e. genotype, treatment, species, etc.\")\n    terms string[]? | string? @description(\"extracted terms from the user query associated with a specific attribute i.e. 'rituximab' for treatment \")\n}",
+    "navigator.baml": "\n// client<llm> NavClient {\n//   provider \"openai\"\n//   retry_policy MaxRetries\n//   options {\n//     api_key env.OPENAI_API_KEY\n//     model \"gpt-4o\"\n//     temperature 0\n//   }\n// }\n\nfunction Navigate(agent: Agent, payload: Payload) -> Navigator {\n    client MyClient\n    prompt #\"\n\n    {{ GetSystemPrompt() }}\n    {{ GetNExtSEEKIntro() }}\n\n    Your role is to determine the next appropriate tool to use from an agent's toolbox.\n\n    Instructions:\n    1. Analyze the user query {{ payload.user_query }} and conversation context\n    2. Select a tool from the agent's toolbox that best addresses the user query\n    3. Format tool arguments precisely based on the tool's requirements\n    4. Provide clear justification for your tool selection\n    5. Do not return a tool if none appear suitable to answer the user query. Instead return an empty string for the tool name and an empty list for the tool arguments.\n    6. You must carefully assess the metadadata on the tool selected to ensure that the arguments provided are valid. \n    7. Also, when providing the tool arguments, use the mapped database schema in {{ payload.resource }} to determine the exact database terms to pass in. \n    8. Do not make assumptions about the database schema. Only use the mapped schema in the resources.\n    9. If the user query asks for several things that different tools answer independently (i.e. the protocol and the descendants of a sample), return the first one as the next tool and the others in additional_calls. Never put a tool in additional_calls that needs the result of another tool.\n\n    Constraints:\n    - The tool name must exactly match one in the agent's toolbox\n    - Tool arguments should be specific and actionable\n    - If no suitable tool exists, explain why in the justification\n    - Only return the values for the tool arguments \n\n    - Conversation Context:\n    {{ payload }}\n    {{ ctx.output_format }}\n\n    {{ _.role(\"system\") }}\n    Current agent state and available tools:\n    \n    Agent Information:\n    {{ agent }}\n\n    Agent Toolbox:\n    {{ agent.toolbox }}\n  \"#\n}\n\ntest navigator {\n    functions [Navigate]\n    args {\n        agent {\n            agent \"basic_sample_info_retriever\"\n            role \"retrieves basic sample metadata\"\n            messages {\n                system_message #\"You are a helpful assistant that is tasked with answering user questions about a data management platform called NExtSEEK.\"#\n                user_query #\"What is the weather today?\"#\n                aggredatedMessages [#\"Can you tell me a little about the sample NHP-220630FLY-15?\"#]\n            }\n            resource {\n            }\n            toolbox [\"get_sample_name\", \"retrieve_sample_info\"]\n            tools_description {\n            \"get_sample_name\" #\"Get the name of the sample.\\nArgs:\\nsample_metadata (list): A list of dictionaries containing sample metadata.\\nReturns: str: The name of the sample.\"#\n            \"retrieve_sample_info\" #\"Retrieve the sample information for a given sample UID.\\nArgs:\\nuid (str): The UID of the sample.\\nReturns:\\nList[dict] | None: A list containing the metadata dictionary for the sample or None if an error occurred.\"#\n        }\n    }\n    }\n}\n",
     "query_parser.baml": "class QueryParser {\n    parsed_query ParsedQuery @description(\"Parsed user query\")\n    // tasks string[] @description(\"List of tasks to be performed\")\n    explanation string @description(\"Explanation of your reasoning (how you arrived at the parsed query)\")\n    justification string @description(\"The justification for your reasoning (why you chose the parsed query)\")\n}\n\n// client<llm> ParseQueryClient {\n//     provider \"openai\"\n//     retry_policy MaxRetries\n//     options {\n//         api_key env.OPENAI_API_KEY\n//         model \"gpt-4o\"\n//         temperature 0\n//     }\n// }\nfunction ParseQuery(context: Payload) -> QueryParser {\n    client Reasoner\n    prompt  #\"\n      {{ GetSystemPrompt() }}\n      {{ GetNExtSEEKIntro() }}\n    \n    Your task is to breaks down complex user queries {{ context.user_query }} into atomic parts.\n    Your goal is to create a clear and structured version of the user query.\n    When multiple user queries are detected, you must prioritize the recent query which can be identified by the timestamp. Only use the old queries as additional context to help parse the most recent query.\n\n    Example:\n    **Single user query**\n    User: \"Please list all samples with genotype ''RaDR+/+; GPT+/+; Aag -/-'?\"\n    Parsed query would be:\n    {\n        \"attribute\" \"genotype\",\n        \"terms\" \"RaDR+/+; GPT+/+; Aag -/-\"\n    }\n    **Multiple user query**\n    User: \"Tell me about the sample 1099 (2025-05-24T19:31:47.378217+00:00); Can you list all the children of that sample? (2025-05-24T19:32:48.193432+00:00)\"\n    Parsed query would be:\n    {\n      \"UIDs\": [\"1099\"]\n    }\n\n    If you are unsure about the tasks, you can ask the user for clarification by returning a question as the explanation and justification as \"I am unsure about the tasks. Please clarify your query.\"\n\n    {{ context }}\n    {{ ctx.output_format }}\n  \"#\n}\n\ntest SimpleQueryParse {\n  functions [ParseQuery]\n  args {\n    user_query \"What's the weather like in Paris and should I pack an umbrella?\"\n  }\n}\n\ntest ComplexQueryParse {\n  functions [ParseQuery]\n  args {\n    user_query \"What is the link to the sample page for the parent sample of sample 1099?\"\n  }\n}",
     "responder.baml": "// Create a function to respond to the user's query.\nfunction Respond(inputMessage: Payload, workers: Agent[]) -> Responder {\n    client MyClient\n    prompt #\"\n    {{ GetSystemPrompt() }}\n    {{ GetNExtSEEKIntro() }}\n\n    Your role is to direct the flow of an ongoing conversation by selecting the next appropriate worker to handle the next task. \n\n    Worker Selection Rules:\n    1. Workers must be used in this sequence: {{ workers }}\n    2. Workers must be used in the order of the list \n    3. Workers with 'optional' in name should only be used when necessary\n    4. Never repeat a worker\n    5. Choose based on the current conversation state and needs\n    6. If an error occurred in a previous worker, summarize the error and return the next worker.\n    7. NEVER make up an answer. If the answer is not already in the resources or the conversation history, clearly state that you do not know the answer.\n\n    Selection Process:\n    - Analyze the current conversation stage\n    - Check if optional workers are needed\n    - Verify if validation is complete\n    - Provide clear justification for your choice\n\n    {{ ctx.output_format }}\n\n    {{ _.role(\"system\") }}\n    \n    Available Workers:\n    {% for worker in workers %}\n    --- Worker: {{ worker.agent }}\n    --- Role: {{ worker.role }}\n    --- Toolbox: {{ worker.toolbox }}\n    {% endfor %}\n\n    {{ _.role(\"user\") }}\n    Current Query: {{ inputMessage.user_query }}\n\n    {% if inputMessage.aggregatedMessages %}\n    Conversation History:\n    {{ PrintMessages(inputMessage.aggregatedMessages) }}\n    {% endif %}\n\n    {% if inputMessage.resource %}\n    Active Resources:\n    {{ inputMessage.resource }}\n    {% endif %}\n  \"#\n}\n\n// Test the function with a sample input. Open the VSCode playground to run this.\ntest responder {\n    functions [Respond]\n    args {\n        inputMessage {\n            system_message #\"You are a helpful assistant that is a part of a network of workers tasked with answering user questions about a data management platform called NExtSEEK.\"#\n            user_query #\"Can you tell me more about the sample with UID PAV-220630FLY-1031?\"#\n            aggredatedMessages [#\"Can you tell me more about the sample with UID PAV-220630FLY-1031?\"#, #\"Summary: The sample with UID 'PAV-220630FLY-1031' is named '29518-190327' and is associated with the scientist JoAnne Flynn. It is categorized as a 'Scan' type sample and is linked to the protocol 'P.FLY-231011-V1_Patient-Visit-CD8.docx'. The sample was created on March 27, 2019, and is part of the Flynn Lab. Additional notes mention 'P0099'. The sample is a child of 'NHP-220630FLY-2'. More details can be found at the provided URI.\"#, #\"Here are the details for the sample with UID PAV-220630FLY-1031:\\n\\n- **Name**: 29518-190327\\n- **Notes**: P0099\\n- **Scientist**: JoAnne Flynn\\n- **Protocol**: [P.FLY-231011-V1_Patient-Visit-CD8.docx](https://nextseek.mit.edu/seek/sop/uid=P.FLY-231011-V1_Patient-Visit-CD8.docx)\\n- **Publish URI**: [Sample Link](https://fairdomhub.org/samples/23142)\\n- **Sample URL**: [Sample Details](https://nextseek.mit.edu/seek/sampletree/uid=PAV-220630FLY-1031)\"#, #\"Validation: The response is valid.\"#]\n            resource {\n                sample_metadata [\n                    {\n                        UID \"PAV-220630FLY-1031\"\n                        Name \"29518-190327\"\n                        Scientist \"JoAnne Flynn\"\n                    }\n                ],\n                protocolUrl \"https://nextseek.mit.edu/seek/sop/uid=P.FLY-231011-V1_Patient-Visit-CD8.docx\"\n                sampleUrl \"https://nextseek.mit.edu/seek/sampletree/uid=PAV-220630FLY-1031\"\n            }\n        },\n        workers [\n            {\n                agent \"response_formatter\"\n                role \"Aggregate and format information into an answer to the user's query\"\n                messages {\n                    system_message #\"You are a helpful assistant that is a part of a network of workers tasked with answering user questions about a data management platform called NExtSEEK.\"#\n                    user_query null\n                    aggredatedMessages null\n                    resource {\n                        sample_metadata null\n                        protocolUrl null\n                        sampleUrl null\n                    }\n                }\n            },\n            {\n                agent \"validator\"\n                role \"Validate the response from the response formatter\"\n                messages {\n                    system_message #\"You are a helpful assistant that is a part of a network of workers tasked with answering user questions about a data management platform called NExtSEEK.\"#\n                    user_query null\n                    aggredatedMessages null\n                    resource {\n                        sample_metadata null\n                        protocolUrl null\n                        sampleUrl null\n                    }\n                }\n            },\n            {\n                agent \"FINISH\"\n                role \"Finish the conversation\"\n                messages {\n                    system_message #\"You are a helpful assistant that is a part of a network of workers tasked with answering user questions about a data management platform called NExtSEEK.\"#\n                    user_query null\n                    aggredatedMessages null\n                    resource {\n                        sample_metadata null\n                        protocolUrl null\n                        sampleUrl null\n                    }\n                }\n            }\n        ]\n    }\n}",
     "response_formatter.baml": "function FormatResponse(messages: Payload) -> ResponseFormatter {\n\n    client MyClient\n        prompt #\"\n    {{ GetSystemPrompt() }}\n\n    Format a response using only the provided messages and resources. \n\n    Guidelines:\n    - Only use information from provided sources\n    - Preserve any special formatting (URLs, JSON, etc.)\n    - Indicate if information is insufficient to answer\n    - Structure the response clearly with bullet points when appropriate\n    - If the response contains one or a list of UIDs, format the UIDs as links to the sample page in this way: [UID](https://nextseek.mit.edu/seek/sampletree/uid={UID}).\n\n    **NOTE:** If the answer to the user's query exists in the message history, but an error occurred downstream, you should still provide the answer to the user's query instead of summarizing the error. The goal is to answer the user, not to summarize the conversation history. \n\n    User Query:\n    {{ messages.user_query }}\n\n    {% if messages.aggregatedMessages %}\n    Conversation History:\n    {{ PrintMessages(messages.aggregatedMessages) }}\n    {% endif %}\n\n    Resources:\n    {{ messages.resource }}\n\n    {{ctx.output_format}}\n        \"#\n}\n\ntest BasicFormatting {\n  functions [FormatResponse]\n  args {\n    messages {\n      system_message \"You are a helpful lab assistant\"\n      user_query \"What protocol should I use for sample MIT-123?\"\n      aggregatedMessages [\"What protocol should I use for sample MIT-123?\"]\n    }\n  }\n}\n\ntest myresponse {\n\n    functions [FormatResponse]\n    args {\n        messages {\n            system_message #\"You are a helpful assistant that is a part of a network of workers tasked with answering user questions about a data management platform called NExtSEEK.\"#\n            user_query #\"Can you tell me more about the sample with UID PAV-220630FLY-1031?\"#\n            aggredatedMessages [#\"Can you tell me more about the sample with UID PAV-220630FLY-1031?\"#, #\"Summary: The sample with UID 'PAV-220630FLY-1031' is named '29518-190327' and is associated with the scientist JoAnne Flynn. It is categorized as a 'Scan' type sample and is linked to the protocol 'P.FLY-231011-V1_Patient-Visit-CD8.docx'. The sample was created on March 27, 2019, and is part of the Flynn Lab. Additional notes mention 'P0099'. The sample is a child of 'NHP-220630FLY-2'. More details can be found at the provided URI.\"#]\n            resource {\n                sample_metadata [\n                    {\n                        UID \"PAV-220630FLY-1031\"\n                        Name \"29518-190327\"\n                        Scientist \"JoAnne Flynn\"\n                        RecordDate \"\"\n                        Protocol \"P.FLY-231011-V1_Patient-Visit-CD8.docx\"\n                        Type \"Scan\"\n                        Parent \"NHP-220630FLY-2\"\n                        VisitFacility \"Flynn Lab\"\n                        VisitLocation \"\"\n                        Notes \"P0099\"\n                        Publish_uri \"https://fairdomhub.org/samples/23142\"\n                    }],\n                protocolUrl \"https://nextseek.mit.edu/seek/sop/uid=P.FLY-231011-V1_Patient-Visit-CD8.docx\"\n                sampleUrl \"https://nextseek.mit.edu/seek/sampletree/uid=PAV-220630FLY-1031\"\n            }\n        }\n    }\n}\n\n",
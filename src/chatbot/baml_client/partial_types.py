@@ -80,6 +80,7 @@ class Navigator(BaseModel):
     explanation: Optional[str] = None
     next_tool: Optional[str] = None
     tool_args: Optional["ToolArgs"] = None
+    additional_calls: List["ToolCall"]
     justification: Optional[str] = None
 
 class ParsedQuery(BaseModel):
@@ -109,6 +110,7 @@ class ResourceBox(BaseModel):
     parsed_query: Optional["ParsedQuery"] = None
     st_attributes: Optional[Union[Optional[List["SampleTypeAttributes"]], "SampleTypeAttributes"]] = None
     update_info: Optional["UpdatePipelineMetadata"] = None
+    aggregates: Optional[str] = None
 
 class Responder(BaseModel):
     Next_worker: Optional["Agent"] = None
@@ -148,6 +150,10 @@ class ToolArgs(BaseModel):
     uid: Optional[Union[Optional[str], Optional[List[str]]]] = None
     sample_type: Optional[List[str]] = None
 
+class ToolCall(BaseModel):
+    tool: Optional[str] = None
+    tool_args: Optional["ToolArgs"] = None
+
 class ToolMetadata(BaseModel):
     doc: Optional[str] = None
     signature: Optional[str] = None
@@ -156,7 +162,9 @@ class UpdatePipelineMetadata(BaseModel):
     success: Optional[bool] = None
     logs: List[str]
     errors: Optional[List[str]] = None
-    stats: Optional[Dict[str, Optional[int]]] = None
+    stats: Optional[Dict[str, Optional[Union[int, float, List[Dict[str, Optional[float]]]]]]] = None
+    job_id: Optional[str] = None
+    status: Optional[str] = None
 
 class Validator(BaseModel):
     name: Optional[str] = None
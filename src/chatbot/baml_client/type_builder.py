@@ -22,7 +22,7 @@ from .globals import DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_RUNTIM
 class TypeBuilder(_TypeBuilder):
     def __init__(self):
         super().__init__(classes=set(
-          ["Agent","ChatResponse","Column","DBSchema","DataSummarizer","Messages","Metadata","Navigator","ParsedQuery","Payload","QueryParser","ResourceBox","Responder","ResponseFormatter","SampleTypeAttributes","SchemaMapper","Supervisor","Table","ToolArgs","ToolMetadata","UpdatePipelineMetadata","Validator",]
+          ["Agent","ChatResponse","Column","DBSchema","DataSummarizer","Messages","Metadata","Navigator","ParsedQuery","Payload","QueryParser","ResourceBox","Responder","ResponseFormatter","SampleTypeAttributes","SchemaMapper","Supervisor","Table","ToolArgs","ToolCall","ToolMetadata","UpdatePipelineMetadata","Validator",]
         ), enums=set(
           []
         ), runtime=DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_RUNTIME)
@@ -105,6 +105,10 @@ class TypeBuilder(_TypeBuilder):
     def ToolArgs(self) -> "ToolArgsAst":
         return ToolArgsAst(self)
 
+    @property
+    def ToolCall(self) -> "ToolCallAst":
+        return ToolCallAst(self)
+
     @property
     def ToolMetadata(self) -> "ToolMetadataAst":
         return ToolMetadataAst(self)
@@ -464,7 +468,7 @@ class NavigatorAst:
     def __init__(self, tb: _TypeBuilder):
         _tb = tb._tb # type: ignore (we know how to use this private attribute)
         self._bldr = _tb.class_("Navigator")
-        self._properties: typing.Set[str] = set([ "agent",  "explanation",  "next_tool",  "tool_args",  "justification", ])
+        self._properties: typing.Set[str] = set([ "agent",  "explanation",  "next_tool",  "tool_args",  "additional_calls",  "justification", ])
         self._props = NavigatorProperties(self._bldr, self._properties)
 
     def type(self) -> FieldType:
@@ -508,6 +512,10 @@ class NavigatorProperties:
     def tool_args(self) -> ClassPropertyViewer:
         return ClassPropertyViewer(self.__bldr.property("tool_args"))
 
+    @property
+    def additional_calls(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("additional_calls"))
+
     @property
     def justification(self) -> ClassPropertyViewer:
         return ClassPropertyViewer(self.__bldr.property("justification"))
@@ -668,7 +676,7 @@ class ResourceBoxAst:
     def __init__(self, tb: _TypeBuilder):
         _tb = tb._tb # type: ignore (we know how to use this private attribute)
         self._bldr = _tb.class_("ResourceBox")
-        self._properties: typing.Set[str] = set([ "sample_metadata",  "protocolURL",  "sampleURL",  "UIDs",  "db_schema",  "parsed_query",  "st_attributes",  "update_info", ])
+        self._properties: typing.Set[str] = set([ "sample_metadata",  "protocolURL",  "sampleURL",  "UIDs",  "db_schema",  "parsed_query",  "st_attributes",  "update_info",  "aggregates", ])
         self._props = ResourceBoxProperties(self._bldr, self._properties)
 
     def type(self) -> FieldType:
@@ -728,6 +736,10 @@ class ResourceBoxProperties:
     def update_info(self) -> ClassPropertyViewer:
         return ClassPropertyViewer(self.__bldr.property("update_info"))
 
+    @property
+    def aggregates(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("aggregates"))
+
     
 
 class ResponderAst:
@@ -1064,6 +1076,48 @@ class ToolArgsProperties:
 
     
 
+class ToolCallAst:
+    def __init__(self, tb: _TypeBuilder):
+        _tb = tb._tb # type: ignore (we know how to use this private attribute)
+        self._bldr = _tb.class_("ToolCall")
+        self._properties: typing.Set[str] = set([ "tool",  "tool_args", ])
+        self._props = ToolCallProperties(self._bldr, self._properties)
+
+    def type(self) -> FieldType:
+        return self._bldr.field()
+
+    @property
+    def props(self) -> "ToolCallProperties":
+        return self._props
+
+
+class ToolCallViewer(ToolCallAst):
+    def __init__(self, tb: _TypeBuilder):
+        super().__init__(tb)
+
+    
+    def list_properties(self) -> typing.List[typing.Tuple[str, ClassPropertyViewer]]:
+        return [(name, ClassPropertyViewer(self._bldr.property(name))) for name in self._properties]
+
+
+
+class ToolCallProperties:
+    def __init__(self, bldr: ClassBuilder, properties: typing.Set[str]):
+        self.__bldr = bldr
+        self.__properties = properties
+
+    
+
+    @property
+    def tool(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("tool"))
+
+    @property
+    def tool_args(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("tool_args"))
+
+    
+
 class ToolMetadataAst:
     def __init__(self, tb: _TypeBuilder):
         _tb = tb._tb # type: ignore (we know how to use this private attribute)
@@ -1110,7 +1164,7 @@ class UpdatePipelineMetadataAst:
     def __init__(self, tb: _TypeBuilder):
         _tb = tb._tb # type: ignore (we know how to use this private attribute)
         self._bldr = _tb.class_("UpdatePipelineMetadata")
-        self._properties: typing.Set[str] = set([ "success",  "logs",  "errors",  "stats", ])
+        self._properties: typing.Set[str] = set([ "success",  "logs",  "errors",  "stats",  "job_id",  "status", ])
         self._props = UpdatePipelineMetadataProperties(self._bldr, self._properties)
 
     def type(self) -> FieldType:
@@ -1154,6 +1208,14 @@ class UpdatePipelineMetadataProperties:
     def stats(self) -> ClassPropertyViewer:
         return ClassPropertyViewer(self.__bldr.property("stats"))
 
+    @property
+    def job_id(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("job_id"))
+
+    @property
+    def status(self) -> ClassPropertyViewer:
+        return ClassPropertyViewer(self.__bldr.property("status"))
+
     
 
 class ValidatorAst:
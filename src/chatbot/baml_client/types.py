@@ -84,6 +84,7 @@ class Navigator(BaseModel):
     explanation: str
     next_tool: str
     tool_args: "ToolArgs"
+    additional_calls: List["ToolCall"]
     justification: str
 
 class ParsedQuery(BaseModel):
@@ -113,6 +114,7 @@ class ResourceBox(BaseModel):
     parsed_query: Optional["ParsedQuery"] = None
     st_attributes: Union[Optional[List["SampleTypeAttributes"]], "SampleTypeAttributes"] = None
     update_info: Optional["UpdatePipelineMetadata"] = None
+    aggregates: Optional[str] = None
 
 class Responder(BaseModel):
     Next_worker: "Agent"
@@ -152,6 +154,10 @@ class ToolArgs(BaseModel):
     uid: Union[Optional[str], Optional[List[str]]] = None
     sample_type: Optional[List[str]] = None
 
+class ToolCall(BaseModel):
+    tool: str
+    tool_args: "ToolArgs"
+
 class ToolMetadata(BaseModel):
     doc: str
     signature: str
@@ -160,7 +166,9 @@ class UpdatePipelineMetadata(BaseModel):
     success: bool
     logs: List[str]
     errors: Optional[List[str]] = None
-    stats: Optional[Dict[str, int]] = None
+    stats: Optional[Dict[str, Union[int, float, List[Dict[str, float]]]]] = None
+    job_id: Optional[str] = None
+    status: Optional[str] = None
 
 class Validator(BaseModel):
     name: str
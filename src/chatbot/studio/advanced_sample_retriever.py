@@ -11,7 +11,7 @@ sys.path.append(project_root)
 
 from backend.Tools.services.module_to_json import functions_to_json
 
-from src.chatbot.studio.helpers import update_resource, get_resource, async_navigator_handler
+from src.chatbot.studio.helpers import update_resource, get_resource, async_navigator_plan, run_tool_calls, merge_tool_results
 import asyncio
 from langchain_core.messages import HumanMessage, AIMessage
 from src.chatbot.studio.models import ConversationState, ToolResponse, ResourceBox, DBSchema, Table, Column, ParsedQuery
@@ -27,6 +27,13 @@ from src.chatbot.studio.prompts import TOOLSET2, INITIAL_STATE
 TOOL_DISPATCH = {
     attr.__name__: attr for attr in TOOLSET2
 }
+# Resource field filled by each tool
+TOOL_RESOURCES = {
+    "get_metadata_by_uids": "sample_metadata",
+    "get_uids_by_terms_and_field": "UIDs",
+    "count_samples_by_attributes": "aggregates",
+    "count_samples_by_type": "aggregates",
+}
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -35,13 +42,38 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+async def run_multi_sample_call(tool: str, tool_args) -> list:
+    """
+    Execute one planned TOOLSET2 call with its arguments.
+
+    Raises:
+        KeyError: If the tool is not in TOOLSET2.
+    """
+    if tool == "get_metadata_by_uids":
+        logger.info(f"Executing {tool} with args: {tool_args.uid}")
+        result = await TOOL_DISPATCH[tool](tool_args.uid)
+        return [i.model_dump() for i in transform_response_to_metadata(result)]
+    if tool == "get_uids_by_terms_and_field":
+        logger.info(f"Executing {tool} with args: {(tool_args.json_keys, tool_args.terms)}")
+        return await TOOL_DISPATCH[tool](tool_args.json_keys, tool_args.terms)
+    if tool == "count_samples_by_attributes":
+        sample_type = tool_args.sample_type[0] if tool_args.sample_type else None
+        logger.info(f"Executing {tool} with args: {(sample_type, tool_args.json_keys, tool_args.terms)}")
+        if not sample_type:
+            raise KeyError("count_samples_by_attributes needs a sample_type")
+        return await TOOL_DISPATCH[tool](sample_type, tool_args.json_keys, tool_args.terms)
+    if tool == "count_samples_by_type":
+        logger.info(f"Executing {tool} with args: {tool_args.sample_type}")
+        return await TOOL_DISPATCH[tool](tool_args.sample_type or None)
+    raise KeyError(f"Unknown tool: {tool}")
+
 async def multi_sample_info(state: ConversationState = INITIAL_STATE)->ToolResponse:
     """
     Main function to handle the asynchronous navigation and tool execution.
 
-    This function uses the async navigator handler to determine the next tool
-    to execute based on a user query. It then calls the appropriate tool function
-    asynchronously and returns the result.
+    This function uses the async navigator to plan the tool calls answering a user
+    query, runs the independent calls concurrently and merges their results into
+    the resources in one step.
 
     Returns:
         result (dict): A dictionary containing the result from the executed tool function, the agent, the toolbox, and the tools_description.
@@ -51,30 +83,18 @@ async def multi_sample_info(state: ConversationState = INITIAL_STATE)->ToolRespo
 
     AGENT = {
         "agent": agent,
-        "role": "retrieves information for multiple samples from the database",
+        "role": "retrieves information for multiple samples from the database and counts samples per attribute value",
         "toolbox": functions_to_json(TOOLSET2)
     }
     try:
-        # Call the async navigator handler
-        next_tool, tool_args, justification, explanation = await async_navigator_handler(AGENT, state)
+        # Plan the tool calls, several independent ones when the query asks for several things
+        calls, justification, explanation = await async_navigator_plan(AGENT, state)
         logger.info(f"Justification: {justification}")
         logger.info(f"Explanation: {explanation}")
-        if tool_args:
-            logger.debug(f"Tool args: {tool_args}")
-        
-        if next_tool == "get_metadata_by_uids":
-            resource_type = "sample_metadata"
-            tool_args = (tool_args.uid)
-            logger.info(f"Executing {next_tool} with args: {tool_args}")
-            result = await TOOL_DISPATCH[next_tool](tool_args)
-            result = transform_response_to_metadata(result)
-            result = [i.model_dump() for i in result]
-        elif next_tool == "get_uids_by_terms_and_field":
-            resource_type = "UIDs"
-            tool_args = (tool_args.json_keys, tool_args.terms)
-            logger.info(f"Executing {next_tool} with args: {tool_args}")
-            result = await TOOL_DISPATCH[next_tool](*tool_args)
-        elif next_tool == "" and len(tool_args) == 0:
+        calls = [(tool, tool_args) for tool, tool_args in calls if tool]
+        logger.debug(f"Planned tool calls: {calls}")
+
+        if not calls:
             logger.warning("No tool was selected. Invalid query.")
             response = ToolResponse(
                 result=get_resource(state),
@@ -84,39 +104,34 @@ async def multi_sample_info(state: ConversationState = INITIAL_STATE)->ToolRespo
                 explanation=explanation
             )
             return response
-        else:
-            logger.warning(f"Unknown tool: {next_tool}")
-            return ToolResponse(
-                result=get_resource(state),
-                response=f"Unknown tool: {next_tool}",
-                agent=agent,
-                justification=justification,
-                explanation=explanation
-            )
-                
-        if result and result is not None:
-            new_resource = {
-                resource_type: result,
-            }
-            update_resource(state, new_resource)
-            logger.debug(f"Updated resource: {get_resource(state)}")
 
-            response = ToolResponse(
-                result=get_resource(state),
-                response=f"The {next_tool} tool has been executed successfully. The result is: ```json\n{result}\n```",
-                agent=agent,
-                justification=justification,
-                explanation=explanation)
-            return response
-        else:
-            logger.warning(f"No result from {next_tool}")
-            return ToolResponse(
-                result=get_resource(state),
-                response=f"No result was returned from {next_tool}",
-                agent=agent,
-                justification=justification,
-                explanation=explanation
-            )
+        results = await run_tool_calls(calls, run_multi_sample_call)
+
+        responses = []
+        new_resources = []
+        for (tool, _), result in zip(calls, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Error executing {tool}: {result}")
+                responses.append(f"Error executing {tool}: {result}")
+            elif result:
+                new_resources.append((TOOL_RESOURCES[tool], result))
+                responses.append(f"The {tool} tool has been executed successfully. The result is: ```json\n{result}\n```")
+            else:
+                logger.warning(f"No result from {tool}")
+                responses.append(f"No result was returned from {tool}")
+
+        # Results of all the calls are merged and written to the resources in one step
+        for resource_type, result in merge_tool_results(new_resources).items():
+            update_resource(state, {resource_type: result})
+        logger.debug(f"Updated resource: {get_resource(state)}")
+
+        return ToolResponse(
+            result=get_resource(state),
+            response="\n".join(responses),
+            agent=agent,
+            justification=justification,
+            explanation=explanation
+        )
     except KeyError as e:
         error_msg = f"Key error in tool dispatch or arguments: {e}"
         logger.error(error_msg)
@@ -13,7 +13,7 @@ sys.path.append(project_root)
 from backend.Tools.services.sample_service import *
 from backend.Tools.services.module_to_json import functions_to_json
 
-from src.chatbot.studio.helpers import async_navigator_handler, update_resource, default_resource_box, get_resource
+from src.chatbot.studio.helpers import async_navigator_plan, run_tool_calls, merge_tool_results, update_resource, default_resource_box, get_resource
 import asyncio
 from langchain_core.messages import HumanMessage, AIMessage
 from src.chatbot.studio.models import ConversationState, ToolResponse
@@ -29,6 +29,14 @@ from src.chatbot.studio.prompts import TOOLSET1, INITIAL_STATE
 TOOL_DISPATCH = {
     attr.__name__: attr for attr in TOOLSET1
 }
+# Resource field filled by each tool taking a sample UID
+TOOL_RESOURCES = {
+    "retrieve_sample_info": "sample_metadata",
+    "fetch_protocol": "protocolURL",
+    "fetchChildren": "UIDs",
+    "fetch_all_descendants": "UIDs",
+    "add_links": "sampleURL",
+}
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -37,9 +45,9 @@ async def basic_sample_info(state: ConversationState = INITIAL_STATE)->ToolRespo
     """
     Main function to handle the asynchronous navigation and tool execution.
 
-    This function uses the async navigator handler to determine the next tool
-    to execute based on a user query. It then calls the appropriate tool function
-    asynchronously and returns the result.
+    This function uses the async navigator to plan the tool calls answering a user
+    query, runs the independent calls concurrently and merges their results into
+    the resources in one step.
 
     Returns:
         result (dict): A dictionary containing the result from the executed tool function, the agent, the toolbox, and the tools_description.
@@ -52,23 +60,13 @@ async def basic_sample_info(state: ConversationState = INITIAL_STATE)->ToolRespo
         "role": "retrieves sample information from the database",
         "toolbox": functions_to_json(TOOLSET1)
     }
+    justification = explanation = None
     try:
-        # Call the async navigator handler
-        next_tool, tool_args, justification, explanation = await async_navigator_handler(AGENT, state)
-        uid = tool_args.uid if isinstance(tool_args.uid, str) else tool_args.uid[0]
-
-        if next_tool == "retrieve_sample_info":
-            resource_type = "sample_metadata"
-        elif next_tool == "fetch_protocol":
-            resource_type = "protocolURL"
-        elif next_tool == "fetchChildren":
-            resource_type = "UIDs"
-        elif next_tool == "fetch_all_descendants":
-            resource_type = "UIDs"
-        elif next_tool == "add_links":
-            resource_type = "sampleURL"
+        # Plan the tool calls, several independent ones when the query asks for several things
+        calls, justification, explanation = await async_navigator_plan(AGENT, state)
+        calls = [(tool, tool_args) for tool, tool_args in calls if tool]
         
-        if next_tool == "" and len(tool_args) == 0:
+        if not calls:
             logger.warning("No tool was selected. Invalid query.")
             response = ToolResponse(
                 result=get_resource(state),
@@ -78,42 +76,40 @@ async def basic_sample_info(state: ConversationState = INITIAL_STATE)->ToolRespo
                 explanation=explanation
             )
             return response
+
+        async def run_call(tool, tool_args):
+            if tool not in TOOL_RESOURCES:
+                raise KeyError(tool)
+            uid = tool_args.uid if isinstance(tool_args.uid, str) else tool_args.uid[0]
+            logger.info(f"Executing {tool} with args: {uid}")
+            return await TOOL_DISPATCH[tool](uid)
+
+        results = await run_tool_calls(calls, run_call)
+
+        responses = []
+        new_resources = []
+        for (tool, _), result in zip(calls, results):
+            if isinstance(result, KeyError):
+                logger.error(f"Tool '{tool}' not found in TOOL_RESOURCES")
+                responses.append(f"Error: Tool '{tool}' not available")
+            elif isinstance(result, Exception):
+                logger.error(f"Error executing {tool}: {result}", exc_info=result)
+                responses.append(f"Error executing {tool}: {result}")
+            elif result:
+                new_resources.append((TOOL_RESOURCES[tool], result))
+                responses.append(f"The {tool} tool has been executed successfully. The result is: {result}")
+            else:
+                logger.info(f"No result from {tool}")
+                responses.append(f"The {tool} tool has been executed successfully. The result is: {result}")
         
-        logger.info(f"Executing {next_tool} with args: {uid}")
-        
-        try:
-            result = await TOOL_DISPATCH[next_tool](uid)
-        except KeyError:
-            logger.error(f"Tool '{next_tool}' not found in TOOL_DISPATCH")
-            return ToolResponse(
-                result=get_resource(state),
-                response=f"Error: Tool '{next_tool}' not available",
-                agent=agent,
-                justification=justification,
-                explanation=explanation
-            )
-        except Exception as tool_error:
-            logger.error(f"Error executing {next_tool}: {tool_error}", exc_info=True)
-            return ToolResponse(
-                result=get_resource(state),
-                response=f"Error executing {next_tool}: {tool_error}",
-                agent=agent,
-                justification=justification,
-                explanation=explanation
-            )
-        
-        if result:
-            new_resource = {
-                resource_type: result
-            }
-            update_resource(state, new_resource)
-            logger.debug(f"Updated resource: {get_resource(state)}")
-        else:
-            logger.info(f"No result from {next_tool}")
+        # Results of all the calls are merged and written to the resources in one step
+        for resource_type, result in merge_tool_results(new_resources).items():
+            update_resource(state, {resource_type: result})
+        logger.debug(f"Updated resource: {get_resource(state)}")
         
         return ToolResponse(
             result=get_resource(state),
-            response=f"The {next_tool} tool has been executed successfully. The result is: {result}",
+            response="\n".join(responses),
             agent=agent,
             justification=justification,
             explanation=explanation
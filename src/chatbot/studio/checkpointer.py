@@ -0,0 +1,131 @@
+# src/chatbot/studio/checkpointer.py
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import aiosqlite
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from dotenv import load_dotenv
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+from backend.Tools.core.local_store import get_local_db_path
+
+load_dotenv()
+
+# Threads idle for longer than this many seconds are deleted with all their checkpoints
+CHECKPOINT_TTL = int(os.getenv('CHECKPOINT_TTL', 24 * 3600))
+# Number of most recent checkpoints kept per thread
+CHECKPOINT_KEEP_LAST = int(os.getenv('CHECKPOINT_KEEP_LAST', 5))
+# Seconds between two pruning passes
+CHECKPOINT_PRUNE_INTERVAL = int(os.getenv('CHECKPOINT_PRUNE_INTERVAL', 600))
+
+logger = logging.getLogger(__name__)
+
+async def create_checkpointer(name: str = "sample_retriever") -> AsyncSqliteSaver:
+    """
+    Open the file-backed checkpointer of the graph in WAL mode.
+
+    Args:
+        name (str): The name of the SQLite store under state_db. Default is 'sample_retriever'.
+
+    Returns:
+        AsyncSqliteSaver: The checkpointer with its tables created.
+    """
+    conn = await aiosqlite.connect(get_local_db_path(name))
+    await conn.execute("PRAGMA journal_mode=WAL;")
+    await conn.execute("PRAGMA synchronous=NORMAL;")
+    memory = AsyncSqliteSaver(conn)
+    await memory.setup()
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS thread_activity (
+            thread_id TEXT PRIMARY KEY,
+            last_seen REAL NOT NULL
+        )
+    """)
+    await conn.commit()
+    return memory
+
+async def touch_thread(memory: AsyncSqliteSaver, thread_id: str) -> None:
+    """
+    Record that a thread was used now so that it is not pruned before its TTL.
+    """
+    async with memory.lock:
+        await memory.conn.execute(
+            """
+            INSERT INTO thread_activity (thread_id, last_seen) VALUES (?, ?)
+            ON CONFLICT(thread_id) DO UPDATE SET last_seen = excluded.last_seen
+            """,
+            (thread_id, time.time())
+        )
+        await memory.conn.commit()
+
+async def prune_checkpoints(
+    memory: AsyncSqliteSaver,
+    ttl: int = CHECKPOINT_TTL,
+    keep_last: int = CHECKPOINT_KEEP_LAST
+) -> dict:
+    """
+    Delete the threads idle for longer than ttl and all but the last keep_last checkpoints of the others.
+
+    Args:
+        memory (AsyncSqliteSaver): The checkpointer to prune.
+        ttl (int): Seconds after which an idle thread is deleted.
+        keep_last (int): Number of most recent checkpoints kept per thread.
+
+    Returns:
+        dict: The number of expired threads and of deleted checkpoints.
+    """
+    conn = memory.conn
+    async with memory.lock:
+        cursor = await conn.execute(
+            "SELECT thread_id FROM thread_activity WHERE last_seen < ?", (time.time() - ttl,)
+        )
+        expired = [row[0] for row in await cursor.fetchall()]
+        for thread_id in expired:
+            await conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            await conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+            await conn.execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+        # Checkpoint IDs are time-ordered, so the highest IDs are the most recent checkpoints
+        cursor = await conn.execute(
+            """
+            DELETE FROM checkpoints WHERE rowid IN (
+                SELECT rowid FROM (
+                    SELECT rowid, ROW_NUMBER() OVER (
+                        PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                    ) AS position
+                    FROM checkpoints
+                ) WHERE position > ?
+            )
+            """,
+            (keep_last,)
+        )
+        deleted = cursor.rowcount
+        await conn.execute(
+            """
+            DELETE FROM writes WHERE NOT EXISTS (
+                SELECT 1 FROM checkpoints c
+                WHERE c.thread_id = writes.thread_id
+                  AND c.checkpoint_ns = writes.checkpoint_ns
+                  AND c.checkpoint_id = writes.checkpoint_id
+            )
+            """
+        )
+        await conn.commit()
+    logger.info(f"Pruned {len(expired)} expired threads and {deleted} old checkpoints")
+    return {"expired_threads": len(expired), "deleted_checkpoints": deleted}
+
+async def run_checkpoint_pruner(memory: AsyncSqliteSaver, interval: int = CHECKPOINT_PRUNE_INTERVAL) -> None:
+    """
+    Prune the checkpointer every interval seconds until cancelled.
+    """
+    while True:
+        try:
+            await prune_checkpoints(memory)
+        except Exception as e:
+            logger.error(f"Error pruning checkpoints: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,178 @@
+# src/chatbot/studio/context_builder.py
+
+import os
+import sys
+import json
+import logging
+from typing import Optional
+from langchain_core.messages import BaseMessage
+from dotenv import load_dotenv
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+from src.chatbot.studio.models import ConversationState, ResourceBox, Metadata, Message
+from src.chatbot.studio.helpers import get_resource, get_last_worker, convert_messages
+
+load_dotenv()
+
+# Estimated tokens above which the payload of a BAML call is compacted further
+PAYLOAD_TOKEN_BUDGET = int(os.getenv('PAYLOAD_TOKEN_BUDGET', 8000))
+# Most recent messages sent verbatim, the older ones are summarized
+CONTEXT_RECENT_MESSAGES = int(os.getenv('CONTEXT_RECENT_MESSAGES', 8))
+# Characters kept of a summarized message
+CONTEXT_SUMMARY_CHARS = int(os.getenv('CONTEXT_SUMMARY_CHARS', 200))
+# Samples sent to the nodes that only route the conversation
+CONTEXT_ROUTING_MAX_SAMPLES = int(os.getenv('CONTEXT_ROUTING_MAX_SAMPLES', 5))
+
+ANSWER_FIELDS = ("parsed_query", "UIDs", "sample_metadata", "protocolURL", "sampleURL", "update_info", "aggregates")
+
+# Resource fields each node reads, the others are not sent to its prompt
+NODE_RESOURCE_FIELDS = {
+    "query_parser": ("parsed_query", "UIDs"),
+    "conversationalist": ("parsed_query", "UIDs", "sample_metadata", "protocolURL", "sampleURL"),
+    "supervisor": ANSWER_FIELDS,
+    "responder": ANSWER_FIELDS,
+    "basic_sample_info_retriever": ("parsed_query", "UIDs"),
+    "multi_sample_info_retriever": ("parsed_query", "UIDs", "db_schema"),
+    "archivist": ("parsed_query", "st_attributes", "update_info"),
+    "data_summarizer": ANSWER_FIELDS,
+    "response_formatter": ANSWER_FIELDS,
+    "validator": ANSWER_FIELDS,
+}
+
+# Nodes deciding the next step only need a sample of the retrieved metadata
+ROUTING_NODES = {"query_parser", "conversationalist", "supervisor", "responder"}
+
+logger = logging.getLogger(__name__)
+
+_metrics = {}
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken missing or its encoding not downloadable
+    _encoding = None
+
+def estimate_tokens(text: str) -> int:
+    """
+    Count the tokens of a text with tiktoken, or estimate them at four characters per token.
+    """
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4
+
+def _payload_tokens(payload: dict) -> int:
+    resource = payload["resource"].model_dump(exclude_none=True) if payload["resource"] is not None else None
+    messages = [m.model_dump() for m in payload["aggregatedMessages"]]
+    return estimate_tokens(json.dumps([payload["user_query"], messages, resource], default=str))
+
+def _compact_sample(sample: Metadata) -> Metadata:
+    # Most attributes of a sample type are empty for any given sample
+    values = {key: value for key, value in sample.model_dump().items() if value not in (None, "")}
+    values["UID"] = sample.UID
+    return Metadata.model_validate(values)
+
+def _select_resource(resource: ResourceBox, fields: tuple, max_samples: Optional[int]) -> tuple[ResourceBox, Optional[str]]:
+    selected = {field: getattr(resource, field) for field in fields}
+    note = None
+    samples = selected.get("sample_metadata")
+    if isinstance(samples, Metadata):
+        samples = [samples]
+    if isinstance(samples, list):
+        if max_samples is not None and len(samples) > max_samples:
+            note = f"Only {max_samples} of the {len(samples)} retrieved samples are shown."
+            samples = samples[:max_samples]
+        selected["sample_metadata"] = [_compact_sample(sample) for sample in samples]
+    uids = selected.get("UIDs")
+    if uids and max_samples is not None and len(uids) > max_samples * 10:
+        note = " ".join(filter(None, [note, f"Only {max_samples * 10} of the {len(uids)} retrieved UIDs are shown."]))
+        selected["UIDs"] = uids[:max_samples * 10]
+    return ResourceBox.model_validate(selected), note
+
+def _select_messages(messages: list[Message], recent: int, note: Optional[str]) -> list[Message]:
+    # The first message is the user query of the turn and is always kept
+    if len(messages) <= recent + 1:
+        selected = list(messages)
+    else:
+        older = messages[1:-recent]
+        summary = "; ".join(f"{m.name}: {' '.join(m.message.split())[:CONTEXT_SUMMARY_CHARS]}" for m in older)
+        selected = [messages[0], Message(name="context_summary", message=f"Earlier messages: {summary}", role="system")]
+        selected += messages[-recent:]
+    if note:
+        selected.append(Message(name="context_summary", message=note, role="system"))
+    return selected
+
+def build_payload(
+    node: str,
+    state: ConversationState,
+    messages: Optional[list[BaseMessage]] = None,
+    user_query: Optional[str] = None,
+    last_worker: Optional[str] = None
+) -> dict:
+    """
+    Build the payload of a BAML call with only the context the node needs, within PAYLOAD_TOKEN_BUDGET.
+
+    The resource fields are selected per node and empty sample attributes dropped. Messages older
+    than the CONTEXT_RECENT_MESSAGES most recent ones are summarized. Routing nodes see at most
+    CONTEXT_ROUTING_MAX_SAMPLES samples. If the payload is still over budget, the samples and then
+    the verbatim messages are halved until it fits.
+
+    Args:
+        node (str): The name of the node making the call.
+        state (ConversationState): The current state of the conversation.
+        messages (Optional[list[BaseMessage]]): The messages to send. Defaults to state.messages.
+        user_query (Optional[str]): The user query. Defaults to the first message.
+        last_worker (Optional[str]): The last worker. Defaults to the sender of the last message.
+
+    Returns:
+        dict: The payload with the user_query, aggregatedMessages, resource and last_worker keys.
+    """
+    messages = state.messages if messages is None else messages
+    all_messages = convert_messages(messages)
+    resource = get_resource(state)
+    payload = {
+        "user_query": messages[0].content if user_query is None else user_query,
+        "aggregatedMessages": all_messages,
+        "resource": resource,
+        "last_worker": get_last_worker(state) if last_worker is None else last_worker
+    }
+    full_tokens = _payload_tokens(payload)
+
+    fields = NODE_RESOURCE_FIELDS.get(node, tuple(ResourceBox.model_fields))
+    samples = resource.sample_metadata
+    sample_count = len(samples) if isinstance(samples, list) else 1
+    max_samples = CONTEXT_ROUTING_MAX_SAMPLES if node in ROUTING_NODES else None
+    recent = CONTEXT_RECENT_MESSAGES
+    while True:
+        payload["resource"], note = _select_resource(resource, fields, max_samples)
+        payload["aggregatedMessages"] = _select_messages(all_messages, recent, note)
+        tokens = _payload_tokens(payload)
+        if tokens <= PAYLOAD_TOKEN_BUDGET:
+            break
+        shown = min(sample_count, max_samples or sample_count)
+        if "sample_metadata" in fields and samples and shown > 1:
+            max_samples = shown // 2
+        elif recent > 1:
+            recent //= 2
+        else:
+            logger.warning(f"Payload for {node} is {tokens} tokens, over the budget of {PAYLOAD_TOKEN_BUDGET}")
+            break
+
+    stats = _metrics.setdefault(node, {"calls": 0, "full_tokens": 0, "payload_tokens": 0, "last_payload_tokens": 0})
+    stats["calls"] += 1
+    stats["full_tokens"] += full_tokens
+    stats["payload_tokens"] += tokens
+    stats["last_payload_tokens"] = tokens
+    logger.info(f"Payload for {node}: {tokens} tokens ({full_tokens} before compaction)")
+    return payload
+
+def get_context_stats() -> dict:
+    """
+    Report per node the number of calls and the prompt tokens sent and saved by the compaction.
+    """
+    return {
+        node: {**stats, "tokens_saved": stats["full_tokens"] - stats["payload_tokens"]}
+        for node, stats in _metrics.items()
+    }
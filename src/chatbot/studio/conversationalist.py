@@ -3,6 +3,7 @@ import sys
 import os
 import time
 import logging
+import asyncio
 import traceback
 
 # Add the project root directory to the Python path
@@ -11,9 +12,10 @@ sys.path.append(project_root)
 
 from typing_extensions import Literal
 from langgraph.types import Command
-from src.chatbot.baml_client import b as baml
+from src.chatbot.baml_client.async_client import b as baml
 from src.chatbot.studio.models import ConversationState, Payload
-from src.chatbot.studio.helpers import get_resource, update_resource, get_last_worker, convert_messages
+from src.chatbot.studio.helpers import get_resource, update_resource, get_last_worker
+from src.chatbot.studio.context_builder import build_payload
 
 from src.chatbot.studio.prompts import (
     INITIAL_STATE
@@ -23,7 +25,7 @@ from datetime import datetime, timezone
 # Configure logger
 logger = logging.getLogger(__name__)
 
-def conversationalist_node(state: ConversationState) -> Command[Literal["supervisor", "validator", "FINISH"]]:
+async def conversationalist_node(state: ConversationState) -> Command[Literal["supervisor", "validator", "FINISH"]]:
     """
     Either responds directly to the user or directs the flow to the supervisor.
 
@@ -40,13 +42,7 @@ def conversationalist_node(state: ConversationState) -> Command[Literal["supervi
     messages = state.messages
     last_worker = get_last_worker(state)
     try:
-        payload = {
-            # "system_message": messages[0].content,
-            "user_query": messages[0].content,
-            "aggregatedMessages": convert_messages(messages),
-            "resource": get_resource(state),
-            "last_worker": last_worker
-        }
+        payload = build_payload("conversationalist", state, last_worker=last_worker)
 
         # parsed_query = payload["resource"].parsed_query
         
@@ -54,7 +50,7 @@ def conversationalist_node(state: ConversationState) -> Command[Literal["supervi
         logger.info("Obtaining response from Conversationalist...")
         
         try:
-            response = baml.Conversationalist(payload)
+            response = await baml.Conversationalist(payload)
             logger.info(f"Response obtained in {time.time() - start_time:.2f} seconds.")
         except Exception as baml_error:
             logger.error(f"Error calling BAML Conversationalist: {baml_error}", exc_info=True)
@@ -129,4 +125,4 @@ if __name__ == "__main__":
     parsed_query = {'uid': ['MUS-220124FOR-1', 'MUS-220124FOR-73'], 'sampletype': 'mouse', 'assay': None, 'attribute': 'genotype', 'terms': None}
     INITIAL_STATE.messages.extend(user_message)
     update_resource(INITIAL_STATE, {"parsed_query": parsed_query})
-    conversationalist_node(INITIAL_STATE)
\ No newline at end of file
+    asyncio.run(conversationalist_node(INITIAL_STATE))
\ No newline at end of file
@@ -12,7 +12,9 @@ from typing_extensions import Literal
 from langgraph.types import Command
 from src.chatbot.baml_client.async_client import b as baml
 from src.chatbot.studio.models import ConversationState
-from src.chatbot.studio.helpers import get_resource, update_resource, convert_messages
+from src.chatbot.studio.helpers import get_resource, update_resource
+from src.chatbot.studio.context_builder import build_payload
+from src.chatbot.studio.streaming import stream_text
 import asyncio
 from datetime import datetime, timezone
 
@@ -40,20 +42,14 @@ async def data_summarizer_node(state: ConversationState = INITIAL_STATE) -> Comm
     messages = state.messages
     goto = "validator"
     try:
-        payload = {
-            # "system_message": messages[0].content,
-            "user_query": messages[0].content,
-            "aggregatedMessages": convert_messages(messages),
-            "resource": get_resource(state),
-            "last_worker": state.last_worker
-        }
+        payload = build_payload("data_summarizer", state, last_worker=state.last_worker)
 
         start_time = time.time()
         logger.info("Summarizing data...")
         
         try:
             summarize_stream = baml.stream.SummarizeData(payload)
-            result = await summarize_stream.get_final_response()
+            result = await stream_text(summarize_stream, "data_summarizer", "summary")
             logger.info(f"Summary generated: {result.summary}")
             name = "data_summarizer"
             logger.info(f"Agent: {name} | Justification: {result.justification}")
@@ -0,0 +1,113 @@
+# src/chatbot/studio/fast_router.py
+
+import os
+import sys
+import logging
+from typing import NamedTuple, Optional
+from dotenv import load_dotenv
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+from src.chatbot.baml_client.types import ToolArgs
+from src.chatbot.studio.models import ConversationState
+from src.chatbot.studio.intents import detect_intents
+
+load_dotenv()
+
+FAST_ROUTER_ENABLED = os.getenv('FAST_ROUTER_ENABLED', 'true').lower() == 'true'
+
+# Single-UID intents answered by a TOOLSET1 tool of the basic_sample_info_retriever
+BASIC_INTENT_TOOLS = {
+    "info": "retrieve_sample_info",
+    "protocol": "fetch_protocol",
+    "children": "fetchChildren",
+    "descendants": "fetch_all_descendants",
+    "link": "add_links",
+}
+
+logger = logging.getLogger(__name__)
+
+_metrics = {"routed": 0, "fallbacks": 0, "llm_calls_saved": 0, "routes": {}}
+
+class FastRoute(NamedTuple):
+    agent: str
+    tool: str
+    tool_args: ToolArgs
+    justification: str
+
+def _as_list(value) -> list[str]:
+    if not value:
+        return []
+    values = value if isinstance(value, list) else [value]
+    return [str(v).strip() for v in values if v and str(v).strip()]
+
+def match_fast_route(state: ConversationState) -> Optional[FastRoute]:
+    """
+    Match the parsed query of the current turn against the high-confidence routing rules.
+
+    A query is routed without the LLM only when it names explicit UIDs and nothing that would
+    need a search (terms, assays or sample types), and has a single recognized intent that is not
+    an update. Questions no rule recognizes (i.e. "which study is X in") go to the LLM:
+    - one UID: the TOOLSET1 tool of its intent (info, protocol, children, descendants or link)
+    - several UIDs asking for their information: get_metadata_by_uids of TOOLSET2
+
+    Args:
+        state (ConversationState): The current state of the conversation.
+
+    Returns:
+        Optional[FastRoute]: The worker, tool and tool arguments, or None to fall back to the LLM.
+    """
+    if not FAST_ROUTER_ENABLED or state.file_data is not None or not state.messages:
+        return None
+    parsed_query = state.resources.parsed_query if state.resources else None
+    if parsed_query is None:
+        return None
+    uids = _as_list(parsed_query.uid)
+    if not uids or _as_list(parsed_query.terms) or _as_list(parsed_query.assay) or _as_list(parsed_query.sampletype):
+        return None
+    # The query parser moves the most recent user query to the front of the messages
+    intents = detect_intents(state.messages[0].content)
+    # Questions asking several things at once are planned by the navigator
+    if len(intents) != 1:
+        return None
+    intent = intents[0]
+    if len(uids) == 1 and intent in BASIC_INTENT_TOOLS:
+        tool = BASIC_INTENT_TOOLS[intent]
+        return FastRoute(
+            agent="basic_sample_info_retriever",
+            tool=tool,
+            tool_args=ToolArgs(uid=uids[0]),
+            justification=f"The query names the single UID {uids[0]} with a '{intent}' intent, which {tool} answers directly."
+        )
+    if len(uids) > 1 and intent == "info":
+        return FastRoute(
+            agent="multi_sample_info_retriever",
+            tool="get_metadata_by_uids",
+            tool_args=ToolArgs(uid=uids),
+            justification=f"The query asks for the information of {len(uids)} explicit UIDs, which get_metadata_by_uids retrieves in one call."
+        )
+    return None
+
+def record_route(route: Optional[FastRoute], llm_calls_saved: int = 1) -> None:
+    """
+    Count a routing decision: a fast route and the LLM calls it saved, or a fallback to the LLM.
+    """
+    if route is None:
+        _metrics["fallbacks"] += 1
+        return
+    _metrics["routed"] += 1
+    _metrics["llm_calls_saved"] += llm_calls_saved
+    _metrics["routes"][route.tool] = _metrics["routes"].get(route.tool, 0) + 1
+
+def get_fast_router_stats() -> dict:
+    """
+    Report how many routing decisions were made by rules and how many LLM calls they saved.
+    """
+    decisions = _metrics["routed"] + _metrics["fallbacks"]
+    return {
+        **_metrics,
+        "routes": dict(_metrics["routes"]),
+        "hit_rate": _metrics["routed"] / decisions if decisions else None
+    }
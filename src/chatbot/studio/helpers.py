@@ -1,5 +1,5 @@
 # src/chatbot/studio/helpers.py
-# import asyncio
+import asyncio
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
@@ -14,6 +14,8 @@ from typing_extensions import Literal
 from datetime import datetime, timezone
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from backend.Tools.schemas import UpdatePipelineMetadata
+from src.chatbot.studio.fast_router import match_fast_route
+from src.chatbot.studio.streaming import stream_text
 # from copy import deepcopy
 import uuid
 from typing import Optional, Union
@@ -22,6 +24,9 @@ from datetime import datetime, timezone
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 # sys.path.append(project_root)
 
+# Maximum number of tool calls of one navigator plan running at once
+TOOL_CALL_CONCURRENCY = int(os.getenv('TOOL_CALL_CONCURRENCY', 4))
+
 # Ensure the logs directory exists before setting up FileHandler
 logs_dir_path = os.path.join(project_root, 'logs')
 os.makedirs(logs_dir_path, exist_ok=True)
@@ -69,7 +74,8 @@ def default_resource_box() -> ResourceBox:
         db_schema=None,
         parsed_query=ParsedQuery(uid=[], sampletype=[], assay=[], attribute=[], terms=[]),
         st_attributes=[SampleTypeAttributes(sampletype="", st_description="", attributes=[])],
-        update_info=UpdatePipelineMetadata(success=False, logs=[], errors=None, stats={})
+        update_info=UpdatePipelineMetadata(success=False, logs=[], errors=None, stats={}),
+        aggregates=None
     )
 
 def transform_response_to_metadata(response_data) -> list[Metadata]:
@@ -232,6 +238,10 @@ def update_resource(state: ConversationState, new_resource: Union[dict, list[dic
             elif "update_info" in new_resource:
                 logger.debug(f"Processing update_info")
                 new_resource_dict["update_info"] = populate_update_info(new_resource["update_info"])
+            elif "aggregates" in new_resource:
+                logger.debug(f"Processing aggregates")
+                aggregates = new_resource["aggregates"]
+                new_resource_dict["aggregates"] = aggregates if isinstance(aggregates, str) or aggregates is None else str(aggregates)
             else:
                 logger.debug(f"Using raw new_resource: {list(new_resource.keys())}")
                 new_resource_dict = new_resource
@@ -317,12 +327,13 @@ def default_tool_response() -> ToolResponse:
 # It provides a faster alternative to LangChain and LangGraph's tool calling functions
 
 @timer_wrap
-async def async_navigator_handler(
+async def async_navigator_plan(
     agent: WorkerState,
     state: ConversationState
 ):
     # from src.chatbot.studio.models import WorkerState, ConversationState
     from src.chatbot.baml_client.async_client import b
+    from src.chatbot.studio.context_builder import build_payload
     # from src.chatbot.studio.prompts import SYSTEM_MESSAGE
 
     """
@@ -336,7 +347,8 @@ async def async_navigator_handler(
     - summedMessages (Optional[list[str]]): A list of previous messages to be considered.
 
     Returns:
-    - tuple: A tuple containing the next tool to use and its arguments.
+    - tuple: The planned tool calls as (tool, tool_args) pairs, the next tool first and then the
+      independent additional calls, followed by the justification and the explanation.
 
     Raises:
     - Exception: If an error occurs during the navigation process.
@@ -353,28 +365,30 @@ async def async_navigator_handler(
         messages = state.messages
         last_worker = get_last_worker(state)
 
-        payload = {
-        # "system_message": messages[0].content,
-        "user_query": messages[0].content,
-        "aggregatedMessages": convert_messages(messages),
-        "resource": get_resource(state),
-        "last_worker": last_worker
-        }
+        # Reuse the tool chosen by the fast router when the supervisor just dispatched this agent with it
+        route = match_fast_route(state) if state.fast_route and last_worker == "supervisor" else None
+        if route is not None and route.agent == agent["agent"] and route.tool == state.fast_route:
+            logger.info(f"Fast route to {route.tool}, skipping navigation")
+            return [(route.tool, route.tool_args)], route.justification, f"Rule-based route for the '{route.tool}' tool."
+
+        payload = build_payload(agent["agent"], state, last_worker=last_worker)
         logger.info("Payload created.")
         logger.info(f"Payload: {payload}")
         # logger.info(f" Payload messages: {payload['aggregatedMessages']}")
         logger.info("Calling BAML Navigator function...")
     
         nav_stream = b.stream.Navigate(agent, payload)
-        nav_response = await nav_stream.get_final_response()
+        nav_response = await stream_text(nav_stream, agent["agent"], "justification")
         
         if nav_response:
             # Extract the tool choice and its argument.
             next_tool = nav_response.next_tool
             # print(f"Next tool: {next_tool}\n Justification: {nav_response.justification}")
             tool_args = nav_response.tool_args
-            logger.info(f"Navigation completed.") #in {time.time() - start_time:.2f} seconds.")
-            return next_tool, tool_args, nav_response.justification, nav_response.explanation
+            calls = [(next_tool, tool_args)]
+            calls += [(call.tool, call.tool_args) for call in nav_response.additional_calls or [] if call.tool]
+            logger.info(f"Navigation completed with {len(calls)} planned tool calls.") #in {time.time() - start_time:.2f} seconds.")
+            return calls, nav_response.justification, nav_response.explanation
         else:
             logger.error("No navigation response received")
             raise ValueError("No navigation response received")
@@ -383,6 +397,68 @@ async def async_navigator_handler(
         logger.error(f"An error occurred during navigation: {e}")
         raise
 
+async def async_navigator_handler(
+    agent: WorkerState,
+    state: ConversationState
+):
+    """
+    Asynchronously handles navigation for agents running a single tool per visit.
+
+    Returns:
+    - tuple: The next tool, its arguments, the justification and the explanation.
+    """
+    calls, justification, explanation = await async_navigator_plan(agent, state)
+    next_tool, tool_args = calls[0]
+    return next_tool, tool_args, justification, explanation
+
+async def run_tool_calls(calls: list[tuple], run_call: callable, max_concurrency: int = TOOL_CALL_CONCURRENCY) -> list:
+    """
+    Run the independent tool calls of a navigator plan concurrently.
+
+    Parameters:
+    - calls (list[tuple]): The (tool, tool_args) pairs to run.
+    - run_call (callable): Async function executing one call from its tool and tool_args.
+    - max_concurrency (int): Maximum number of calls running at once, bounding the database connections used.
+
+    Returns:
+    - list: The result of every call in plan order, or the exception it raised.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded(tool, tool_args):
+        async with semaphore:
+            return await run_call(tool, tool_args)
+
+    start_time = time.time()
+    results = await asyncio.gather(*(bounded(tool, tool_args) for tool, tool_args in calls), return_exceptions=True)
+    logger.info(f"Ran {len(calls)} tool calls in {time.time() - start_time:.2f} seconds.")
+    return results
+
+def merge_tool_results(results: list[tuple[str, object]]) -> dict:
+    """
+    Merge the results of several tool calls into resource fields, so they update the ResourceBox in one step.
+    List and record results for the same field are concatenated without duplicates and text results joined.
+
+    Parameters:
+    - results (list[tuple]): (resource_type, result) pairs of the successful calls.
+
+    Returns:
+    - dict: The merged result of every resource field.
+    """
+    merged = {}
+    for resource_type, result in results:
+        if resource_type not in merged:
+            merged[resource_type] = result
+            continue
+        current = merged[resource_type]
+        if isinstance(current, str) and isinstance(result, str):
+            merged[resource_type] = current if result in current.split("\n") else f"{current}\n{result}"
+        else:
+            current = current if isinstance(current, list) else [current]
+            result = result if isinstance(result, list) else [result]
+            merged[resource_type] = current + [item for item in result if item not in current]
+    return merged
+
 
 # Helper function to create a worker for tool calling
 # @timer_wrap
@@ -486,15 +562,64 @@ async def create_worker(tools, func):
         logger.error(f"Failed to create worker: {e}", exc_info=True)
         raise ValueError(f"Worker creation failed: {str(e)}")
 
+# Registry of compiled worker subgraphs: (agent, func, tools) -> compiled graph.
+# Compiled graphs hold no per-run state, so one instance serves every turn and session.
+_worker_registry = {}
+_worker_stats = {}
+
+async def get_worker(agent: str, tools: list[callable], func: callable):
+    """
+    Return the compiled worker subgraph of an agent, compiling it only the first time it is requested.
+
+    Parameters:
+        agent (str): The name of the agent node owning the worker.
+        tools (list): A list of tools to be made available to the worker.
+        func (callable): The async function that processes the conversation state.
+
+    Returns:
+        compiled_graph: The compiled worker subgraph.
+    """
+    key = (agent, func, tuple(tools))
+    stats = _worker_stats.setdefault(agent, {"builds": 0, "build_seconds": 0.0, "hits": 0, "last_lookup_seconds": None})
+    start_time = time.time()
+    worker = _worker_registry.get(key)
+    if worker is None:
+        worker = await create_worker(tools, func)
+        _worker_registry[key] = worker
+        stats["builds"] += 1
+        stats["build_seconds"] += time.time() - start_time
+        logger.info(f"Compiled {agent} worker in {time.time() - start_time:.2f} seconds.")
+    else:
+        stats["hits"] += 1
+    stats["last_lookup_seconds"] = time.time() - start_time
+    return worker
+
+async def register_workers(specs: list[tuple[str, list[callable], callable]]) -> None:
+    """
+    Compile the worker subgraphs of the tool-calling agents ahead of the first turn.
+
+    Parameters:
+        specs (list[tuple]): (agent, tools, func) for every tool-calling agent node.
+    """
+    start_time = time.time()
+    for agent, tools, func in specs:
+        await get_worker(agent, tools, func)
+    logger.info(f"Registered {len(specs)} workers in {time.time() - start_time:.2f} seconds.")
+
+def get_worker_stats() -> dict:
+    """
+    Report per agent how many times its worker was compiled, how long it took and how many turns reused it.
+    """
+    return {agent: dict(stats) for agent, stats in _worker_stats.items()}
+
 async def create_tool_call_node(state: ConversationState,tools: list[callable], func: callable, agent: str) -> Command[Literal["supervisor", "validator"]]:
     agent = agent
     messages = state.messages
     last_worker = get_last_worker(state)
     try:
         start_time = time.time()
-        logger.info("Creating worker...")
-        worker = await create_worker(tools,func)
-        logger.info(f"Worker created in {time.time() - start_time:.2f} seconds.")
+        worker = await get_worker(agent, tools, func)
+        logger.info(f"Worker for {agent} retrieved in {time.time() - start_time:.4f} seconds.")
 
         start_time = time.time()
         logger.info(f"Invoking {agent}...")
@@ -0,0 +1,41 @@
+# src/chatbot/studio/intents.py
+
+import re
+
+# Ordered from the most to the least specific, the first matching intent wins
+INTENT_PATTERNS = [
+    ("update", re.compile(r"\b(update|modify|change|edit|overwrite|upload)\b", re.IGNORECASE)),
+    ("descendants", re.compile(r"\b(descendants?|all (of )?(the )?(derived|downstream) samples|lineage|grandchild(ren)?)\b", re.IGNORECASE)),
+    ("children", re.compile(r"\b(child(ren)?|derived from|direct descendants?|offspring)\b", re.IGNORECASE)),
+    ("protocol", re.compile(r"\bprotocols?\b", re.IGNORECASE)),
+    ("link", re.compile(r"\b(link|url|hyperlink|where can i (find|see))\b", re.IGNORECASE)),
+    ("info", re.compile(r"\b(metadata|info(rmation)?|details|describe|tell me (about|everything))\b", re.IGNORECASE)),
+]
+
+def detect_intents(user_query: str) -> list[str]:
+    """
+    List every coarse intent of a user query, for questions asking several things at once.
+
+    Args:
+        user_query (str): The most recent user query.
+
+    Returns:
+        list[str]: The matching intents in INTENT_PATTERNS order, empty when no rule matches.
+    """
+    return [intent for intent, pattern in INTENT_PATTERNS if pattern.search(user_query or "")]
+
+def detect_intent(user_query: str) -> str:
+    """
+    Classify a user query into a coarse intent with keyword rules.
+
+    Args:
+        user_query (str): The most recent user query.
+
+    Returns:
+        str: One of 'update', 'descendants', 'children', 'protocol' or 'link', and 'info' when it asks
+            for the information of a sample or no rule matches.
+    """
+    for intent, pattern in INTENT_PATTERNS:
+        if pattern.search(user_query or ""):
+            return intent
+    return "info"
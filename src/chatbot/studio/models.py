@@ -61,6 +61,7 @@ class ResourceBox(BaseModel):
     parsed_query: Optional["ParsedQuery"] = None
     st_attributes: Union[Optional[List["SampleTypeAttributes"]], "SampleTypeAttributes"] = None
     update_info: Optional["UpdatePipelineMetadata"] = None
+    aggregates: Optional[str] = None
 
 
 # New unified state model: separate messages and resources.
@@ -76,7 +77,8 @@ class WorkerState(BaseModel):
 
 class InputCSV(BaseModel):
     file_id: str
-    content: str  # Base64-encoded string representing the CSV file content
+    content: Optional[str] = None  # Base64-encoded string representing the CSV file content
+    path: Optional[str] = None  # Path of the CSV file spooled to disk, processed in chunks when set
     timestamp: str
     session_id: str
 
@@ -89,6 +91,7 @@ class ConversationState(BaseModel):
     available_workers: Optional[list[WorkerState]] = None
     last_worker: str = "user"
     file_data: Optional["InputCSV"] = Field(None, description="File content and metadata if the user has uploaded an input file.")
+    fast_route: Optional[str] = Field(None, description="Tool the supervisor's fast router chose for the dispatched worker, if any.")
 
 
 class SchemaMapperState(BaseModel):
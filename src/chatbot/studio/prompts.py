@@ -7,6 +7,7 @@ sys.path.append(project_root)
 from backend.Tools.services.sample_service import *
 from backend.Tools.services.multiSample_metadata_service import *
 from backend.Tools.services.update_metadata import *
+from backend.Tools.services.sample_type_service import count_samples_by_type
 # from backend.Tools.services.module_to_json import functions_to_json
 # from langchain_core.messages import SystemMessage
 from src.chatbot.studio.models import ConversationState
@@ -16,11 +17,17 @@ from src.chatbot.studio.helpers import populate_toolbox, WorkerState
 
 
 TOOLSET1 = [get_sample_name, retrieve_sample_info, fetch_protocol, fetchChildren, fetch_all_descendants, add_links]
-TOOLSET2 = [get_metadata_by_uids, get_uids_by_terms_and_field]
+TOOLSET2 = [get_metadata_by_uids, get_uids_by_terms_and_field, count_samples_by_attributes, count_samples_by_type]
 TOOLSET3 = [update_metadata_pipeline, get_st_attributes]
 
 CONFIG = {"recursion_limit": 20,"configurable": {"thread_id": "1"}}
 
+def get_config(session_id: str) -> dict:
+    """
+    Return the graph config of a session. Each session is checkpointed in its own thread.
+    """
+    return {"recursion_limit": CONFIG["recursion_limit"], "configurable": {"thread_id": session_id}}
+
 # SYSTEM_MESSAGE = (
 #     "You are a helpful assistant tasked with answering user questions about a data management platform called NExtSEEK." 
 #     "You also have the ability to update the metadata of the samples in the platform given a correctly formatted csv file." 
@@ -40,7 +47,7 @@ WORK_GROUP_A = [
     role="Retrieves basic metadata for a single sample",
     toolbox=populate_toolbox(TOOLSET1)),
     WorkerState(agent="multi_sample_info_retriever",
-        role="Retrieves metadata for multiple samples",
+        role="Retrieves metadata for multiple samples and counts samples per attribute value",
         toolbox=populate_toolbox(TOOLSET2)),
     WorkerState(agent="archivist",
         role="Updates metadata for samples",
@@ -1,4 +1,5 @@
 import logging
+import asyncio
 import sys
 import os
 import time
@@ -10,9 +11,11 @@ sys.path.append(project_root)
 
 from typing_extensions import Literal
 from langgraph.types import Command
-from src.chatbot.baml_client import b as baml
+from src.chatbot.baml_client.async_client import b as baml
 from src.chatbot.studio.models import ConversationState
-from src.chatbot.studio.helpers import get_resource, update_resource, get_last_worker, convert_messages
+from src.chatbot.studio.helpers import get_resource, update_resource, get_last_worker
+from src.chatbot.studio.context_builder import build_payload
+from src.chatbot.studio.response_cache import lookup_response
 from datetime import datetime, timezone
 from langchain_core.messages import HumanMessage, AIMessage
 
@@ -27,15 +30,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def query_parser_node(state: ConversationState = INITIAL_STATE) -> Command[Literal["conversationalist", "validator"]]:
+async def query_parser_node(state: ConversationState = INITIAL_STATE) -> Command[Literal["conversationalist", "validator", "FINISH"]]:
     """
     Receives a user query and breaks it down into a list of queries.
+    When a validated answer to the same parsed query is cached and still current, it is returned directly.
 
     Args:
         state (ConversationState): The current state of the conversation.
 
     Returns:
-        Command[Literal["conversationalist", "validator"]]: A command object with updated messages, directing the flow to the next worker.
+        Command[Literal["conversationalist", "validator", "FINISH"]]: A command object with updated messages, directing the flow to the next worker.
 
     Raises:
         Exception: If any error occurs during the parsing process.
@@ -80,19 +84,14 @@ def query_parser_node(state: ConversationState = INITIAL_STATE) -> Command[Liter
         # Update the state with restructured messages
         messages = restructured_messages
 
-        payload = {
-            # "system_message": messages[0].content,
-            "user_query": messages[0].content,  # Now guaranteed to be the most recent user query
-            "aggregatedMessages": convert_messages(messages),
-            "resource": get_resource(state),
-            "last_worker": last_worker
-        }
+        # messages[0] is now guaranteed to be the most recent user query
+        payload = build_payload("query_parser", state, messages=messages, last_worker=last_worker)
         logger.debug("Payload created: %s", payload)
         
         logger.info("Parsing query...")
         start_time = time.time()
         try:
-            response = baml.ParseQuery(context=payload)
+            response = await baml.ParseQuery(context=payload)
             elapsed_time = time.time() - start_time
             logger.info(f"Query parsing completed in {elapsed_time:.2f} seconds")
         except Exception as parse_error:
@@ -126,6 +125,15 @@ def query_parser_node(state: ConversationState = INITIAL_STATE) -> Command[Liter
         state.version += 1
         state.timestamp = datetime.now(timezone.utc)
         goto = "conversationalist"
+
+        # Skip the retrieval workers when the same question was answered and its samples did not change
+        cached_response = None
+        if state.file_data is None:
+            cached_response = await asyncio.to_thread(lookup_response, parsed_query, most_recent_user_query)
+        if cached_response is not None:
+            messages.append(AIMessage(content=cached_response, name="validator"))
+            goto = "FINISH"
+            logger.info("Returning cached response")
         logger.info(f"Query parsed successfully, proceeding to: {goto}")
         
         return Command(
@@ -173,4 +181,4 @@ if __name__ == "__main__":
     # messages = [HumanMessage(content="What is the genotype for the mice with these UIDs: 'MUS-220124FOR-1' and 'MUS-220124FOR-73'?", name = "user")]
     # update_messages(INITIAL_STATE, messages[0])
     INITIAL_STATE.messages.extend(messages)
-    query_parser_node()
+    asyncio.run(query_parser_node())
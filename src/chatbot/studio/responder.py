@@ -3,6 +3,7 @@ import sys
 import os
 import time
 import logging
+import asyncio
 import traceback
 
 # Add the project root directory to the Python path
@@ -11,9 +12,10 @@ sys.path.append(project_root)
 
 from typing_extensions import Literal
 from langgraph.types import Command
-from src.chatbot.baml_client import b as baml
+from src.chatbot.baml_client.async_client import b as baml
 from src.chatbot.studio.models import ConversationState, ResourceBox, Metadata, ParsedQuery, SampleTypeAttributes
-from src.chatbot.studio.helpers import get_resource, get_available_workers, update_available_workers, get_last_worker, convert_messages
+from src.chatbot.studio.helpers import get_resource, get_available_workers, update_available_workers, get_last_worker
+from src.chatbot.studio.context_builder import build_payload
 
 from src.chatbot.studio.prompts import (
     WORK_GROUP_B, 
@@ -24,7 +26,7 @@ from datetime import datetime, timezone
 # Configure logging
 logger = logging.getLogger(__name__)
 
-def responder_node(state: ConversationState = INITIAL_STATE) -> Command[Literal["data_summarizer", "response_formatter", "validator"]]:
+async def responder_node(state: ConversationState = INITIAL_STATE) -> Command[Literal["data_summarizer", "response_formatter", "validator"]]:
     """
     Processes the current conversation state to determine the next worker and update the conversation flow.
 
@@ -47,13 +49,7 @@ def responder_node(state: ConversationState = INITIAL_STATE) -> Command[Literal[
         
         try:
             logger.debug("Creating payload for BAML Respond")
-            payload = {
-                # "system_message": messages[0].content,
-                "user_query": messages[0].content,
-                "aggregatedMessages": convert_messages(messages),
-                "resource": get_resource(state),
-                "last_worker": last_worker
-            }
+            payload = build_payload("responder", state, last_worker=last_worker)
             logger.debug("Payload created successfully")
         except IndexError as e:
             logger.error(f"Failed to create payload - message index error: {str(e)}")
@@ -73,7 +69,7 @@ def responder_node(state: ConversationState = INITIAL_STATE) -> Command[Literal[
         # Call BAML API
         try:
             logger.info("Calling BAML Respond")
-            response = baml.Respond(payload, available_workers)
+            response = await baml.Respond(payload, available_workers)
             goto = response.Next_worker.agent
             logger.info(f"Next Worker: {goto}")
             logger.debug(f"Justification: {response.justification}")
@@ -165,4 +161,4 @@ if __name__ == "__main__":
 
     INITIAL_STATE.messages.extend(initial_state["messages"])
     INITIAL_STATE.resources = ResourceBox.model_validate(initial_state["resources"])
-    responder_node()
\ No newline at end of file
+    asyncio.run(responder_node())
\ No newline at end of file
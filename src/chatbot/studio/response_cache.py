@@ -0,0 +1,191 @@
+# src/chatbot/studio/response_cache.py
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+from typing import Iterable, Optional
+from dotenv import load_dotenv
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.append(project_root)
+
+from backend.Tools.core.local_store import local_db
+from src.chatbot.studio.intents import detect_intents
+
+load_dotenv()
+
+RESPONSE_CACHE_STORE = "response_cache"
+# Seconds after which a cached answer is recomputed even if its samples did not change
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 24 * 3600))
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+# Pseudo-UID whose version changes on every metadata update, used by answers that touch no explicit UID
+GLOBAL_VERSION_KEY = "*"
+
+CACHE_KEY_FIELDS = ("uid", "sampletype", "assay", "attribute", "terms")
+
+logger = logging.getLogger(__name__)
+
+_metrics = {"hits": 0, "misses": 0, "stale": 0, "stores": 0, "invalidated_uids": 0}
+
+def _create_cache_tables(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS responses (
+            cache_key TEXT PRIMARY KEY,
+            answer TEXT NOT NULL,
+            data_versions TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            uid TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    """)
+
+def _normalize_values(field: str, value) -> list[str]:
+    if value is None:
+        return []
+    values = value if isinstance(value, list) else [value]
+    normalized = []
+    for item in values:
+        if item is None or not str(item).strip():
+            continue
+        item = " ".join(str(item).split())
+        # UIDs are written upper-case in SEEK, the other fields are free text
+        normalized.append(item.upper() if field == "uid" else item.lower())
+    return sorted(set(normalized))
+
+def normalize_parsed_query(parsed_query: dict, user_query: str) -> Optional[dict]:
+    """
+    Reduce a parsed query to the canonical form used as cache key.
+
+    Args:
+        parsed_query (dict): The ParsedQuery produced by the query parser.
+        user_query (str): The user query, used to tell apart questions with the same ParsedQuery.
+
+    Returns:
+        Optional[dict]: The normalized query or None if it cannot be cached (i.e. empty or an update request).
+    """
+    intents = detect_intents(user_query)
+    if "update" in intents:
+        return None
+    normalized = {field: _normalize_values(field, parsed_query.get(field)) for field in CACHE_KEY_FIELDS}
+    if not any(normalized.values()):
+        return None
+    normalized["intent"] = ",".join(intents) or "info"
+    return normalized
+
+def _cache_key(normalized: dict) -> str:
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+def _version_keys(normalized: dict) -> list[str]:
+    # Answers about explicit samples depend on those samples only, the others (including the
+    # children and descendants of a sample, which are not named in the query) on any update
+    if not normalized["uid"] or "children" in normalized["intent"] or "descendants" in normalized["intent"]:
+        return normalized["uid"] + [GLOBAL_VERSION_KEY]
+    return normalized["uid"]
+
+def _current_versions(conn, uids: list[str]) -> dict[str, int]:
+    rows = conn.execute(
+        f"SELECT uid, version FROM data_versions WHERE uid IN ({','.join('?' for _ in uids)})", uids
+    ).fetchall()
+    versions = {uid: 0 for uid in uids}
+    versions.update(dict(rows))
+    return versions
+
+def lookup_response(parsed_query: dict, user_query: str) -> Optional[str]:
+    """
+    Return the cached answer of a query if the samples it touched have not changed since.
+
+    Args:
+        parsed_query (dict): The ParsedQuery produced by the query parser.
+        user_query (str): The most recent user query.
+
+    Returns:
+        Optional[str]: The cached formatted answer or None on a miss.
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    normalized = normalize_parsed_query(parsed_query, user_query)
+    if normalized is None:
+        return None
+    cache_key = _cache_key(normalized)
+    with local_db(RESPONSE_CACHE_STORE) as conn:
+        _create_cache_tables(conn)
+        row = conn.execute(
+            "SELECT answer, data_versions, created_at FROM responses WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        if row is None:
+            _metrics["misses"] += 1
+            return None
+        answer, data_versions, created_at = row
+        data_versions = json.loads(data_versions)
+        if time.time() - created_at > RESPONSE_CACHE_TTL or _current_versions(conn, list(data_versions)) != data_versions:
+            conn.execute("DELETE FROM responses WHERE cache_key = ?", (cache_key,))
+            _metrics["stale"] += 1
+            return None
+    _metrics["hits"] += 1
+    logger.info(f"Response cache hit for {normalized}")
+    return answer
+
+def store_response(parsed_query: dict, user_query: str, answer: str) -> None:
+    """
+    Cache a validated answer together with the data versions of the samples it touched.
+
+    Args:
+        parsed_query (dict): The ParsedQuery produced by the query parser.
+        user_query (str): The most recent user query.
+        answer (str): The validated answer returned to the user.
+    """
+    if not RESPONSE_CACHE_ENABLED or not answer:
+        return
+    normalized = normalize_parsed_query(parsed_query, user_query)
+    if normalized is None:
+        return
+    with local_db(RESPONSE_CACHE_STORE) as conn:
+        _create_cache_tables(conn)
+        data_versions = _current_versions(conn, _version_keys(normalized))
+        conn.execute(
+            """
+            INSERT INTO responses (cache_key, answer, data_versions, created_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(cache_key) DO UPDATE SET
+                answer = excluded.answer, data_versions = excluded.data_versions, created_at = excluded.created_at
+            """,
+            (_cache_key(normalized), answer, json.dumps(data_versions), time.time())
+        )
+    _metrics["stores"] += 1
+
+def invalidate_uids(uids: Iterable[str]) -> None:
+    """
+    Bump the data version of updated samples so that every cached answer touching them becomes stale.
+    Answers that touched no explicit UID are invalidated by any update.
+
+    Args:
+        uids (Iterable[str]): The UIDs whose metadata changed.
+    """
+    uids = sorted({uid.upper() for uid in uids if uid})
+    if not uids:
+        return
+    with local_db(RESPONSE_CACHE_STORE) as conn:
+        _create_cache_tables(conn)
+        conn.executemany(
+            """
+            INSERT INTO data_versions (uid, version) VALUES (?, 1)
+            ON CONFLICT(uid) DO UPDATE SET version = version + 1
+            """,
+            [(uid,) for uid in uids + [GLOBAL_VERSION_KEY]]
+        )
+    _metrics["invalidated_uids"] += len(uids)
+    logger.info(f"Invalidated cached responses for {len(uids)} UIDs")
+
+def get_response_cache_stats() -> dict:
+    """
+    Report the hit/miss counters of the response cache in this process.
+    """
+    lookups = _metrics["hits"] + _metrics["misses"] + _metrics["stale"]
+    return {**_metrics, "hit_rate": _metrics["hits"] / lookups if lookups else None}
@@ -3,6 +3,7 @@ import sys
 import os
 import time
 import logging
+import asyncio
 
 # Add the project root directory to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
@@ -10,9 +11,11 @@ sys.path.append(project_root)
 
 from typing_extensions import Literal
 from langgraph.types import Command
-from src.chatbot.baml_client import b as baml
+from src.chatbot.baml_client.async_client import b as baml
 from src.chatbot.studio.models import ConversationState, ResourceBox, Metadata
-from src.chatbot.studio.helpers import get_resource, get_last_worker, convert_messages
+from src.chatbot.studio.helpers import get_resource, get_last_worker
+from src.chatbot.studio.context_builder import build_payload
+from src.chatbot.studio.streaming import stream_text
 
 from src.chatbot.studio.prompts import (
     INITIAL_STATE
@@ -23,7 +26,7 @@ from datetime import datetime, timezone
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
-def response_formatter_node(state: ConversationState = INITIAL_STATE) -> Command[Literal["validator"]]:
+async def response_formatter_node(state: ConversationState = INITIAL_STATE) -> Command[Literal["validator"]]:
     """
     Formats the response based on the current conversation state and updates the conversation flow.
 
@@ -40,19 +43,14 @@ def response_formatter_node(state: ConversationState = INITIAL_STATE) -> Command
     name = "response_formatter"
     last_worker = get_last_worker(state)
     try:
-        payload = {
-            # "system_message": messages[0].content,
-            "user_query": messages[0].content,
-            "aggregatedMessages": convert_messages(messages),
-            "resource": get_resource(state),
-            "last_worker": last_worker
-        }
+        payload = build_payload("response_formatter", state, last_worker=last_worker)
 
         start_time = time.time()
         logger.info("Starting response formatting process")
         
         try:
-            result = baml.FormatResponse(payload)
+            # Streamed so that a streaming client shows the answer while it is generated
+            result = await stream_text(baml.stream.FormatResponse(payload), name, "formattedResponse")
             execution_time = time.time() - start_time
             logger.info(f"Response formatted successfully in {execution_time:.2f} seconds")
             logger.debug(f"Result: {result}")
@@ -109,4 +107,4 @@ if __name__ == "__main__":
     INITIAL_STATE.resources = ResourceBox(
         sample_metadata = Metadata.model_validate(initial_state["resources"]["sample_metadata"][0]),
     )
-    response_formatter_node()
\ No newline at end of file
+    asyncio.run(response_formatter_node())
\ No newline at end of file
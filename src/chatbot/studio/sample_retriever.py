@@ -3,8 +3,6 @@
 from langgraph.graph import START, StateGraph, END
 from typing_extensions import Literal
 from langgraph.types import Command
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
-import aiosqlite
 import os
 import sys
 import asyncio
@@ -24,9 +22,13 @@ from src.chatbot.studio.schema_retriever import schema_retriever_node
 from src.chatbot.studio.advanced_sample_retriever import multi_sample_info_retriever_node
 from src.chatbot.studio.conversationalist import conversationalist_node
 from src.chatbot.studio.query_parser import query_parser_node
-from src.chatbot.studio.prompts import INITIAL_STATE
+from src.chatbot.studio.prompts import INITIAL_STATE, TOOLSET1, TOOLSET2, TOOLSET3
+from src.chatbot.studio.basic_sample_info import basic_sample_info
+from src.chatbot.studio.advanced_sample_retriever import multi_sample_info
+from src.chatbot.studio.update_records import update_records
 from src.chatbot.studio.update_records import archivist_node
-from src.chatbot.studio.helpers import initialize_logging
+from src.chatbot.studio.helpers import initialize_logging, register_workers
+from src.chatbot.studio.checkpointer import create_checkpointer
 
 # initialize logging
 filename = os.path.basename(__file__)
@@ -40,12 +42,18 @@ os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
 
 # Create connection and memory inside an async function instead of at module level
 async def create_memory():
-    conn = await aiosqlite.connect(":memory:")
-    return AsyncSqliteSaver(conn)
+    # File-backed so that checkpoints do not grow the process memory; pruned by run_checkpoint_pruner
+    return await create_checkpointer("sample_retriever")
 
 # Modified to accept an optional memory parameter
 async def initialize_graph(state: ConversationState = INITIAL_STATE):
     memory = await create_memory()
+    # Compile the tool-calling worker subgraphs once instead of on every turn
+    await register_workers([
+        ("basic_sample_info_retriever", TOOLSET1, basic_sample_info),
+        ("multi_sample_info_retriever", TOOLSET2, multi_sample_info),
+        ("archivist", TOOLSET3, update_records),
+    ])
     return sampleRetrieverGraph(state=state, memory=memory)
 
 def finish_node(state: ConversationState) -> Command[Literal["__end__"]]:
@@ -10,7 +10,7 @@ sys.path.append(project_root)
 
 from typing_extensions import Literal
 from langgraph.types import Command
-from src.chatbot.baml_client import b as baml
+from src.chatbot.baml_client.async_client import b as baml
 
 from src.chatbot.studio.models import ConversationState, ResourceBox, ParsedQuery
 from src.chatbot.studio.helpers import update_resource, get_resource, get_last_worker
@@ -66,7 +66,7 @@ async def schema_retriever_node(state: ConversationState = INITIAL_STATE) -> Com
         baml_start_time = time.time()
         
         try:
-            result = baml.RetrieveSchema(user_query, db_schema=db_schema, parsed_query=parsed_query)
+            result = await baml.RetrieveSchema(user_query, db_schema=db_schema, parsed_query=parsed_query)
             baml_execution_time = time.time() - baml_start_time
             logger.info(f"Schema retrieval completed in {baml_execution_time:.2f} seconds")
         except Exception as baml_error:
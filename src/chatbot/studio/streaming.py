@@ -0,0 +1,56 @@
+# src/chatbot/studio/streaming.py
+
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Queue of the streaming request running the graph in the current task. Tasks created by the graph
+# for its nodes copy the context, so nodes and worker subgraphs publish to the request that ran them.
+_event_queue: ContextVar[Optional[asyncio.Queue]] = ContextVar("graph_event_queue", default=None)
+
+def bind_event_queue(queue: asyncio.Queue) -> None:
+    """
+    Publish the events emitted by the graph run of the current task to queue.
+    """
+    _event_queue.set(queue)
+
+def emit_event(event: str, **data: Any) -> None:
+    """
+    Publish an event to the streaming request of the current graph run, if there is one.
+
+    Args:
+        event (str): The event type (i.e. 'token').
+        **data: The JSON-serializable event data.
+    """
+    queue = _event_queue.get()
+    if queue is not None:
+        queue.put_nowait({"event": event, "data": data})
+
+async def stream_text(stream, node: str, field: str):
+    """
+    Await a BAML stream, publishing the text added to one field of every partial result as token events.
+
+    Args:
+        stream: The BAML stream (i.e. baml.stream.SummarizeData(payload)).
+        node (str): The node making the call.
+        field (str): The string field of the result whose deltas are published.
+
+    Returns:
+        The final parsed result of the stream.
+    """
+    if _event_queue.get() is not None:
+        sent = ""
+        async for partial in stream:
+            text = getattr(partial, field, None) or ""
+            if text == sent:
+                continue
+            if text.startswith(sent):
+                emit_event("token", node=node, field=field, delta=text[len(sent):])
+            else:
+                # The parser rewrote the field, so the client replaces the text streamed so far
+                emit_event("token", node=node, field=field, delta=text, reset=True)
+            sent = text
+    return await stream.get_final_response()
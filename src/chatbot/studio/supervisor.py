@@ -1,4 +1,5 @@
 import logging
+import asyncio
 from langchain_core.messages import HumanMessage, AIMessage
 import sys
 import os
@@ -12,7 +13,9 @@ sys.path.append(project_root)
 from typing_extensions import Literal
 from langgraph.types import Command
 from src.chatbot.studio.models import ConversationState
-from src.chatbot.studio.helpers import get_resource, get_available_workers, update_available_workers, get_last_worker, convert_messages
+from src.chatbot.studio.helpers import get_resource, get_available_workers, update_available_workers, get_last_worker
+from src.chatbot.studio.context_builder import build_payload
+from src.chatbot.studio.fast_router import match_fast_route, record_route
 
 from src.chatbot.studio.prompts import (
     WORK_GROUP_A,
@@ -23,9 +26,9 @@ from datetime import datetime, timezone
 # Configure logging
 logger = logging.getLogger(__name__)
 
-from src.chatbot.baml_client import b as baml
+from src.chatbot.baml_client.async_client import b as baml
 
-def supervisor_node(state: ConversationState = INITIAL_STATE) -> Command[Literal["basic_sample_info_retriever","archivist","schema_retriever","multi_sample_info_retriever", "responder", "validator"]]:
+async def supervisor_node(state: ConversationState = INITIAL_STATE) -> Command[Literal["basic_sample_info_retriever","archivist","schema_retriever","multi_sample_info_retriever", "responder", "validator"]]:
     """
     Supervises the current conversation state to determine the next worker and update the conversation flow.
 
@@ -55,13 +58,7 @@ def supervisor_node(state: ConversationState = INITIAL_STATE) -> Command[Literal
 
         logger.info("Creating payload for supervision...")
         try:
-            payload = {
-                # "system_message": messages[0].content,
-                "user_query": messages[0].content,
-                "aggregatedMessages": convert_messages(messages),
-                "resource": get_resource(state),
-                "last_worker": last_worker
-            }
+            payload = build_payload("supervisor", state, last_worker=last_worker)
             logger.debug("Payload created successfully")
         except IndexError as e:
             logger.error(f"Failed to create payload - message index error: {str(e)}")
@@ -71,28 +68,41 @@ def supervisor_node(state: ConversationState = INITIAL_STATE) -> Command[Literal
         available_workers = get_available_workers(state)
         logger.debug(f"Available workers: {[w.agent for w in available_workers]}")
 
-        start_time = time.time()
-        logger.info("Supervising conversation...")
-        try:
-            response = baml.Supervise(payload, available_workers)
-            elapsed_time = time.time() - start_time
-            logger.info(f"Supervision completed in {elapsed_time:.2f} seconds")
-        except Exception as e:
-            logger.error(f"BAML Supervision failed: {str(e)}")
-            raise
+        # The first dispatch of a turn (right after the conversationalist) can be decided by rules
+        route = None
+        if last_worker == "user":
+            route = match_fast_route(state)
+            # A fast route saves the Supervise and Navigate calls, and RetrieveSchema for multiple samples
+            record_route(route, llm_calls_saved=3 if route and route.agent == "multi_sample_info_retriever" else 2)
+
+        if route is not None:
+            goto = route.agent
+            justification = route.justification
+            logger.info(f"Fast route to {goto} with {route.tool}, skipping supervision")
+        else:
+            start_time = time.time()
+            logger.info("Supervising conversation...")
+            try:
+                response = await baml.Supervise(payload, available_workers)
+                elapsed_time = time.time() - start_time
+                logger.info(f"Supervision completed in {elapsed_time:.2f} seconds")
+            except Exception as e:
+                logger.error(f"BAML Supervision failed: {str(e)}")
+                raise
+            goto = response.Next_worker.agent
+            justification = response.justification
 
-        goto = response.Next_worker.agent
         logger.info(f"Next Worker: {goto}")
-        logger.debug(f"Justification: {response.justification}")
+        logger.debug(f"Justification: {justification}")
         
         if goto == "responder":
             logger.debug("Adding responder messages")
-            updated_messages = [AIMessage(content=response.justification, name="supervisor")] + [AIMessage(content=messages[-1].content, name="supervisor")]
+            updated_messages = [AIMessage(content=justification, name="supervisor")] + [AIMessage(content=messages[-1].content, name="supervisor")]
             messages.extend(updated_messages)
             state.available_workers = None
         else:
             logger.debug("Adding supervisor justification message")
-            messages.append(AIMessage(content=response.justification, name="supervisor"))
+            messages.append(AIMessage(content=justification, name="supervisor"))
             # only update available workers if the same worker is beig called more than once in the same session. 
 
         if available_workers is not None and goto != None:
@@ -100,7 +110,8 @@ def supervisor_node(state: ConversationState = INITIAL_STATE) -> Command[Literal
         
         update_available_workers(state, available_workers)
         
-        if goto == "multi_sample_info_retriever":
+        # Fast-routed UID lookups need no schema, the others are mapped to the schema first
+        if goto == "multi_sample_info_retriever" and route is None:
             logger.info("Redirecting from multi_sample_info_retriever to schema_retriever")
             goto = "schema_retriever"
             
@@ -116,6 +127,7 @@ def supervisor_node(state: ConversationState = INITIAL_STATE) -> Command[Literal
                 "version": state.version,
                 "timestamp": state.timestamp.isoformat(),
                 "resources": get_resource(state),
+                "fast_route": route.tool if route is not None else None,
                 "last_worker": last_worker
             },
             goto=goto
@@ -138,6 +150,7 @@ def supervisor_node(state: ConversationState = INITIAL_STATE) -> Command[Literal
                 "version": state.version,
                 "timestamp": datetime.now(timezone.utc),
                 "resources": get_resource(state),
+                "fast_route": None,
                 "last_worker": last_worker
             },
             goto="validator"
@@ -157,4 +170,4 @@ if __name__ == "__main__":
     # update_messages(INITIAL_STATE, initial_state["messages"])
     # update_resource(INITIAL_STATE, initial_state["resources"])
     INITIAL_STATE.messages.extend(initial_state["messages"])
-    supervisor_node()
\ No newline at end of file
+    asyncio.run(supervisor_node())
\ No newline at end of file
@@ -27,6 +27,7 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 from src.chatbot.studio.prompts import TOOLSET3, INITIAL_STATE
+from backend.Tools.services.update_metadata import submit_update_metadata_job
 TOOL_DISPATCH = {
     attr.__name__: attr for attr in TOOLSET3
 }
@@ -61,8 +62,9 @@ async def update_records(state: ConversationState = INITIAL_STATE)->ToolResponse
             logger.info(f"Tool args: {tool_args}")
         if next_tool ==  "update_metadata_pipeline":
             tool_args = state.file_data
-            logger.info(f"Executing {next_tool}")
-            result = await TOOL_DISPATCH[next_tool](tool_args)
+            # The update runs as a background job, the archivist only returns its handle
+            logger.info(f"Submitting {next_tool} as a background job")
+            result = await submit_update_metadata_job(tool_args)
             resource_type = "update_info"
         elif next_tool == "get_st_attributes":
             resource_type = "st_attributes"
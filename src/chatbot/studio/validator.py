@@ -3,6 +3,7 @@ import sys
 import os
 import time
 import logging
+import asyncio
 from datetime import datetime, timezone
 
 # Add the project root directory to the Python path
@@ -11,10 +12,12 @@ sys.path.append(project_root)
 
 from typing_extensions import Literal
 from langgraph.types import Command
-from src.chatbot.baml_client import b as baml
+from src.chatbot.baml_client.async_client import b as baml
 from src.chatbot.studio.models import ConversationState, ResourceBox
-from src.chatbot.studio.helpers import get_resource, get_last_worker, convert_messages
+from src.chatbot.studio.helpers import get_resource, get_last_worker
+from src.chatbot.studio.context_builder import build_payload
 from src.chatbot.studio.prompts import INITIAL_STATE
+from src.chatbot.studio.response_cache import store_response
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -23,7 +26,7 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
-def validator_node(state: ConversationState = INITIAL_STATE) -> Command[Literal["FINISH"]]:
+async def validator_node(state: ConversationState = INITIAL_STATE) -> Command[Literal["FINISH"]]:
     """
     Validates the current conversation state and updates the conversation flow.
 
@@ -39,19 +42,19 @@ def validator_node(state: ConversationState = INITIAL_STATE) -> Command[Literal[
     messages = state.messages.copy()  # Create a copy to avoid direct modification
     last_worker = get_last_worker(state)
     try:
-        payload = {
-            # "system_message": messages[0].content,
-            "user_query": [msg.content for msg in messages if msg.name == "user"][0],
-            "aggregatedMessages": convert_messages(messages),
-            "resource": get_resource(state),
-            "last_worker": last_worker
-        }
+        payload = build_payload(
+            "validator",
+            state,
+            messages=messages,
+            user_query=[msg.content for msg in messages if msg.name == "user"][0],
+            last_worker=last_worker
+        )
 
         start_time = time.time()
         logger.info("Validating response...")
         
         try:
-            response = baml.ValidateResponse(payload)
+            response = await baml.ValidateResponse(payload)
             elapsed_time = time.time() - start_time
             logger.info(f"Validation completed in {elapsed_time:.2f} seconds.")
             
@@ -63,6 +66,10 @@ def validator_node(state: ConversationState = INITIAL_STATE) -> Command[Literal[
             if response.Valid:
                 new_aggregate = messages[-1].content
                 logger.info("Response validated successfully")
+                # Answers to read-only questions are cached for the next time they are asked
+                parsed_query = state.resources.parsed_query if state.resources else None
+                if parsed_query and state.file_data is None and not any(msg.name == "archivist" for msg in messages):
+                    await asyncio.to_thread(store_response, parsed_query.model_dump(), payload["user_query"], new_aggregate)
             elif response.Clarifying_Question:
                 new_aggregate = response.Clarifying_Question
                 logger.info("Clarifying question generated")
@@ -144,4 +151,4 @@ if __name__ == "__main__":
     
     INITIAL_STATE.messages.extend(initial_state["messages"])
     INITIAL_STATE.resources = ResourceBox.model_validate(initial_state["resources"])
-    validator_node()
\ No newline at end of file
+    asyncio.run(validator_node())
\ No newline at end of file